@@ -0,0 +1,50 @@
+import asyncio
+import asyncpg
+import os
+import sys
+from dotenv import load_dotenv
+
+# Adds matches.live_state (the rendered scoreboard every match write now
+# stores) and fills it for matches that are live, so their first read after
+# the deploy is already a single-row lookup. Other matches get theirs on
+# their next write; until then the backend renders them from the tables.
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+DB_USER = "postgres"
+DB_PASSWORD = "password"
+DB_NAME = "cricket_db"
+DB_HOST = "localhost"
+
+async def add_column():
+    dsn = os.getenv("DATABASE_URL")
+    if not dsn:
+        dsn = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+
+    print(f"Connecting to: {dsn}")
+
+    try:
+        conn = await asyncpg.connect(dsn)
+
+        q = "ALTER TABLE matches ADD COLUMN IF NOT EXISTS live_state JSONB;"
+        print(f"Executing: {q}")
+        await conn.execute(q)
+
+        # Backfill with the same renderer the routes use (logo fallbacks included)
+        from logo_index import logo_index
+        from routes.matches import store_live_state
+        logo_index.build()
+
+        rows = await conn.fetch("SELECT id FROM matches WHERE status = 'live' AND live_state IS NULL")
+        for r in rows:
+            async with conn.transaction():
+                await store_live_state(conn, r['id'])
+        print(f"Stored live_state for {len(rows)} live match(es).")
+        await conn.close()
+
+    except Exception as e:
+        print(f"Error: {e}")
+
+if __name__ == "__main__":
+    load_dotenv() # Load from .env if present
+    asyncio.run(add_column())
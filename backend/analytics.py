@@ -0,0 +1,395 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import database
+
+logger = logging.getLogger(__name__)
+
+# Tournament analytics over columnar NumPy arrays.
+#
+# All balls of a tournament are loaded once into one array per column, player
+# ids are mapped to a dense 0..P-1 index, and every aggregate is a bincount /
+# unique over those arrays instead of a Python loop or an SQL query per stat.
+# The arrays and the leaderboards built from them are cached per tournament;
+# after ANALYTICS_TTL seconds a cheap fingerprint query (ball count + max id)
+# decides whether the tournament changed and needs a reload.
+ANALYTICS_TTL = float(os.getenv("ANALYTICS_TTL", "30"))
+ANALYTICS_MAX_TOURNAMENTS = int(os.getenv("ANALYTICS_MAX_TOURNAMENTS", "16"))
+
+EXTRA_CODES = {None: 0, "wide": 1, "noball": 2, "no-ball": 2, "bye": 3, "leg-bye": 4, "penalty": 5}
+WIDE, NOBALL = 1, 2
+# Dismissals not credited to the bowler (same rule as the scorecard)
+NOT_BOWLER_WICKETS = ("runout", "retired")
+
+PHASES = ("powerplay", "middle", "death")
+# overs per side -> (first middle over, first death over), 0-based over_no
+PHASE_BOUNDARIES = {10: (3, 7), 20: (6, 15), 50: (10, 40)}
+
+TOURNAMENT_BALLS_SQL = """
+    SELECT b.match_id, b.inning_no, b.over_no, b.striker_id, b.non_striker_id, b.bowler_id,
+           b.runs_off_bat, b.extras, b.extra_type, b.is_wicket,
+           w.player_out_id, w.wicket_type, m.total_overs
+    FROM balls b
+    JOIN matches m ON m.id = b.match_id
+    LEFT JOIN wickets w ON w.ball_id = b.id
+    WHERE m.tournament_id = $1
+    ORDER BY b.id
+"""
+FINGERPRINT_SQL = """
+    SELECT COUNT(*), COALESCE(MAX(b.id), 0)
+    FROM balls b JOIN matches m ON m.id = b.match_id
+    WHERE m.tournament_id = $1
+"""
+NAMES_SQL = "SELECT id, name FROM players WHERE id = ANY($1::bigint[])"
+
+
+def phase_boundaries(total_overs) -> tuple:
+    """(first middle over, first death over); unknown formats split 30% / 45% / 25%."""
+    overs = total_overs or 20
+    if overs in PHASE_BOUNDARIES:
+        return PHASE_BOUNDARIES[overs]
+    return round(overs * 0.3), overs - round(overs * 0.25)
+
+
+def _ints(values, fill=0, dtype=np.int64):
+    return np.array([fill if v is None else v for v in values], dtype=dtype)
+
+
+def _sum(index, weights, size):
+    """Group-by sum: weights summed per dense index (bincount returns floats)."""
+    return np.bincount(index, weights=weights, minlength=size).astype(np.int64)
+
+
+def _count(index, size):
+    return np.bincount(index, minlength=size)
+
+
+def _overs(balls: int) -> str:
+    return f"{balls // 6}.{balls % 6}"
+
+
+def _ratio(num, den, scale=1.0, digits=2):
+    return round(num * scale / den, digits) if den else None
+
+
+class BallArrays:
+    """One tournament's balls as parallel column arrays (ordered by ball id)."""
+    def __init__(self, rows):
+        cols = list(zip(*rows)) if rows else [()] * 13
+        self.n = len(rows)
+        self.match = _ints(cols[0])
+        self.inning = _ints(cols[1], 1)
+        self.over = _ints(cols[2])
+        self.striker = _ints(cols[3])
+        self.non_striker = _ints(cols[4])
+        self.bowler = _ints(cols[5])
+        self.runs = _ints(cols[6])
+        self.extras = _ints(cols[7])
+        self.extra = np.array([EXTRA_CODES.get(v, 0) for v in cols[8]], dtype=np.int8)
+        self.wicket = np.array([bool(v) for v in cols[9]], dtype=bool)
+        # A wicket without a wickets row (or player_out_id) is the striker's
+        self.player_out = np.where(self.wicket, _ints(cols[10]), 0)
+        self.player_out = np.where(self.wicket & (self.player_out == 0), self.striker, self.player_out)
+        self.credited = self.wicket & np.array([t not in NOT_BOWLER_WICKETS for t in cols[11]], dtype=bool)
+
+        bounds = {t: phase_boundaries(t) for t in set(cols[12])}
+        middle = np.array([bounds[t][0] for t in cols[12]], dtype=np.int64)
+        death = np.array([bounds[t][1] for t in cols[12]], dtype=np.int64)
+        self.phase = np.where(self.over < middle, 0, np.where(self.over < death, 1, 2))
+
+        # Derived columns
+        self.legal = (self.extra != WIDE) & (self.extra != NOBALL)
+        self.faced = self.extra != WIDE
+        self.total = self.runs + self.extras
+        self.run_cost = self.runs + np.where(self.legal, 0, self.extras)  # byes / leg-byes aren't the bowler's
+
+        # Dense indexes: players 0..P-1, innings 0..I-1
+        self.players = np.unique(np.concatenate([self.striker, self.non_striker, self.bowler, self.player_out]))
+        self.s = np.searchsorted(self.players, self.striker)
+        self.b = np.searchsorted(self.players, self.bowler)
+        self.innings_keys, self.inn = np.unique(self.match * 8 + self.inning, return_inverse=True)
+
+
+class TournamentStats:
+    """Arrays + the leaderboards derived from them, built once per load (off the event loop)."""
+    def __init__(self, tournament_id: int, rows, names: Dict[int, str], fingerprint: tuple):
+        self.tournament_id = tournament_id
+        self.fingerprint = fingerprint
+        self.names = names
+        self.loaded = time.time()
+        self.checked = time.monotonic()
+        self.a = a = BallArrays(rows)
+        self.matches = int(len(np.unique(a.match)))
+
+        P = len(a.players)
+        self.batting = self._batting(a, P)
+        self.bowling = self._bowling(a, P)
+        self.phases = self._phases(a)
+        self.partnerships, self.by_wicket = self._partnerships(a)
+
+        # Per-player phase splits: [player, phase]
+        bat_key = a.s * 3 + a.phase
+        bowl_key = a.b * 3 + a.phase
+        self.phase_bat_runs = _sum(bat_key, a.runs, P * 3).reshape(P, 3)
+        self.phase_bat_balls = _sum(bat_key, a.faced, P * 3).reshape(P, 3)
+        self.phase_bowl_runs = _sum(bowl_key, a.run_cost, P * 3).reshape(P, 3)
+        self.phase_bowl_balls = _sum(bowl_key, a.legal, P * 3).reshape(P, 3)
+        self.phase_bowl_wkts = _sum(bowl_key, a.credited, P * 3).reshape(P, 3)
+
+    def name(self, player_id) -> Optional[str]:
+        return self.names.get(player_id)
+
+    def _batting(self, a: BallArrays, P: int) -> List[dict]:
+        runs = _sum(a.s, a.runs, P)
+        balls = _sum(a.s, a.faced, P)
+        fours = _sum(a.s, a.runs == 4, P)
+        sixes = _sum(a.s, a.runs == 6, P)
+        dots = _sum(a.s, a.faced & (a.runs == 0), P)
+
+        out_idx = np.searchsorted(a.players, a.player_out[a.wicket])
+        outs = _count(out_idx, P)
+
+        # Innings = (innings, batter) pairs that faced a ball or were dismissed
+        bat_keys = a.inn * P + a.s
+        out_keys = a.inn[a.wicket] * P + out_idx
+        keys = np.unique(np.concatenate([bat_keys, out_keys]))
+        scores = _sum(np.searchsorted(keys, bat_keys), a.runs, len(keys))
+        player = keys % P
+        dismissed = np.isin(keys, out_keys)
+        innings = _count(player, P)
+        highest = np.full(P, -1, dtype=np.int64)
+        np.maximum.at(highest, player, scores)
+        highest_not_out = np.zeros(P, dtype=bool)
+        np.logical_or.at(highest_not_out, player, (scores == highest[player]) & ~dismissed)
+        fifties = _sum(player, (scores >= 50) & (scores < 100), P)
+        hundreds = _sum(player, scores >= 100, P)
+
+        rows = []
+        for i in np.flatnonzero(innings).tolist():
+            pid = int(a.players[i])
+            if pid == 0:
+                continue
+            r, bf, o = int(runs[i]), int(balls[i]), int(outs[i])
+            rows.append({
+                "player_id": pid, "name": self.name(pid),
+                "innings": int(innings[i]), "runs": r, "balls": bf,
+                "outs": o, "not_outs": int(innings[i]) - o,
+                "fours": int(fours[i]), "sixes": int(sixes[i]), "dots": int(dots[i]),
+                "highest": f"{int(highest[i])}{'*' if highest_not_out[i] else ''}",
+                "fifties": int(fifties[i]), "hundreds": int(hundreds[i]),
+                "sr": _ratio(r, bf, 100), "avg": _ratio(r, o),
+            })
+        rows.sort(key=lambda row: (-row["runs"], row["balls"]))
+        return rows
+
+    def _bowling(self, a: BallArrays, P: int) -> List[dict]:
+        balls = _sum(a.b, a.legal, P)
+        runs = _sum(a.b, a.run_cost, P)
+        wickets = _sum(a.b, a.credited, P)
+        dots = _sum(a.b, a.legal & (a.run_cost == 0), P)
+        fours = _sum(a.b, a.runs == 4, P)
+        sixes = _sum(a.b, a.runs == 6, P)
+
+        # Figures per (innings, bowler): best = most wickets, then fewest runs
+        keys, inv = np.unique(a.inn * P + a.b, return_inverse=True)
+        fig_player = keys % P
+        fig_wkts = _sum(inv, a.credited, len(keys))
+        fig_runs = _sum(inv, a.run_cost, len(keys))
+        order = np.lexsort((fig_runs, -fig_wkts, fig_player))
+        best_players, first = np.unique(fig_player[order], return_index=True)
+        best = {int(p): (int(fig_wkts[order[f]]), int(fig_runs[order[f]])) for p, f in zip(best_players, first)}
+        innings = _count(fig_player, P)
+
+        # Maidens: complete six-ball overs with nothing against the bowler
+        over_keys, over_inv = np.unique((a.inn * 64 + a.over) * P + a.b, return_inverse=True)
+        over_legal = _sum(over_inv, a.legal, len(over_keys))
+        over_cost = _sum(over_inv, a.run_cost, len(over_keys))
+        maidens = _sum(over_keys % P, (over_legal == 6) & (over_cost == 0), P)
+
+        rows = []
+        for i in np.flatnonzero(innings).tolist():
+            pid = int(a.players[i])
+            if pid == 0:
+                continue
+            bb, r, w = int(balls[i]), int(runs[i]), int(wickets[i])
+            bw, br = best[i]
+            rows.append({
+                "player_id": pid, "name": self.name(pid),
+                "innings": int(innings[i]), "overs": _overs(bb), "balls": bb,
+                "runs": r, "wickets": w, "maidens": int(maidens[i]),
+                "dots": int(dots[i]), "fours": int(fours[i]), "sixes": int(sixes[i]),
+                "econ": _ratio(r, bb, 6), "avg": _ratio(r, w), "sr": _ratio(bb, w),
+                "best": f"{bw}/{br}",
+            })
+        rows.sort(key=lambda row: (-row["wickets"], row["econ"] if row["econ"] is not None else 1e9))
+        return rows
+
+    def _phases(self, a: BallArrays) -> List[dict]:
+        runs = _sum(a.phase, a.total, 3)
+        balls = _sum(a.phase, a.legal, 3)
+        wickets = _sum(a.phase, a.wicket, 3)
+        fours = _sum(a.phase, a.runs == 4, 3)
+        sixes = _sum(a.phase, a.runs == 6, 3)
+        dots = _sum(a.phase, a.legal & (a.total == 0), 3)
+        return [{
+            "phase": PHASES[p], "runs": int(runs[p]), "balls": int(balls[p]), "overs": _overs(int(balls[p])),
+            "wickets": int(wickets[p]), "fours": int(fours[p]), "sixes": int(sixes[p]), "dots": int(dots[p]),
+            "run_rate": _ratio(int(runs[p]), int(balls[p]), 6),
+            "dot_percent": _ratio(int(dots[p]), int(balls[p]), 100, 1),
+        } for p in range(3)]
+
+    def _partnerships(self, a: BallArrays):
+        if a.n == 0:
+            return [], []
+        # Group each innings' balls together, keeping ball-id order inside it
+        order = np.argsort(a.inn, kind="stable")
+        inn = a.inn[order]
+        wk = a.wicket[order].astype(np.int64)
+        fallen = np.cumsum(wk) - wk  # wickets down before this ball...
+        starts = np.flatnonzero(np.r_[True, inn[1:] != inn[:-1]])
+        fallen -= np.repeat(fallen[starts], np.diff(np.r_[starts, a.n]))  # ...in this innings
+
+        keys, first, inv = np.unique(inn * 16 + fallen, return_index=True, return_inverse=True)
+        runs = _sum(inv, a.total[order], len(keys))
+        balls = _sum(inv, a.legal[order], len(keys))
+        broken = _sum(inv, wk, len(keys)) > 0
+        batter_1 = a.striker[order][first]
+        batter_2 = a.non_striker[order][first]
+        inn_key = a.innings_keys[keys // 16]
+        wicket_no = keys % 16 + 1
+
+        rows = [{
+            "match_id": int(inn_key[i] // 8), "inning": int(inn_key[i] % 8), "wicket": int(wicket_no[i]),
+            "batters": [self.name(int(batter_1[i])), self.name(int(batter_2[i]))],
+            "runs": int(runs[i]), "balls": int(balls[i]), "unbroken": not bool(broken[i]),
+        } for i in range(len(keys))]
+        rows.sort(key=lambda row: (-row["runs"], row["balls"]))
+
+        by_wicket = []
+        for w in np.unique(wicket_no).tolist():
+            mask = wicket_no == w
+            total, count = int(runs[mask].sum()), int(mask.sum())
+            by_wicket.append({"wicket": w, "partnerships": count, "runs": total,
+                              "avg": _ratio(total, count), "best": int(runs[mask].max())})
+        return rows, by_wicket
+
+    def summary(self, limit: int = 10) -> dict:
+        return {
+            "tournament_id": self.tournament_id,
+            "matches": self.matches,
+            "balls": self.a.n,
+            "loaded_at": self.loaded,
+            "batting": self.batting[:limit],
+            "bowling": self.bowling[:limit],
+            "phases": self.phases,
+            "partnerships": {"top": self.partnerships[:limit], "by_wicket": self.by_wicket},
+        }
+
+    def player(self, player_id: int) -> Optional[dict]:
+        a = self.a
+        i = int(np.searchsorted(a.players, player_id))
+        if i >= len(a.players) or a.players[i] != player_id:
+            return None
+        return {
+            "player_id": player_id,
+            "name": self.name(player_id),
+            "batting": next((r for r in self.batting if r["player_id"] == player_id), None),
+            "bowling": next((r for r in self.bowling if r["player_id"] == player_id), None),
+            "phases": [{
+                "phase": PHASES[p],
+                "bat_runs": int(self.phase_bat_runs[i, p]), "bat_balls": int(self.phase_bat_balls[i, p]),
+                "bat_sr": _ratio(int(self.phase_bat_runs[i, p]), int(self.phase_bat_balls[i, p]), 100),
+                "bowl_runs": int(self.phase_bowl_runs[i, p]), "bowl_balls": int(self.phase_bowl_balls[i, p]),
+                "bowl_wickets": int(self.phase_bowl_wkts[i, p]),
+                "bowl_econ": _ratio(int(self.phase_bowl_runs[i, p]), int(self.phase_bowl_balls[i, p]), 6),
+            } for p in range(3)],
+        }
+
+    def head_to_head(self, batter_id: int, bowler_id: int) -> dict:
+        a = self.a
+        mask = (a.striker == batter_id) & (a.bowler == bowler_id)
+        runs, balls = int(a.runs[mask].sum()), int(a.faced[mask].sum())
+        dismissals = int(((a.player_out == batter_id) & (a.bowler == bowler_id) & a.credited).sum())
+        return {
+            "batter": {"player_id": batter_id, "name": self.name(batter_id)},
+            "bowler": {"player_id": bowler_id, "name": self.name(bowler_id)},
+            "balls": balls, "runs": runs,
+            "dots": int((mask & a.faced & (a.runs == 0)).sum()),
+            "fours": int((mask & (a.runs == 4)).sum()), "sixes": int((mask & (a.runs == 6)).sum()),
+            "dismissals": dismissals,
+            "sr": _ratio(runs, balls, 100),
+        }
+
+
+def _player_ids(rows) -> List[int]:
+    ids = set()
+    for r in rows:
+        ids.update((r[3], r[4], r[5], r[10]))
+    ids.discard(None)
+    return list(ids)
+
+
+class TournamentCache:
+    """
+    tournament_id -> TournamentStats, LRU-bounded. Entries are trusted for
+    ANALYTICS_TTL seconds, then revalidated with FINGERPRINT_SQL; only a
+    changed fingerprint reloads the arrays. One load per tournament at a time.
+    """
+    def __init__(self, ttl: float = ANALYTICS_TTL, max_entries: int = ANALYTICS_MAX_TOURNAMENTS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[int, TournamentStats]" = OrderedDict()
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self.loads = 0
+
+    def _fresh(self, entry: Optional[TournamentStats]) -> bool:
+        return entry is not None and time.monotonic() - entry.checked < self.ttl
+
+    async def get(self, tournament_id: int) -> TournamentStats:
+        entry = self.entries.get(tournament_id)
+        if self._fresh(entry):
+            self.entries.move_to_end(tournament_id)
+            return entry
+
+        lock = self._locks.setdefault(tournament_id, asyncio.Lock())
+        async with lock:
+            entry = self.entries.get(tournament_id)
+            if self._fresh(entry):  # loaded while we waited
+                return entry
+
+            async with database.read_pool.acquire() as conn:
+                fingerprint = tuple(await conn.fetchrow(FINGERPRINT_SQL, tournament_id))
+                if entry is not None and entry.fingerprint == fingerprint:
+                    entry.checked = time.monotonic()
+                    return entry
+                rows = await conn.fetch(TOURNAMENT_BALLS_SQL, tournament_id)
+                ids = await asyncio.to_thread(_player_ids, rows)
+                names = {r["id"]: r["name"] for r in await conn.fetch(NAMES_SQL, ids)}
+
+            start = time.perf_counter()
+            entry = await asyncio.to_thread(TournamentStats, tournament_id, rows, names, fingerprint)
+            self.loads += 1
+            logger.info("Analytics loaded tournament %s: %d balls in %.1fms",
+                        tournament_id, entry.a.n, (time.perf_counter() - start) * 1000)
+
+            self.entries[tournament_id] = entry
+            self.entries.move_to_end(tournament_id)
+            while len(self.entries) > self.max_entries:
+                evicted, _ = self.entries.popitem(last=False)
+                self._locks.pop(evicted, None)
+            return entry
+
+    def invalidate(self, tournament_id: Optional[int] = None):
+        if tournament_id is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(tournament_id, None)
+
+
+tournament_stats = TournamentCache()
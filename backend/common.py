@@ -1,8 +1,12 @@
+import logging
 from fastapi import HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import asyncpg
 import database
+import statements
+
+logger = logging.getLogger(__name__)
 
 # --- Pydantic Models ---
 class CreateMatchRequest(BaseModel):
@@ -40,34 +44,28 @@ def get_strike_rate(runs, balls):
 
 async def fetch_match_state(conn, match_id: int):
     try:
-        print(f"DEBUG: Fetching match {match_id}")
-        row = await conn.fetchrow("SELECT * FROM matches WHERE id = $1", match_id)
+        row = await statements.fetchrow(conn, "match_row", match_id)
         if row:
-            print(f"DEBUG: Match {match_id} found. Keys: {row.keys()}")
             return dict(row)
-        print(f"DEBUG: Match {match_id} NOT found in DB")
+        logger.debug("Match %s not found", match_id)
         return None
-    except Exception as e:
-        print(f"fetch_match_state error: {e}")
+    except Exception:
+        logger.exception("fetch_match_state error (match %s)", match_id)
         return None
 
 async def fetch_player(conn, player_id):
     if not player_id: return None
-    return await conn.fetchrow("SELECT * FROM players WHERE id = $1", player_id)
+    return await statements.fetchrow(conn, "player_row", player_id)
 
 async def swap_strikers(conn, match_data, match_id: int):
     new_striker = match_data['non_striker_id']
     new_non_striker = match_data['current_striker_id']
-    await conn.execute("""
-        UPDATE matches 
-        SET current_striker_id = $1, non_striker_id = $2 
-        WHERE id = $3
-    """, new_striker, new_non_striker, match_id)
+    await statements.execute(conn, "swap_strikers", new_striker, new_non_striker, match_id)
 
 async def check_over_completion(conn, match_data, match_id: int):
     if match_data['balls'] >= 6:
         new_overs = match_data['overs'] + 1
-        await conn.execute("UPDATE matches SET overs = $1, balls = 0 WHERE id = $2", new_overs, match_id)
+        await statements.execute(conn, "complete_over", new_overs, match_id)
         await swap_strikers(conn, match_data, match_id)
 
 async def build_match_response(conn, match_id: int):
@@ -0,0 +1,193 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from starlette.routing import Mount
+
+logger = logging.getLogger(__name__)
+
+# X-DB-* response headers are debug only (they leak query counts to clients)
+DEBUG_HEADERS = os.getenv("DB_DEBUG_HEADERS", "").lower() in ("1", "true", "yes")
+# Same SQL with this many distinct parameter sets in one request -> N+1 warning
+N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "3"))
+
+
+class RequestDbStats:
+    """Query count, DB time and pool wait for one request (lives in a contextvar)."""
+    __slots__ = ("queries", "db_time", "pool_wait", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.statements: Dict[str, set] = {}  # sql -> distinct parameter tuples
+
+    def record_query(self, sql: str, args: tuple, seconds: float):
+        self.queries += 1
+        self.db_time += seconds
+        params = self.statements.setdefault(sql, set())
+        try:
+            params.add(args)
+        except TypeError:  # unhashable args (lists / dicts): count them by repr
+            params.add(repr(args))
+
+    def repeated_statements(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        """[(sql, distinct_param_sets)] for statements that look like an N+1 loop."""
+        return [(sql, len(params)) for sql, params in self.statements.items() if len(params) >= threshold]
+
+
+_current: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def record_wait(seconds: float):
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait += seconds
+
+
+class InstrumentedConnection:
+    """
+    Wraps a pooled asyncpg connection: query methods are timed and counted
+    against the current request. Everything else (transaction, ...) is delegated.
+    """
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    async def _timed(self, method, sql, args, kwargs):
+        stats = _current.get()
+        if stats is None:
+            return await method(sql, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return await method(sql, *args, **kwargs)
+        finally:
+            stats.record_query(sql, args, time.perf_counter() - start)
+
+    async def fetch(self, sql, *args, **kwargs):
+        return await self._timed(self._conn.fetch, sql, args, kwargs)
+
+    async def fetchrow(self, sql, *args, **kwargs):
+        return await self._timed(self._conn.fetchrow, sql, args, kwargs)
+
+    async def fetchval(self, sql, *args, **kwargs):
+        return await self._timed(self._conn.fetchval, sql, args, kwargs)
+
+    async def execute(self, sql, *args, **kwargs):
+        return await self._timed(self._conn.execute, sql, args, kwargs)
+
+    async def executemany(self, sql, args, **kwargs):
+        stats = _current.get()
+        start = time.perf_counter()
+        try:
+            return await self._conn.executemany(sql, args, **kwargs)
+        finally:
+            if stats is not None:
+                # One round trip, one statement: not an N+1
+                stats.record_query(sql, (), time.perf_counter() - start)
+
+    def __getattr__(self, item):
+        return getattr(self._conn, item)
+
+
+class RouteDbStats:
+    """Per-route aggregates since startup."""
+    def __init__(self):
+        self.routes: Dict[str, dict] = {}
+
+    def add(self, route: str, stats: RequestDbStats, n_plus_one: int):
+        agg = self.routes.get(route)
+        if agg is None:
+            agg = self.routes[route] = {
+                "requests": 0, "queries": 0, "max_queries": 0,
+                "db_time": 0.0, "pool_wait": 0.0, "n_plus_one": 0,
+            }
+        agg["requests"] += 1
+        agg["queries"] += stats.queries
+        agg["max_queries"] = max(agg["max_queries"], stats.queries)
+        agg["db_time"] += stats.db_time
+        agg["pool_wait"] += stats.pool_wait
+        agg["n_plus_one"] += n_plus_one
+
+    def snapshot(self):
+        out = {}
+        for route, agg in sorted(self.routes.items(), key=lambda kv: -kv[1]["queries"]):
+            n = agg["requests"]
+            out[route] = {
+                "requests": n,
+                "avg_queries": round(agg["queries"] / n, 2),
+                "max_queries": agg["max_queries"],
+                "avg_db_ms": round(agg["db_time"] * 1000 / n, 3),
+                "avg_pool_wait_ms": round(agg["pool_wait"] * 1000 / n, 3),
+                "n_plus_one_requests": agg["n_plus_one"],
+            }
+        return out
+
+
+route_stats = RouteDbStats()
+_warned = set()  # (route, sql) pairs already logged
+
+
+def route_name(scope) -> str:
+    """'GET /matches/{match_id}/scorecard': the route's template, so ids don't explode the table."""
+    method = scope.get("method", "")
+    route = scope.get("route")
+    if route is None:
+        return f"{method} <unmatched>"
+    if isinstance(route, Mount):
+        # Static files / pages: one bucket per mount
+        return f"{method} {route.path}/*"
+    return f"{method} {route.path}"
+
+
+def _short_sql(sql: str) -> str:
+    return " ".join(sql.split())[:120]
+
+
+class DbStatsMiddleware:
+    """
+    Pure ASGI middleware (does not buffer streaming / SSE responses): counts
+    queries, DB time and pool wait per request, aggregates them per route and
+    logs statements that run repeatedly with different parameters.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestDbStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            if DEBUG_HEADERS and message["type"] == "http.response.start" and stats.queries:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.queries).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.db_time * 1000:.2f}".encode()))
+                headers.append((b"x-db-pool-wait-ms", f"{stats.pool_wait * 1000:.2f}".encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if stats.queries:
+                self._finish(scope, stats)
+
+    @staticmethod
+    def _finish(scope, stats: RequestDbStats):
+        route = route_name(scope)
+        repeated = stats.repeated_statements()
+        route_stats.add(route, stats, 1 if repeated else 0)
+        for sql, distinct in repeated:
+            key = (route, sql)
+            if key in _warned:
+                continue
+            _warned.add(key)
+            logger.warning("Possible N+1 on %s: %d calls with different parameters to: %s",
+                           route, distinct, _short_sql(sql))
@@ -3,3 +3,10 @@ CREATE INDEX IF NOT EXISTS idx_balls_match_inning ON balls(match_id, inning_no);
 CREATE INDEX IF NOT EXISTS idx_balls_match_striker ON balls(match_id, striker_id);
 CREATE INDEX IF NOT EXISTS idx_balls_match_bowler ON balls(match_id, bowler_id);
 CREATE INDEX IF NOT EXISTS idx_matches_current_ids ON matches(current_striker_id, current_bowler_id);
+
+-- tournament analytics load (analytics.py)
+CREATE INDEX IF NOT EXISTS idx_matches_tournament ON matches(tournament_id);
+
+-- squad rosters (roster_cache.py)
+CREATE INDEX IF NOT EXISTS idx_players_team ON players(team_id);
+CREATE INDEX IF NOT EXISTS idx_match_squads_match ON match_squads(match_id, player_id);
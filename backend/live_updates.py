@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Set
+
+from sse_manager import manager
+from snapshot_publisher import snapshot_publisher
+from state_cache import state_cache
+from ws_hub import ws_hub
+
+logger = logging.getLogger(__name__)
+
+# Bursts (undo + re-score, end_inning -> set_batsman -> set_bowler) go out as
+# one broadcast: sent WINDOW after the latest write, never later than
+# MAX_DELAY after the first unsent one.
+BROADCAST_WINDOW_MS = float(os.getenv("BROADCAST_WINDOW_MS", "75"))
+BROADCAST_MAX_DELAY_MS = float(os.getenv("BROADCAST_MAX_DELAY_MS", "250"))
+
+
+class BroadcastScheduler:
+    """
+    Per-match coalescing of broadcasts. A flush sends the match's current
+    cached state (rebuilt only if a write dropped it) to every channel, so
+    however many writes land inside the window the state is built and
+    serialized once.
+    """
+    def __init__(self, window_ms: float = BROADCAST_WINDOW_MS, max_delay_ms: float = BROADCAST_MAX_DELAY_MS):
+        self.window = window_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.timers: Dict[int, asyncio.TimerHandle] = {}
+        self.first_marked: Dict[int, float] = {}
+        self.locks: Dict[int, asyncio.Lock] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.marks = 0
+        self.flushes = 0
+
+    def mark_dirty(self, match_id: int):
+        """A write for this match committed: (re)arm its flush timer."""
+        self.marks += 1
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        first = self.first_marked.setdefault(match_id, now)
+        timer = self.timers.pop(match_id, None)
+        if timer is not None:
+            timer.cancel()
+        when = min(now + self.window, first + self.max_delay)
+        self.timers[match_id] = loop.call_at(when, self._fire, match_id)
+
+    def _fire(self, match_id: int):
+        self.timers.pop(match_id, None)
+        self.first_marked.pop(match_id, None)
+        task = asyncio.create_task(self.flush(match_id))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def flush(self, match_id: int):
+        # One flush per match at a time: a slow rebuild can't overtake a newer state
+        lock = self.locks.setdefault(match_id, asyncio.Lock())
+        async with lock:
+            self.flushes += 1
+            try:
+                entry = await state_cache.get_entry(match_id)
+                if entry is None:
+                    return
+                await manager.broadcast(match_id, entry.state, entry)
+                ws_hub.broadcast(match_id, entry.state)
+                snapshot_publisher.schedule(match_id, entry.state)
+            except Exception:
+                logger.exception("Broadcast failed for match %s", match_id)
+
+    def close(self):
+        for timer in self.timers.values():
+            timer.cancel()
+        self.timers.clear()
+        self.first_marked.clear()
+
+
+broadcast_scheduler = BroadcastScheduler()
+
+
+async def publish_match_state(match_id: int, state: dict):
+    """
+    Fan a freshly committed match state out to every live channel.
+    Call this only after the transaction that produced `state` has committed.
+    """
+    # Cache first: a viewer connecting before the flush gets this state, not an older one
+    state_cache.put(match_id, state)
+    broadcast_scheduler.mark_dirty(match_id)
+
+
+def ack(match_id: int, outcome: dict) -> dict:
+    """
+    Lean write reply (?response=ack): the outcome plus the ETag the new state
+    will be served with, instead of the state itself. Clients take the body
+    from their stream, or from /match_data with If-None-Match.
+    """
+    return {**outcome, "version": state_cache.etag(match_id)}
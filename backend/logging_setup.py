@@ -0,0 +1,119 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+# LOG_LEVEL=INFO                       root level
+# LOG_LEVELS=common=DEBUG,sse_manager=WARNING   per-module overrides
+# LOG_FORMAT=text|json
+# LOG_QUEUE_SIZE=10000                 records buffered for the writer thread (overflow is dropped)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps 1 in N records for high-frequency events. Opt in per call:
+
+        logger.info("SSE: client joined match %s", match_id, extra={"sample_every": 100})
+
+    Counted per (logger, message template), so different events don't share a budget.
+    """
+    def __init__(self):
+        super().__init__()
+        self.counts: Dict[Tuple[str, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = getattr(record, "sample_every", None)
+        if not every or every <= 1:
+            return True
+        key = (record.name, str(record.msg))
+        count = self.counts.get(key, 0) + 1
+        self.counts[key] = count
+        return count % every == 1
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the event loop: when the writer falls behind, records are dropped and counted."""
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields (match_id, route, ...) become keys."""
+    def format(self, record: logging.LogRecord) -> str:
+        doc = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and key != "sample_every":
+                doc[key] = value
+        if record.exc_info:
+            doc["exc"] = self.formatException(record.exc_info)
+        return json.dumps(doc, default=str)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+_stream_handler: Optional[logging.Handler] = None
+
+
+def setup_logging():
+    """Route all logging through a bounded queue drained by one writer thread. Idempotent."""
+    global _listener, _queue_handler, _stream_handler
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+
+    _stream_handler = stream
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(LOG_LEVEL)
+    for item in filter(None, (part.strip() for part in LOG_LEVELS.split(","))):
+        name, _, level = item.partition("=")
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush whatever is queued (lifespan shutdown); later records are written directly."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    root = logging.getLogger()
+    root.handlers = [_stream_handler]
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler else 0
@@ -0,0 +1,66 @@
+import os
+import re
+import logging
+from typing import Dict, Optional
+
+from utils.uploads import LOGO_DIR, LOGO_SIZE, DERIVATIVE_EXT
+
+logger = logging.getLogger(__name__)
+
+# team_5_3a8ae917.png (original) / team_5_3a8ae917_128.webp (derivative)
+LOGO_FILE_RE = re.compile(r"^team_(\d+)_([0-9a-f]+)(?:_(\d+))?\.(\w+)$")
+
+
+class LogoIndex:
+    """
+    In-memory map of team_id -> newest logo URL on disk.
+    Built once at startup and updated by upload_team_logo, so the live
+    state builder never has to touch the filesystem.
+    """
+    def __init__(self, logo_dir: str = LOGO_DIR):
+        self.logo_dir = logo_dir
+        self.logos: Dict[int, str] = {}
+
+    def build(self):
+        """Scan the logo directory once (startup)."""
+        logos = {}
+        if not os.path.isdir(self.logo_dir):
+            self.logos = logos
+            return logos
+
+        newest = {}      # team_id -> (mtime, filename) of newest original
+        derivatives = set()
+        with os.scandir(self.logo_dir) as entries:
+            for entry in entries:
+                m = LOGO_FILE_RE.match(entry.name)
+                if not m or not entry.is_file():
+                    continue
+                team_id = int(m.group(1))
+                if m.group(3):
+                    derivatives.add(entry.name)
+                    continue
+                mtime = entry.stat().st_mtime
+                # Ties broken by name so the choice is deterministic
+                if team_id not in newest or (mtime, entry.name) > newest[team_id]:
+                    newest[team_id] = (mtime, entry.name)
+
+        for team_id, (_, filename) in newest.items():
+            stem = filename.rsplit(".", 1)[0]
+            thumb = f"{stem}_{LOGO_SIZE}.{DERIVATIVE_EXT}"
+            logos[team_id] = f"/static/logos/{thumb if thumb in derivatives else filename}"
+
+        self.logos = logos
+        logger.info("Logo index built: %d teams", len(logos))
+        return logos
+
+    def get(self, team_id) -> Optional[str]:
+        if not team_id:
+            return None
+        return self.logos.get(team_id)
+
+    def set(self, team_id: int, url: str):
+        self.logos[team_id] = url
+
+
+# Global Instance to be imported elsewhere
+logo_index = LogoIndex()
@@ -1,27 +1,123 @@
-from fastapi import FastAPI
+# Logging first: modules below log while importing (e.g. database fallback warning)
+from logging_setup import setup_logging, shutdown_logging
+setup_logging()
+
+import logging
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, PlainTextResponse, JSONResponse
 from contextlib import asynccontextmanager
+import json
 import os
+import signal
+import threading
 from fastapi.responses import StreamingResponse
-from sse_manager import manager
+from sse_manager import manager, SSE_RETRY_MAX_MS
 import asyncio
-from database import init_db, close_db
+import database
+import statements
+from database import init_db, close_db, pool_stats
+from state_cache import state_cache
+import ticker
+import projections
+from live_updates import broadcast_scheduler
+from ws_hub import ws_hub
 from routes import matches, scoring, teams
 from routes.buttons import undo
+from routes import live_socket
+from utils.uploads import shutdown_image_pool
+from logo_index import logo_index
+from static_assets import AssetManifest, AssetFiles, PageFiles
+from snapshot_publisher import snapshot_publisher
+from db_metrics import DbStatsMiddleware, route_stats
+import metrics
 import psutil
 
+logger = logging.getLogger(__name__)
+
+
+
+def build_static_assets():
+    """Fingerprint + precompress frontend assets, then rewrite pages to the hashed URLs."""
+    if os.path.exists(asset_manifest.static_dir):
+        asset_manifest.build()
+    if page_files is not None:
+        page_files.build()
+
+
+async def load_match_state(match_id: int):
+    """One primary-key read of the stored state; rendered from the tables only if there is none yet."""
+    async with database.read_pool.acquire() as conn:
+        stored = await statements.fetchval(conn, "live_state", match_id)
+        if stored is not None:
+            return json.loads(stored)
+        return await matches.fetch_full_match_state(conn, match_id)
+
+
+async def warm_live_states():
+    """
+    Preload every live match so the first viewers after a deploy hit the cache.
+    Only an optimisation: without a database (or on any error) startup goes on.
+    """
+    if database.read_pool is None:
+        return
+    try:
+        async with database.read_pool.acquire() as conn:
+            rows = await conn.fetch("SELECT id FROM matches WHERE status = 'live'")
+        warmed = await state_cache.warm([r['id'] for r in rows])
+        logger.info("State cache warmed: %s/%s live match(es)", warmed, len(rows))
+    except Exception:
+        logger.exception("State cache warm-up failed")
+
+
+def drain_on_signal():
+    """
+    Uvicorn only runs lifespan shutdown after open responses finish, and SSE
+    streams never finish on their own: hand viewers their retry hint and end
+    the streams (and live sockets) as soon as SIGTERM/SIGINT arrives, then let
+    uvicorn's own handler carry on.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(manager.drain)
+            loop.call_soon_threadsafe(ws_hub.drain)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    await asyncio.to_thread(logo_index.build)
+    await asyncio.to_thread(build_static_assets)
+    metrics.loop_lag_monitor.start()
+    snapshot_publisher.configure({
+        "scorecard": matches.get_match_scorecard,
+        "commentary": commentary.get_match_commentary,
+    })
+    state_cache.configure(load_match_state)
+    await warm_live_states()
+    drain_on_signal()
     yield
     # Shutdown
+    broadcast_scheduler.close()
+    manager.drain()
+    ws_hub.drain()
+    await metrics.loop_lag_monitor.stop()
+    await snapshot_publisher.close()
     await close_db()
+    shutdown_image_pool()
+    shutdown_logging()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -32,17 +128,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # scorer.js revalidates /match_data across origins
 )
 
 # --- Performance: Compress large JSON responses ---
 # minimum_size=1000 means only compress responses larger than 1KB
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
+# --- Diagnostics: queries / DB time / pool wait per request (see /db_stats) ---
+app.add_middleware(DbStatsMiddleware)
+# Outermost: route latency histograms for /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 # --- Include Routers ---
 app.include_router(matches.router, prefix="/api", tags=["Matches"])
 app.include_router(scoring.router, prefix="/api", tags=["Scoring"])
 app.include_router(teams.router, prefix="/api", tags=["Teams"])
 app.include_router(undo.router, prefix="/api", tags=["Buttons"])
+app.include_router(live_socket.router, prefix="/api", tags=["Live"])
 from routes import match_settings_routes
 app.include_router(match_settings_routes.router, prefix="/api", tags=["Settings"])
 
@@ -51,26 +154,124 @@ from routes import players, commentary
 app.include_router(players.router, prefix="/api", tags=["Players"])
 app.include_router(commentary.router, prefix="/api", tags=["Commentary"])
 
+from routes import stats
+app.include_router(stats.router, prefix="/api", tags=["Stats"])
+
+from routes import admin
+app.include_router(admin.router, prefix="/api", tags=["Admin"])
+
 # --- SSE STREAM ENDPOINT ---
+manager.register_view("ticker", ticker.ticker_json)
+manager.register_view("ticker_text", ticker.ticker_text)
+manager.register_view("summary", ticker.match_summary)
+for name, keys in projections.PROJECTIONS.items():
+    manager.register_view(name, projections.projector(keys))
+
+# Matches one multiplexed stream may follow
+SSE_MAX_STREAM_MATCHES = int(os.getenv("SSE_MAX_STREAM_MATCHES", "50"))
+# No caching, and no response buffering by nginx-style proxies
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_response(events, match_id=None):
+    """The stream, or a 503 with a jittered Retry-After when the connection caps are reached."""
+    if not manager.admit(match_id):
+        retry = manager.retry_after()
+        return JSONResponse({"detail": "Too many live viewers, retry shortly", "retry_after": retry},
+                            status_code=503, headers={"Retry-After": str(retry)})
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def event_generator(match_id: int, view: str = "full"):
+    # Shutting down: send the client elsewhere for a while
+    if manager.draining:
+        yield f"retry: {SSE_RETRY_MAX_MS}\n\n"
+        return
+
+    # 1. Subscribe this client
+    q = await manager.subscribe(match_id, view)
+    try:
+        # 2. Current state first (also what a reconnect after a deploy/drain sees)
+        entry = await state_cache.get_entry(match_id)
+        if entry:
+            yield entry.sse(view, manager.views[view])
+        # 3. Wait for data (yields control, zero loop overhead); heartbeats
+        #    while quiet, ends when drained or reaped
+        async for data in manager.messages(q):
+            yield data
+    finally:
+        # 4. Disconnect (tab closed) or drain
+        await manager.unsubscribe(match_id, q, view)
+
+
+async def multiplex_generator(match_ids):
+    if manager.draining:
+        yield f"retry: {SSE_RETRY_MAX_MS}\n\n"
+        return
+
+    # 1. One queue for all of them
+    key, q = manager.subscribe_many(match_ids)
+    try:
+        # 2. Current summary of each match (cached states, rebuilt concurrently on a miss)
+        entries = await asyncio.gather(*(state_cache.get_entry(mid) for mid in sorted(key)))
+        for mid, entry in zip(sorted(key), entries):
+            if entry:
+                yield manager.summary_message(mid, entry.state)
+        async for data in manager.messages(q):
+            yield data
+    finally:
+        manager.unsubscribe_many(key, q)
+
+
+@app.get("/api/stream")
+async def stream_matches(matches: str):
+    """
+    Multiplexed SSE: summary updates for several matches (?matches=1,2,3) over
+    one connection. Each message is an `event: match-<id>` with a small JSON summary.
+    """
+    try:
+        match_ids = {int(m) for m in matches.split(",") if m.strip()}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="matches must be a comma-separated list of ids")
+    if not match_ids or len(match_ids) > SSE_MAX_STREAM_MATCHES:
+        raise HTTPException(status_code=400, detail=f"Between 1 and {SSE_MAX_STREAM_MATCHES} matches")
+    return sse_response(multiplex_generator(match_ids))
+
+
+@app.get("/api/tournaments/{tournament_id}/stream")
+async def stream_tournament(tournament_id: int):
+    """Multiplexed SSE for every match of a tournament that hasn't finished yet."""
+    async with database.read_pool.acquire() as conn:
+        rows = await conn.fetch("""
+            SELECT id FROM matches
+            WHERE tournament_id = $1 AND status IS DISTINCT FROM 'completed'
+            ORDER BY id LIMIT $2
+        """, tournament_id, SSE_MAX_STREAM_MATCHES)
+    if not rows:
+        raise HTTPException(status_code=404, detail="No open matches in this tournament")
+    return sse_response(multiplex_generator(r['id'] for r in rows))
+
+
 @app.get("/api/stream/{match_id}")
-async def stream_match_data(match_id: int):
+async def stream_match_data(match_id: int, view: str = "full"):
     """
     SSE Endpoint: Viewers connect here to get live updates.
     This holds the connection open but consumes negligible CPU (Zero-Load).
+    ?view=score|batting sends a projection of the state (projections.py) instead of all of it.
     """
-    async def event_generator():
-        # 1. Subscribe this client
-        q = await manager.subscribe(match_id)
-        try:
-            while True:
-                # 2. Wait for data (yields control, zero loop overhead)
-                data = await q.get()
-                yield data
-        except asyncio.CancelledError:
-            # 3. Handle disconnect (Tab closed)
-            await manager.unsubscribe(match_id, q)
-
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    if view != "full" and view not in projections.PROJECTIONS:
+        raise HTTPException(status_code=400, detail=f"view must be one of: full, {', '.join(projections.PROJECTIONS)}")
+    return sse_response(event_generator(match_id, view), match_id)
+
+
+@app.get("/api/stream/{match_id}/ticker")
+async def stream_match_ticker(match_id: int, format: str = "json"):
+    """
+    Compact SSE feed for embeds and overlays: one positional JSON array
+    (ticker.TICKER_FIELDS) or, with ?format=text, one plain line per update.
+    """
+    view = "ticker_text" if format == "text" else "ticker"
+    return sse_response(event_generator(match_id, view), match_id)
 
 # --- Serve Static Files ---
 # 1. Mount /static for assets (CSS, JS, Images)
@@ -79,11 +280,13 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FRONTEND_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "frontend"))
 
 # 1. Mount /static for assets (CSS, JS, Images)
+# Content-hashed URLs + immutable caching + precompressed variants (see static_assets.py)
 static_path = os.path.join(FRONTEND_DIR, "static")
+asset_manifest = AssetManifest(static_path)
 if os.path.exists(static_path):
-    app.mount("/static", StaticFiles(directory=static_path), name="static")
+    app.mount("/static", AssetFiles(asset_manifest), name="static")
 else:
-    print(f"Warning: Static directory not found at {static_path}")
+    logger.warning("Static directory not found at %s", static_path)
 
 # 2. Mount / (root) to frontend/pages for HTML files
 @app.get("/memory")
@@ -95,6 +298,29 @@ def memory_usage():
     }
 
 
+@app.get("/db_pools", dependencies=[Depends(admin.admin_only)])
+def db_pool_usage():
+    """Per-lane pool size and acquire-wait times (write = scorer, read = viewers)."""
+    return pool_stats()
+
+
+@app.get("/db_stats", dependencies=[Depends(admin.admin_only)])
+def db_route_stats():
+    """Per-route query counts, DB time, pool wait and N+1 hits since startup."""
+    return route_stats.snapshot()
+
+
+@app.get("/state_cache", dependencies=[Depends(admin.admin_only)])
+def state_cache_stats():
+    """Match state cache size and hit/miss counts since startup."""
+    return state_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(admin.metrics_scraper)])
+async def prometheus_metrics():
+    """Prometheus scrape target: route latency, loop lag, SSE fan-out/queues, DB pools, GC."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 
 def get_ram_usage_mb():
     process = psutil.Process(os.getpid())
@@ -103,10 +329,13 @@ def get_ram_usage_mb():
 
 # This must be the last mount as it catches all root requests
 pages_path = os.path.join(FRONTEND_DIR, "pages")
+page_files = None
 if os.path.exists(pages_path):
-    app.mount("/", StaticFiles(directory=pages_path, html=True), name="pages")
+    # HTML is rewritten to the hashed asset URLs at startup
+    page_files = PageFiles(pages_path, asset_manifest)
+    app.mount("/", page_files, name="pages")
 else:
-    print(f"Warning: Pages directory not found at {pages_path}")
+    logger.warning("Pages directory not found at %s", pages_path)
 
 
 
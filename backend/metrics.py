@@ -0,0 +1,236 @@
+import asyncio
+import bisect
+import gc
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import psutil
+
+from db_metrics import route_name
+
+logger = logging.getLogger(__name__)
+
+# Prometheus text exposition, hand-rolled (no prometheus_client dependency).
+# Everything here lives in this process: with several workers, scrape each one.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+FANOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL_MS", "500")) / 1000.0
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self.series: Dict[tuple, list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, labels: tuple = ()):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            base = _labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_join(base, _le(bound))} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_join(base, _le('+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{_wrap(base)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_wrap(base)} {cumulative}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable) -> str:
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+def _le(bound) -> str:
+    return 'le="' + str(bound) + '"'
+
+
+def _join(base: str, extra: str) -> str:
+    return "{" + (f"{base},{extra}" if base else extra) + "}"
+
+
+def _wrap(base: str) -> str:
+    return "{" + base + "}" if base else ""
+
+
+def _gauge(lines: List[str], name: str, help_text: str, samples, kind: str = "gauge"):
+    """samples: iterable of (labels_str, value)."""
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_wrap(labels)} {value}")
+
+
+# --- Recorded metrics ---
+request_latency = Histogram(
+    "scoreboard_http_request_duration_seconds",
+    "Time to response start per route (SSE streams: time to open).",
+    ("method_route", "status"),
+)
+broadcast_fanout = Histogram(
+    "scoreboard_sse_broadcast_seconds",
+    "Time to serialize and enqueue one broadcast to every listener of a match.",
+    buckets=FANOUT_BUCKETS,
+)
+loop_lag = Histogram(
+    "scoreboard_event_loop_lag_seconds",
+    "Extra delay of a periodic asyncio.sleep: how long ready callbacks wait.",
+    buckets=LAG_BUCKETS,
+)
+
+
+class LoopLagMonitor:
+    """Background task that measures event-loop lag every LOOP_LAG_INTERVAL."""
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.last = 0.0
+        self.max = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.last = lag
+            self.max = max(self.max, lag)
+            loop_lag.observe(lag)
+
+
+loop_lag_monitor = LoopLagMonitor()
+
+
+class MetricsMiddleware:
+    """Pure ASGI: records request latency (to response start) per templated route."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = ["500"]
+        recorded = [False]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and not recorded[0]:
+                recorded[0] = True
+                status[0] = str(message["status"])
+                request_latency.observe(time.perf_counter() - start, (route_name(scope), status[0]))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded[0]:
+                request_latency.observe(time.perf_counter() - start, (route_name(scope), status[0]))
+
+
+def render() -> str:
+    """Prometheus text format (version 0.0.4)."""
+    # Imported here: these modules import metrics for recording
+    import database
+    from sse_manager import manager
+    from snapshot_publisher import snapshot_publisher
+    from live_updates import broadcast_scheduler
+    from ws_hub import ws_hub
+
+    lines: List[str] = []
+    lines += request_latency.render()
+    lines += broadcast_fanout.render()
+    lines += loop_lag.render()
+    _gauge(lines, "scoreboard_event_loop_lag_max_seconds", "Worst event-loop lag since startup.",
+           [("", f"{loop_lag_monitor.max:.6f}")])
+
+    # SSE listeners + queue depths per match
+    listeners = sorted(manager.match_queues())
+    _gauge(lines, "scoreboard_sse_connections", "Open SSE connections per match.",
+           [(f'match_id="{mid}"', len(qs)) for mid, qs in listeners])
+    _gauge(lines, "scoreboard_sse_queue_depth_max", "Deepest listener queue per match (slow consumers).",
+           [(f'match_id="{mid}"', max((q.qsize() for q in qs), default=0)) for mid, qs in listeners])
+    _gauge(lines, "scoreboard_sse_queued_messages", "Messages waiting in all listener queues per match.",
+           [(f'match_id="{mid}"', sum(q.qsize() for q in qs)) for mid, qs in listeners])
+    _gauge(lines, "scoreboard_sse_multiplex_connections", "Open multi-match SSE connections.",
+           [("", sum(len(qs) for qs in manager.groups.values()))])
+    _gauge(lines, "scoreboard_sse_multiplex_keys", "Distinct match sets followed by multi-match streams.",
+           [("", len(manager.groups))])
+    _gauge(lines, "scoreboard_sse_open_connections", "Open SSE connections in this process (all kinds).",
+           [("", manager.connections)])
+    _gauge(lines, "scoreboard_sse_rejected_total", "Streams refused with a 503 by the connection caps.",
+           [("", manager.rejected)], kind="counter")
+    _gauge(lines, "scoreboard_sse_reaped_total", "Listeners dropped for falling too far behind.",
+           [("", manager.reaped)], kind="counter")
+    _gauge(lines, "scoreboard_ws_connections", "Open WebSocket listeners.",
+           [("", ws_hub.connections)])
+    _gauge(lines, "scoreboard_ws_reaped_total", "WebSocket listeners dropped for falling too far behind.",
+           [("", ws_hub.reaped)], kind="counter")
+    _gauge(lines, "scoreboard_broadcast_marks_total", "Match writes that asked for a broadcast.",
+           [("", broadcast_scheduler.marks)], kind="counter")
+    _gauge(lines, "scoreboard_broadcast_flushes_total", "Broadcasts sent after coalescing.",
+           [("", broadcast_scheduler.flushes)], kind="counter")
+    _gauge(lines, "scoreboard_snapshot_pending", "Matches with a snapshot write pending.",
+           [("", len(snapshot_publisher.pending))])
+
+    # DB pool lanes
+    pools = database.pool_stats()
+    _gauge(lines, "scoreboard_db_pool_size", "Open connections per pool lane.",
+           [(f'lane="{lane}"', s["size"]) for lane, s in pools.items()])
+    _gauge(lines, "scoreboard_db_pool_idle", "Idle connections per pool lane.",
+           [(f'lane="{lane}"', s["idle"]) for lane, s in pools.items()])
+    _gauge(lines, "scoreboard_db_pool_max_size", "Configured max connections per pool lane.",
+           [(f'lane="{lane}"', s["max_size"]) for lane, s in pools.items()])
+    _gauge(lines, "scoreboard_db_pool_waiting", "Tasks currently queued for a connection.",
+           [(f'lane="{lane}"', s["waiting"]) for lane, s in pools.items()])
+    _gauge(lines, "scoreboard_db_pool_acquires_total", "Connections handed out per lane.",
+           [(f'lane="{lane}"', s["acquires"]) for lane, s in pools.items()], kind="counter")
+    _gauge(lines, "scoreboard_db_pool_wait_seconds_total", "Total time spent waiting for a connection.",
+           [(f'lane="{lane}"', round(s["wait_total_ms"] / 1000, 6)) for lane, s in pools.items()], kind="counter")
+    _gauge(lines, "scoreboard_db_pool_wait_max_seconds", "Longest single wait for a connection.",
+           [(f'lane="{lane}"', round(s["wait_max_ms"] / 1000, 6)) for lane, s in pools.items()])
+
+    # GC + process
+    _gauge(lines, "scoreboard_gc_collections_total", "Collections per GC generation.",
+           [(f'generation="{gen}"', s["collections"]) for gen, s in enumerate(gc.get_stats())], kind="counter")
+    _gauge(lines, "scoreboard_gc_objects_tracked", "Objects pending in each GC generation.",
+           [(f'generation="{gen}"', count) for gen, count in enumerate(gc.get_count())])
+    process = psutil.Process(os.getpid())
+    _gauge(lines, "scoreboard_process_resident_memory_bytes", "Resident set size.",
+           [("", process.memory_info().rss)])
+    from logging_setup import dropped_records
+    _gauge(lines, "scoreboard_log_records_dropped_total", "Log records dropped because the log queue was full.",
+           [("", dropped_records())], kind="counter")
+    _gauge(lines, "scoreboard_asyncio_tasks", "Live asyncio tasks (roughly: open requests + streams).",
+           [("", len(asyncio.all_tasks()))])
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,157 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Innermost Python frames that mean "blocked waiting", not doing work:
+# the event loop in select(), idle worker threads parked on a queue / condition
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+MAX_DEPTH = 128
+
+
+def _is_idle(code) -> bool:
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+
+
+def _is_loop_root(code) -> bool:
+    return code.co_name == "_run_once" and os.path.basename(code.co_filename) == "base_events.py"
+
+
+def _short_path(filename: str) -> str:
+    if "site-packages" in filename:
+        return filename.split("site-packages" + os.sep, 1)[-1]
+    if "lib" + os.sep + "python" in filename:
+        return "stdlib/" + os.path.basename(filename)
+    return os.path.relpath(filename) if os.path.isabs(filename) else filename
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler: a daemon thread snapshots the Python stacks
+    of the target threads every `interval` seconds via sys._current_frames().
+
+    The event-loop thread's stack shows whichever callback / coroutine step is
+    running at that instant (handlers, json encoding, SSE fan-out); samples
+    where the loop sits in select() are counted as idle and dropped from the
+    stacks unless include_idle is set.
+    """
+    def __init__(self, interval: float = 0.005, thread_ids: Optional[List[int]] = None,
+                 include_idle: bool = False):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids else None  # None = every thread
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started = 0.0
+        self.duration = 0.0
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample_once(self, names: Dict[int, str]):
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                continue
+            self.samples += 1
+            if not self.include_idle and _is_idle(frame.f_code):
+                self.idle_samples += 1
+                continue
+            stack = []
+            depth = 0
+            while frame is not None and depth < MAX_DEPTH:
+                code = frame.f_code
+                if _is_loop_root(code):
+                    # Cut the thread/runner scaffolding: loop stacks start at the callback
+                    stack.append("asyncio event loop")
+                    break
+                stack.append(self._label(code))
+                frame = frame.f_back
+                depth += 1
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            names = {t.ident: t.name for t in threading.enumerate()}
+            self._sample_once(names)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format: `frame;frame;frame count` (flamegraph.pl, speedscope)."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 25):
+        """Self time: how often each function was the innermost frame."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        busy = sum(self.stacks.values()) or 1
+        return [{"function": fn, "samples": n, "percent": round(n * 100 / busy, 1)}
+                for fn, n in leaves.most_common(limit)]
+
+    def inclusive_functions(self, limit: int = 25):
+        """Total time: how often each function was anywhere on the stack."""
+        totals = Counter()
+        for stack, count in self.stacks.items():
+            for fn in set(stack.split(";")[1:]):
+                totals[fn] += count
+        busy = sum(self.stacks.values()) or 1
+        return [{"function": fn, "samples": n, "percent": round(n * 100 / busy, 1)}
+                for fn, n in totals.most_common(limit)]
+
+
+def start_tracemalloc() -> bool:
+    """Returns True if we started it (and so must stop it)."""
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(10)
+    return True
+
+
+def tracemalloc_report(started_here: bool, limit: int = 20):
+    snapshot = tracemalloc.take_snapshot()
+    if started_here:
+        tracemalloc.stop()
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),  # the sampler's own stack strings
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    stats = snapshot.statistics("lineno")
+    return {
+        "total_kb": round(sum(s.size for s in stats) / 1024, 1),
+        "top": [{
+            "location": f"{_short_path(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+            "size_kb": round(s.size / 1024, 1),
+            "count": s.count,
+        } for s in stats[:limit]],
+    }
@@ -0,0 +1,22 @@
+import json
+from typing import Callable, Dict, Tuple
+
+# Named field projections of the match state for /api/stream/{id}?view=...
+# "full" (the whole state) is the default; these drop what small clients never
+# render: logos, colours, the over timeline, the previous inning.
+PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    # Spectator phones: the score line and rates
+    "score": ("match_id", "status", "result_message", "batting_team", "bowling_team",
+              "innings", "crr", "projected_score"),
+    # Score plus who is in: batters, bowler, partnership, last wicket
+    "batting": ("match_id", "status", "result_message", "batting_team", "bowling_team",
+                "innings", "crr", "projected_score",
+                "current_batsmen", "current_bowler", "current_partnership", "last_out"),
+}
+
+
+def projector(keys: Tuple[str, ...]) -> Callable[[dict], str]:
+    """Renderer for one projection (an SSEManager view)."""
+    def render(state: dict) -> str:
+        return json.dumps({k: state.get(k) for k in keys})
+    return render
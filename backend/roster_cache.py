@@ -0,0 +1,105 @@
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+import database
+import statements
+
+# Wickets and squad edits on this process update entries in place; the TTL only
+# bounds staleness from writes handled by another worker.
+ROSTER_CACHE_TTL = float(os.getenv("ROSTER_CACHE_TTL", "60"))
+
+
+class MatchRoster:
+    """
+    Both squads of one match plus who is out in each inning.
+
+    A team's squad is its playing XI from match_squads when one was picked,
+    otherwise every player of the team. Who is at the crease or bowling comes
+    from the live state passed in, so batter and bowler changes need no update here.
+    """
+    __slots__ = ("teams", "outs", "loaded_at")
+
+    def __init__(self, rows, out_rows):
+        teams: Dict[int, List[dict]] = {}
+        picked: Dict[int, List[dict]] = {}
+        for r in rows:
+            player = {"id": r['id'], "name": r['name'], "role": r['role'], "photo_url": r['photo_url']}
+            teams.setdefault(r['team_id'], []).append(player)
+            if r['picked']:
+                picked.setdefault(r['team_id'], []).append(player)
+        teams.update(picked)
+        self.teams = teams
+
+        self.outs: Dict[int, Set[int]] = {}
+        for r in out_rows:
+            self.outs.setdefault(r['inning_no'], set()).add(r['player_out_id'])
+        self.loaded_at = time.monotonic()
+
+    def squads(self, state: dict) -> dict:
+        """Batting / bowling squads with out, at-crease and availability flags."""
+        inning = state['innings']['current_inning']
+        out = self.outs.get(inning, set())
+        at_crease = {b['id'] for b in state['current_batsmen']}
+        bowling_now = state['current_bowler']['id'] if state['current_bowler'] else None
+
+        batting = [dict(p, is_out=p['id'] in out, at_crease=p['id'] in at_crease,
+                        available=p['id'] not in out and p['id'] not in at_crease)
+                   for p in self.teams.get(state['batting_team_id'], [])]
+        bowling = [dict(p, bowling_now=p['id'] == bowling_now, available=p['id'] != bowling_now)
+                   for p in self.teams.get(state['bowling_team_id'], [])]
+        return {"batting": batting, "bowling": bowling}
+
+    def available_batters(self, state: dict) -> List[dict]:
+        return [{"id": p['id'], "name": p['name']} for p in self.squads(state)['batting'] if p['available']]
+
+    def bowling_squad(self, state: dict) -> List[dict]:
+        return [{"id": p['id'], "name": p['name']} for p in self.teams.get(state['bowling_team_id'], [])]
+
+
+class RosterCache:
+    """match_id -> MatchRoster, loaded from the read pool on first use."""
+    def __init__(self, ttl: float = ROSTER_CACHE_TTL):
+        self.ttl = ttl
+        self.entries: Dict[int, MatchRoster] = {}
+        self.generations: Dict[int, int] = {}
+        self.epoch = 0
+
+    def _version(self, match_id: int):
+        return (self.epoch, self.generations.get(match_id, 0))
+
+    async def get(self, match_id: int) -> Optional[MatchRoster]:
+        entry = self.entries.get(match_id)
+        if entry is not None and time.monotonic() - entry.loaded_at < self.ttl:
+            return entry
+
+        # 1. Load (a wicket or edit landing meanwhile keeps the result out of the cache)
+        version = self._version(match_id)
+        async with database.read_pool.acquire() as conn:
+            rows = await statements.fetch(conn, "roster_players", match_id)
+            out_rows = await statements.fetch(conn, "roster_outs", match_id)
+        if not rows:
+            return None
+        entry = MatchRoster(rows, out_rows)
+        if self._version(match_id) == version:
+            self.entries[match_id] = entry
+        return entry
+
+    def mark_out(self, match_id: int, inning: int, player_id: int):
+        """A committed wicket: update the cached roster in place."""
+        self.generations[match_id] = self.generations.get(match_id, 0) + 1
+        entry = self.entries.get(match_id)
+        if entry is not None and player_id:
+            entry.outs.setdefault(inning, set()).add(player_id)
+
+    def invalidate(self, match_id: Optional[int] = None):
+        """Call after a write commits. No match_id: player edits, drop everything."""
+        if match_id is None:
+            self.epoch += 1
+            self.entries.clear()
+            return
+        self.generations[match_id] = self.generations.get(match_id, 0) + 1
+        self.entries.pop(match_id, None)
+
+
+roster_cache = RosterCache()
@@ -0,0 +1,95 @@
+import asyncio
+import hmac
+import logging
+import os
+import threading
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from profiler import StackSampler, start_tracemalloc, tracemalloc_report
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Admin endpoints are disabled unless ADMIN_TOKEN is set; callers send it as X-Admin-Token
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# /metrics scrape token, sent as a Bearer token (Prometheus `authorization:`) or
+# X-Admin-Token; defaults to ADMIN_TOKEN
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", ADMIN_TOKEN)
+MAX_PROFILE_SECONDS = 60
+
+_profile_lock = asyncio.Lock()
+
+
+def require_admin(token: str, expected: str = None):
+    expected = ADMIN_TOKEN if expected is None else expected
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+def admin_only(x_admin_token: str = Header(default="")):
+    """require_admin as a route dependency (diagnostics endpoints in main.py)."""
+    require_admin(x_admin_token)
+
+
+def metrics_scraper(authorization: str = Header(default=""), x_admin_token: str = Header(default="")):
+    """Route dependency for /metrics: METRICS_TOKEN as a Bearer token or X-Admin-Token."""
+    scheme, _, credentials = authorization.partition(" ")
+    require_admin(credentials if scheme.lower() == "bearer" else x_admin_token, METRICS_TOKEN)
+
+
+@router.get("/admin/profile")
+async def profile(
+    seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=100),
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+    threads: str = Query("loop", pattern="^(loop|all)$"),
+    include_idle: bool = False,
+    memory: bool = False,
+    x_admin_token: str = Header(default=""),
+):
+    """
+    Wall-clock stack sampling of this worker for `seconds`.
+
+    format=collapsed returns `frame;frame;... count` lines for flamegraph.pl /
+    speedscope; json adds self/inclusive top functions and, with memory=true,
+    the top tracemalloc allocation sites of the window.
+    threads=loop samples only the event-loop thread, all includes worker threads.
+    """
+    require_admin(x_admin_token)
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    async with _profile_lock:
+        # This coroutine runs on the event-loop thread
+        thread_ids = [threading.get_ident()] if threads == "loop" else None
+        sampler = StackSampler(interval_ms / 1000.0, thread_ids, include_idle)
+        traced_here = start_tracemalloc() if memory else False
+        logger.info("Profiling for %.1fs (interval %.1fms, threads=%s, memory=%s)",
+                    seconds, interval_ms, threads, memory)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+            allocations = await asyncio.to_thread(tracemalloc_report, traced_here) if memory else None
+
+    if format == "collapsed":
+        return PlainTextResponse(sampler.collapsed() + "\n")
+
+    busy = sum(sampler.stacks.values())
+    return {
+        "duration_s": round(sampler.duration, 3),
+        "samples": sampler.samples,
+        "busy_samples": busy,
+        "idle_samples": sampler.idle_samples,
+        "busy_percent": round(busy * 100 / sampler.samples, 1) if sampler.samples else 0.0,
+        "top_self": sampler.top_functions(),
+        "top_inclusive": sampler.inclusive_functions(),
+        "collapsed": sampler.collapsed(),
+        "tracemalloc": allocations,
+    }
@@ -1,10 +1,14 @@
+import logging
 from fastapi import APIRouter
 import database
 from common import (
     fetch_match_state, swap_strikers, SimpleMatchRequest
 )
-from routes.matches import fetch_full_match_state
-from sse_manager import manager
+from routes.matches import store_live_state
+from live_updates import publish_match_state, ack
+from roster_cache import roster_cache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -15,7 +19,8 @@ async def undo_last_ball(match_id: int):
     return await undo_last_action(dummy_payload)
 
 @router.post("/undo_last_action")
-async def undo_last_action(payload: SimpleMatchRequest):
+async def undo_last_action(payload: SimpleMatchRequest, response: str = "full"):
+    """?response=ack: reply with the outcome and new state version only (live_updates.ack)."""
     try:
         async with database.db_pool.acquire() as conn:
             async with conn.transaction():
@@ -37,7 +42,7 @@ async def undo_last_action(payload: SimpleMatchRequest):
                 event_row_id = last_event['id']
                 target_id = last_event['event_id']
 
-                print(f"UNDO: Found event {event_type} (ID: {target_id})")
+                logger.info("UNDO: match %s event %s (ID: %s)", match_id, event_type, target_id)
 
                 # ==========================================
                 # CASE A: UNDO A BALL
@@ -137,13 +142,19 @@ async def undo_last_action(payload: SimpleMatchRequest):
                     await conn.execute("UPDATE players SET is_batted = FALSE WHERE id = $1", target_id)
                     await conn.execute("DELETE FROM match_events WHERE id = $1", event_row_id)
 
-                # 5. Broadcast Update
-                full_state = await fetch_full_match_state(conn, match_id)
-                await manager.broadcast(match_id, full_state)
-                
-                return {"status": "success", "message": "Undo Successful", "data": full_state}
+                full_state = await store_live_state(conn, match_id)
+
+            # A restored wicket puts the batter back in the squad lists
+            if event_type == 'BALL' and ball['is_wicket']:
+                roster_cache.invalidate(match_id)
+
+            # 5. Broadcast Update (after commit)
+            await publish_match_state(match_id, full_state)
+            if response == "ack":
+                return ack(match_id, {"status": "success", "message": "Undo Successful"})
+            
+            return {"status": "success", "message": "Undo Successful", "data": full_state}
 
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error undoing last action for match %s", payload.match_id)
         return {"status": "error", "message": str(e)}
\ No newline at end of file
@@ -1,8 +1,13 @@
+import logging
 from fastapi import APIRouter, HTTPException, Query
 import database
+import statements
+from utils.match_helpers import to_ball_records
 from pydantic import BaseModel
 from typing import List, Optional
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 class CommentaryBall(BaseModel):
@@ -35,7 +40,7 @@ class CommentaryResponse(BaseModel):
 @router.get("/match/{match_id}/commentary")
 async def get_match_commentary(match_id: int, inning: Optional[int] = None):
     try:
-        async with database.db_pool.acquire() as conn:
+        async with database.read_pool.acquire() as conn:
             # 1. Determine Inning
             if inning is None:
                 match = await conn.fetchrow("SELECT current_inning FROM matches WHERE id = $1", match_id)
@@ -43,43 +48,17 @@ async def get_match_commentary(match_id: int, inning: Optional[int] = None):
                     raise HTTPException(status_code=404, detail="Match not found")
                 inning = match['current_inning']
 
-            # 2. Fetch Ball-by-Ball Data with Joins
-            # We need: runs, extras, wicket info, batter name, bowler name
-            query = """
-                SELECT 
-                    b.id, b.over_no, b.ball_no, 
-                    b.runs_off_bat, b.extras, b.extra_type, 
-                    b.is_wicket,
-                    p_bat.name as batter_name,
-                    p_bowl.name as bowler_name,
-                    
-                    w.wicket_type,
-                    p_out.name as player_out_name
-                    
-                FROM balls b
-                JOIN players p_bat ON b.striker_id = p_bat.id
-                JOIN players p_bowl ON b.bowler_id = p_bowl.id
-                LEFT JOIN wickets w ON b.id = w.ball_id
-                LEFT JOIN players p_out ON w.player_out_id = p_out.id
-                
-                WHERE b.match_id = $1 AND b.inning_no = $2
-                ORDER BY b.id DESC
-            """
-            
-            rows = await conn.fetch(query, match_id, inning)
-            
+            # 2. Fetch Ball-by-Ball Data (ASCENDING, so the running score is easy to build)
+            balls = to_ball_records(await statements.fetch(conn, "commentary_balls", match_id, inning))
+
+            # Names for everyone involved, in one lookup instead of three joins per ball
+            player_ids = {pid for b in balls for pid in (b.striker_id, b.bowler_id, b.player_out_id) if pid}
+            names = {r['id']: r['name'] for r in await statements.fetch(conn, "player_names", list(player_ids))}
+            # Balls without a known batter and bowler (e.g. scored before a bowler
+            # was picked) stay out of the commentary, as the old inner joins did
+            balls = [b for b in balls if b.striker_id in names and b.bowler_id in names]
+
             # 3. Process into Timeline Events
-            events = []
-            
-            # Track score for "End of Over" calculation (reverse order traversal logic needed?)
-            # Actually, to generate "End of Over 1: 10/0", we need the cumulative score at that point.
-            # But we are iterating in REVERSE (latest first).
-            # So, we can't easily calculate cumulative score unless we fetch the FINAL score and subtract?
-            # OR, we fetch all balls ASCENDING, build the timeline, then reverse it.
-            
-            # Let's re-fetch ASCENDING for easier calculation
-            rows_asc = await conn.fetch(query.replace("ORDER BY b.id DESC", "ORDER BY b.id ASC"), match_id, inning)
-            
             timeline = []
             
             total_runs = 0
@@ -91,7 +70,7 @@ async def get_match_commentary(match_id: int, inning: Optional[int] = None):
             last_bowler = ""
             
             # Iterate ASCENDING to build state
-            for row in rows_asc:
+            for b in balls:
                 # Check for New Over
                 # Note: over_no starts at 0 or 1? usually 0-indexed in DB based on typical schemas, 
                 # but let's assume 0.0 means 1st over.
@@ -99,7 +78,7 @@ async def get_match_commentary(match_id: int, inning: Optional[int] = None):
                 # Check if we moved to a new over
                 # But wait, we want "End of Over" AFTER the balls of that over.
                 
-                this_over = row['over_no']
+                this_over = b.over_no
                 if current_over != -1 and this_over > current_over:
                     # Summary for the completed over (current_over)
                     summary = {
@@ -120,14 +99,16 @@ async def get_match_commentary(match_id: int, inning: Optional[int] = None):
                 if current_over != this_over:
                     current_over = this_over
                 
-                last_bowler = row['bowler_name']
+                bowler_name = names.get(b.bowler_id)
+                batter_name = names.get(b.striker_id)
+                last_bowler = bowler_name
                 
                 # Ball Event
-                runs = row['runs_off_bat'] + row['extras']
+                runs = b.runs_off_bat + b.extras
                 total_runs += runs
                 over_runs += runs
                 
-                if row['is_wicket']:
+                if b.is_wicket:
                     total_wickets += 1
                     over_wickets += 1
                 
@@ -138,30 +119,30 @@ async def get_match_commentary(match_id: int, inning: Optional[int] = None):
                 # "Abc to Ajay, OUT (Caught)"
                 
                 ball_text = ""
-                if row['is_wicket']:
-                    w_type = row['wicket_type'] or "out"
-                    ball_text = f"{row['bowler_name']} to {row['player_out_name']}, OUT ({w_type})"
-                elif row['runs_off_bat'] == 4:
-                    ball_text = f"{row['bowler_name']} to {row['batter_name']}, FOUR"
-                elif row['runs_off_bat'] == 6:
-                    ball_text = f"{row['bowler_name']} to {row['batter_name']}, SIX"
+                if b.is_wicket:
+                    w_type = b.wicket_type or "out"
+                    ball_text = f"{bowler_name} to {names.get(b.player_out_id)}, OUT ({w_type})"
+                elif b.runs_off_bat == 4:
+                    ball_text = f"{bowler_name} to {batter_name}, FOUR"
+                elif b.runs_off_bat == 6:
+                    ball_text = f"{bowler_name} to {batter_name}, SIX"
                 else:
                     run_str = "run" if runs == 1 else "runs"
                     extra_str = ""
-                    if row['extras'] > 0:
-                        extra_str = f" ({row['extra_type']} {row['extras']})"
+                    if b.extras > 0:
+                        extra_str = f" ({b.extra_type} {b.extras})"
                     
-                    ball_text = f"{row['bowler_name']} to {row['batter_name']}, {runs} {run_str}{extra_str}"
+                    ball_text = f"{bowler_name} to {batter_name}, {runs} {run_str}{extra_str}"
                 
                 ball_event = {
                     "type": "ball",
-                    "over": row['over_no'],
-                    "ball": row['ball_no'], # 1-6 usually
-                    "runs_bat": row['runs_off_bat'],
-                    "extras": row['extras'],
-                    "extra_type": row['extra_type'],
-                    "is_wicket": row['is_wicket'],
-                    "batter": row['batter_name'],
+                    "over": b.over_no,
+                    "ball": b.ball_no, # 1-6 usually
+                    "runs_bat": b.runs_off_bat,
+                    "extras": b.extras,
+                    "extra_type": b.extra_type,
+                    "is_wicket": b.is_wicket,
+                    "batter": batter_name,
                     "commentary": ball_text
                 }
                 timeline.append(ball_event)
@@ -174,7 +155,7 @@ async def get_match_commentary(match_id: int, inning: Optional[int] = None):
             # No, "End of Over" usually implies the over is DONE.
             # But the detailed image shows "End of over: 1 | 10 runs..."
             # Let's add a summary for the current state if balls exist
-            if rows_asc:
+            if balls:
                  # Check if the last ball was valid ball 6? Or just show summary so far?
                  # Image shows "End of over: 1" implies over 1 is done.
                  # If we are in over 0.3, we don't show "End of over 1".
@@ -190,5 +171,5 @@ async def get_match_commentary(match_id: int, inning: Optional[int] = None):
             }
 
     except Exception as e:
-        print(f"Error serving commentary: {e}")
+        logger.exception("Error serving commentary")
         return {"error": str(e)}
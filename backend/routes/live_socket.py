@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from common import ScoreUpdate, NewBatsmanRequest, SimpleMatchRequest
+from state_cache import state_cache
+from ws_hub import ws_hub, encode, decode, supported
+from . import matches, scoring
+from .buttons import undo
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Scorer actions over the socket -> the same handlers as the HTTP routes
+# (`response`: "ack" for the lean reply where the route has one)
+ACTIONS = {
+    "update_score": lambda mid, d, response: scoring.update_score(ScoreUpdate(**d, match_id=mid), response),
+    "undo": lambda mid, d, response: undo.undo_last_action(SimpleMatchRequest(match_id=mid), response),
+    "set_batsman": lambda mid, d, response: matches.set_batsman(mid, NewBatsmanRequest(**d, match_id=mid)),
+    "set_bowler": lambda mid, d, response: matches.set_bowler(mid, matches.SetBowlerRequest(**d)),
+    "rotate_strike": lambda mid, d, response: matches.rotate_strike(mid),
+    "end_inning": lambda mid, d, response: scoring.end_inning(SimpleMatchRequest(match_id=mid)),
+}
+
+
+async def run_action(match_id: int, message: dict) -> dict:
+    """One client message -> its reply frame ({"t": "ack"} or {"t": "error"}, echoing "id")."""
+    request_id = message.get("id")
+    action = ACTIONS.get(message.get("action"))
+    if action is None:
+        return {"t": "error", "id": request_id, "status": 400, "detail": f"action must be one of: {', '.join(ACTIONS)}"}
+    try:
+        data = dict(message.get("data") or {})
+        data.pop("match_id", None)  # the socket's match, always
+        result = await action(match_id, data, message.get("response", "full"))
+    except ValidationError as e:
+        return {"t": "error", "id": request_id, "status": 422, "detail": e.errors(include_url=False)}
+    except (TypeError, ValueError) as e:
+        return {"t": "error", "id": request_id, "status": 400, "detail": str(e)}
+    except HTTPException as e:
+        return {"t": "error", "id": request_id, "status": e.status_code, "detail": e.detail}
+    except Exception:
+        logger.exception("Socket action %s failed for match %s", message.get("action"), match_id)
+        return {"t": "error", "id": request_id, "status": 500, "detail": "Internal error"}
+    return {"t": "ack", "id": request_id, "d": jsonable_encoder(result)}
+
+
+async def send(websocket: WebSocket, message):
+    if isinstance(message, bytes):
+        await websocket.send_bytes(message)
+    else:
+        await websocket.send_text(message)
+
+
+async def send_frames(websocket: WebSocket, q: asyncio.Queue, fmt: str, last_seq):
+    """The socket's only writer once connected: broadcast frames and action replies, in queue order."""
+    try:
+        while True:
+            item = await q.get()
+            if item is None:  # drained or reaped
+                await websocket.close(code=1012)
+                return
+            if isinstance(item, dict):  # action reply
+                await send(websocket, encode(item, fmt))
+            elif last_seq is None or item.seq > last_seq:  # else covered by the state sent on connect
+                await send(websocket, item.encoded(last_seq, fmt))
+                last_seq = item.seq
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # client gone; the receive loop sees the disconnect and cleans up
+
+
+@router.websocket("/ws/{match_id}")
+async def match_socket(websocket: WebSocket, match_id: int, format: str = "json", feed: bool = True):
+    """
+    Live match over one WebSocket, an optional alternative to SSE + POSTs.
+
+    Server -> client: {"t": "state", "seq", "d": state} first, then per update
+    {"t": "delta", "seq", "base", "d": changed top-level keys, "x": removed keys}
+    (a full "state" again whenever the socket missed the base). ?format=msgpack
+    sends binary MessagePack frames instead of JSON text; ?feed=false (scorer
+    consoles that only send actions) gets no updates.
+
+    Client -> server: {"id", "action", "data"} with action one of ACTIONS and
+    data the body of the matching HTTP route (plus "response": "ack" for the
+    lean reply); answered by {"t": "ack", "id", "d": route response} or
+    {"t": "error", "id", "status", "detail"}.
+    Keep-alive pings are the server's (uvicorn --ws-ping-interval).
+    """
+    await websocket.accept()
+    if not supported(format):
+        # 1003 = unsupported data
+        await websocket.close(code=1003, reason="format must be json or msgpack (msgpack installed on the server)")
+        return
+    # Same caps as the SSE endpoints; 1013 = try again later
+    if not ws_hub.admit(match_id):
+        await websocket.close(code=1013, reason="Too many live viewers, retry shortly")
+        return
+
+    # 1. Subscribe (feedless sockets still get a queue: it carries the replies)
+    q = ws_hub.subscribe(match_id, feed)
+    sender = None
+    try:
+        # 2. Current state first (sent before the sender starts: frames queued
+        #    meanwhile follow it, and ones it already covers are skipped)
+        last_seq = None
+        if feed:
+            entry = await state_cache.get_entry(match_id)
+            if entry is not None:
+                last_seq = ws_hub.seen(match_id, entry.state)
+                await send(websocket, encode({"t": "state", "seq": last_seq, "d": entry.state}, format))
+        sender = asyncio.create_task(send_frames(websocket, q, format, last_seq))
+
+        # 3. Actions, one at a time so a scorer's balls apply in the order sent
+        while True:
+            raw = await websocket.receive()
+            if raw["type"] == "websocket.disconnect":
+                break
+            try:
+                message = decode(raw.get("bytes") if raw.get("bytes") is not None else raw.get("text"))
+                if not isinstance(message, dict):
+                    raise ValueError("expected an object: {id, action, data}")
+            except (ValueError, TypeError) as e:
+                q.put_nowait({"t": "error", "id": None, "status": 400, "detail": str(e)})
+                continue
+            q.put_nowait(await run_action(match_id, message))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # 4. Disconnect or drain
+        ws_hub.unsubscribe(match_id, q)
+        if sender is not None:
+            sender.cancel()
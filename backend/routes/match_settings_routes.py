@@ -1,6 +1,11 @@
+import logging
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import database
+from live_updates import publish_match_state
+from routes.matches import store_live_state
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -56,28 +61,31 @@ async def update_match_settings(match_id: int, settings: MatchSettingsUpdate):
 
             # 4. Update Database
             # We map settings.match_status -> match_type in the DB
-            await conn.execute("""
-                UPDATE matches 
-                SET match_number = $1::INTEGER, 
-                    total_overs = $2::INTEGER, 
-                    balls_per_over = $3::INTEGER,
-                    match_type = $4::TEXT,
-                    toss_winner_id = $5::BIGINT,
-                    toss_decision = $7::TEXT,
-                    batting_team_id = $6::BIGINT
-                WHERE id = $8::BIGINT
-            """, 
-            settings.match_number, 
-            settings.total_overs, 
-            settings.balls_per_over, 
-            settings.match_status, 
-            settings.toss_winner_id,
-            final_batting_team_id,
-            toss_decision,
-            match_id)
+            async with conn.transaction():
+                await conn.execute("""
+                    UPDATE matches 
+                    SET match_number = $1::INTEGER, 
+                        total_overs = $2::INTEGER, 
+                        balls_per_over = $3::INTEGER,
+                        match_type = $4::TEXT,
+                        toss_winner_id = $5::BIGINT,
+                        toss_decision = $7::TEXT,
+                        batting_team_id = $6::BIGINT
+                    WHERE id = $8::BIGINT
+                """, 
+                settings.match_number, 
+                settings.total_overs, 
+                settings.balls_per_over, 
+                settings.match_status, 
+                settings.toss_winner_id,
+                final_batting_team_id,
+                toss_decision,
+                match_id)
+                state = await store_live_state(conn, match_id)
 
+            await publish_match_state(match_id, state)
             return {"status": "success", "message": "Match settings updated successfully"}
 
     except Exception as e:
-        print(f"Error updating settings: {e}")
+        logger.exception("Error updating settings")
         raise HTTPException(status_code=500, detail=str(e))
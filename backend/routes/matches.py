@@ -1,39 +1,32 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Optional, Tuple
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse, Response
 import database
 from common import (
     fetch_match_state, build_match_response, fetch_player, 
     SimpleMatchRequest, NewBatsmanRequest, SquadSelectionRequest, EndMatchRequest, CreateMatchRequest
 )
-from utils.match_helpers import calculate_match_score, get_player_stats, format_timeline
+from utils.match_helpers import (
+    calculate_match_score, get_player_stats, format_timeline, build_inning_scorecard, to_ball_records
+)
 from pydantic import BaseModel
-import os
-import glob
-
-# Constants for Logo Search
-BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # backend/routes
-BACKEND_DIR = os.path.dirname(BASE_DIR) # backend
-PROJECT_DIR = os.path.dirname(BACKEND_DIR) # root
-LOGO_DIR_ABS = os.path.join(PROJECT_DIR, "frontend", "static", "logos")
+from logo_index import logo_index
+import statements
+from state_cache import state_cache
+from live_updates import publish_match_state
+from roster_cache import roster_cache
+import ticker
 
 def find_logo_for_team(team_id: int):
     """
-    Looks for a file matching team_{team_id}_* in the logos directory.
-    Returns the web-accessible path if found, matches the format used in teams.py.
+    Returns the newest uploaded logo for a team (format used in teams.py).
+    Served from the in-memory index; no filesystem access on the hot path.
     """
-    if not os.path.exists(LOGO_DIR_ABS):
-        return None
-    
-    # Search for team_{id}_*
-    pattern = os.path.join(LOGO_DIR_ABS, f"team_{team_id}_*")
-    matching_files = glob.glob(pattern)
-    
-    if matching_files:
-        # Take the first match
-        full_path = matching_files[0]
-        filename = os.path.basename(full_path)
-        return f"/static/logos/{filename}"
-    
-    return None
+    return logo_index.get(team_id)
 
 # Schema for setting the bowler
 class SetBowlerRequest(BaseModel):
@@ -54,27 +47,14 @@ class ScoreCorrectionRequest(BaseModel):
     target_overs: str # Format "X.Y"
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 async def fetch_full_match_state(conn, match_id: int):
     # 1. Fetch Basic Match Info (Added LOGOS, Match No, Match Type)
     # OPTIMIZED: Uses LEFT JOIN and explicit logo column
-    match = await conn.fetchrow("""
-             SELECT m.id, m.current_inning, m.total_overs, m.target_score, 
-                    m.status, m.result_message,
-                    m.current_striker_id, m.non_striker_id, m.current_bowler_id,
-                    m.toss_winner_id, m.toss_decision,
-                    m.team_a_id, m.team_b_id,
-                    m.batting_team_id, m.bowling_team_id,
-                    m.match_number, m.match_type,
-
-                    t1.name as team_a_name, t1.short_name as team_a_short, t1.logo as team_a_logo, t1.team_color as team_a_color,
-                    t2.name as team_b_name, t2.short_name as team_b_short, t2.logo as team_b_logo, t2.team_color as team_b_color
-             FROM matches m
-             LEFT JOIN teams t1 ON m.team_a_id = t1.id
-             LEFT JOIN teams t2 ON m.team_b_id = t2.id
-             WHERE m.id = $1
-    """, match_id)
+    match = await statements.fetchrow(conn, "state_header", match_id)
 
     if not match:
         return None
@@ -110,13 +90,12 @@ async def fetch_full_match_state(conn, match_id: int):
     # NEW: FETCH ALL DATA IN BULK (Optimization)
     # ======================================================
     
-    # A. Fetch All Balls
-    balls_rows = await conn.fetch("SELECT * FROM balls WHERE match_id = $1 ORDER BY id", match_id)
-    all_balls = [dict(b) for b in balls_rows]
+    # A. Fetch All Balls (only the columns the helpers read, as compact tuples)
+    all_balls = to_ball_records(await statements.fetch(conn, "state_balls", match_id))
     
     # B. Fetch Adjustments
     current_inn = match.get('current_inning', 1)
-    adj_row = await conn.fetchrow("SELECT * FROM score_adjustments WHERE match_id = $1 AND inning_no = $2", match_id, current_inn)
+    adj_row = await statements.fetchrow(conn, "score_adjustment", match_id, current_inn)
     adjustments = dict(adj_row) if adj_row else None
 
     # ======================================================
@@ -140,7 +119,7 @@ async def fetch_full_match_state(conn, match_id: int):
     # Helper to fetch player details (could be optimized with bulk fetch, but keeping simple for now)
     async def get_details(pid, on_strike):
         if not pid: return None
-        p_row = await conn.fetchrow("SELECT id, name, photo_url FROM players WHERE id=$1", pid)
+        p_row = await statements.fetchrow(conn, "player_card", pid)
         if not p_row: return None
         
         # Get stats from our computed dict
@@ -171,7 +150,7 @@ async def fetch_full_match_state(conn, match_id: int):
     bowler_obj = None
     
     if current_bowler_id:
-        b_row = await conn.fetchrow("SELECT id, name, photo_url FROM players WHERE id=$1", current_bowler_id)
+        b_row = await statements.fetchrow(conn, "player_card", current_bowler_id)
         if b_row:
              stats = player_data['bowling'].get(current_bowler_id, 
                         {'runs_conceded':0, 'wickets':0, 'dots':0, 'extras':0, 'legal_balls':0})
@@ -198,19 +177,7 @@ async def fetch_full_match_state(conn, match_id: int):
     # Note: We could move this to helper too, but it requires Player Name Joins.
     # For safety, I'll keep the specific SQL for "Last Out" as it's just one query.
     
-    last_wicket_row = await conn.fetchrow("""
-        SELECT 
-            w.player_out_id, w.wicket_type,
-            p_out.name as batter_name, 
-            p_bowl.name as bowler_name
-        FROM balls b
-        JOIN wickets w ON w.ball_id = b.id
-        JOIN players p_out ON w.player_out_id = p_out.id
-        JOIN players p_bowl ON b.bowler_id = p_bowl.id
-        WHERE b.match_id = $1 AND b.inning_no = $2 AND b.is_wicket = TRUE
-        ORDER BY b.id DESC
-        LIMIT 1
-    """, match_id, current_inn)
+    last_wicket_row = await statements.fetchrow(conn, "last_wicket", match_id, current_inn)
     
     last_out_data = None
     if last_wicket_row:
@@ -243,7 +210,7 @@ async def fetch_full_match_state(conn, match_id: int):
     
     if current_inn == 2:
         # We can re-use calculate_match_score but need adjustments for inning 1
-        adj_inn1_row = await conn.fetchrow("SELECT * FROM score_adjustments WHERE match_id = $1 AND inning_no = 1", match_id)
+        adj_inn1_row = await statements.fetchrow(conn, "score_adjustment", match_id, 1)
         adj_inn1 = dict(adj_inn1_row) if adj_inn1_row else None
         
         # Hack: Mutate match object temporarily or pass inning explicitly to helper?
@@ -266,19 +233,19 @@ async def fetch_full_match_state(conn, match_id: int):
     last_wkt_ball = None
     # Reverse search for wicket
     for b in reversed(all_balls):
-        if b['match_id'] == match_id and b['inning_no'] == current_inn and b['is_wicket']:
+        if b.inning_no == current_inn and b.is_wicket:
             last_wkt_ball = b
             break
             
-    start_id = last_wkt_ball['id'] if last_wkt_ball else 0
+    start_id = last_wkt_ball.id if last_wkt_ball else 0
     
     part_runs = 0
     part_balls = 0
     
     for b in all_balls:
-        if b['match_id'] == match_id and b['inning_no'] == current_inn and b['id'] > start_id:
-            part_runs += (b['runs_off_bat'] or 0) + (b['extras'] or 0)
-            et = b.get('extra_type')
+        if b.inning_no == current_inn and b.id > start_id:
+            part_runs += (b.runs_off_bat or 0) + (b.extras or 0)
+            et = b.extra_type
             if et not in ('wide', 'no-ball', 'noball'):
                 part_balls += 1
                 
@@ -340,152 +307,41 @@ async def fetch_full_match_state(conn, match_id: int):
         "current_bowler": bowler_obj
     }
 
+async def store_live_state(conn, match_id: int):
+    """
+    Render the match state on the write connection and save it to
+    matches.live_state. Call inside the write's transaction: the stored state
+    commits or rolls back with the write, and any process can serve it with
+    one primary-key read (main.load_match_state).
+    """
+    state = await fetch_full_match_state(conn, match_id)
+    if state:
+        await statements.execute(conn, "store_live_state", match_id, json.dumps(state))
+    return state
+
+
 @router.get("/matches/{match_id}/scorecard")
 async def get_match_scorecard(match_id: int):
-    async with database.db_pool.acquire() as conn:
+    async with database.read_pool.acquire() as conn:
         # 1. Fetch Players Lookups
-        players = await conn.fetch("SELECT id, name FROM players")
+        players = await statements.fetch(conn, "scorecard_players")
         p_map = {p['id']: p['name'] for p in players}
 
         # 2. Fetch All Balls with Wicket Details
-        balls = await conn.fetch("""
-            SELECT b.*, w.player_out_id, w.wicket_type, w.fielder_id as catcher_id
-            FROM balls b
-            LEFT JOIN wickets w ON b.id = w.ball_id
-            WHERE b.match_id = $1 
-            ORDER BY b.id ASC
-        """, match_id)
-
-        # 3. Helper to Process an Inning
-        def process_inning(inning_num):
-            inn_balls = [b for b in balls if b['inning_no'] == inning_num]
-            if not inn_balls:
-                return None
-
-            # Data Structures
-            batting = {} # {player_id: {runs, balls, 4s, 6s, out_desc}}
-            bowling = {} # {player_id: {runs, balls, wkts, dots}}
-            extras = {"total": 0, "b": 0, "lb": 0, "w": 0, "nb": 0, "p": 0}
-            total_runs = 0
-            wickets = 0
-            
-            # To track "Did Not Bat", we need the full squad for this inning's batting team.
-            # (Skipping "Did Not Bat" logic for simplicity in this step, relies on frontend knowing squad)
-
-            for b in inn_balls:
-                # --- Batting Stats ---
-                sid = b['striker_id']
-                if sid not in batting: batting[sid] = {'runs': 0, 'balls': 0, '4s': 0, '6s': 0, 'out': 'not out'}
-                
-                # Only count ball if not wide
-                if b['extra_type'] != 'wide':
-                    batting[sid]['balls'] += 1
-                
-                batting[sid]['runs'] += b['runs_off_bat']
-                if b['runs_off_bat'] == 4: batting[sid]['4s'] += 1
-                if b['runs_off_bat'] == 6: batting[sid]['6s'] += 1
-
-                # Wicket Logic
-                if b['is_wicket']:
-                    wickets += 1
-                    out_p = b['player_out_id'] or sid
-                    if out_p not in batting: batting[out_p] = {'runs': 0, 'balls': 0, '4s': 0, '6s': 0, 'out': 'out'}
-                    
-                    # Build Out Description
-                    w_type = b['wicket_type']
-                    bowler_name = p_map.get(b['bowler_id'], 'Unknown')
-                    catcher_name = p_map.get(b['catcher_id'], 'Unknown')
-                    
-                    desc = w_type
-                    if w_type == "bowled": desc = f"b {bowler_name}"
-                    elif w_type == "caught": desc = f"c {catcher_name} b {bowler_name}"
-                    elif w_type == "lbw": desc = f"lbw b {bowler_name}"
-                    elif w_type == "runout": desc = f"runout ({catcher_name})"
-                    elif w_type == "stumped": desc = f"st {catcher_name} b {bowler_name}"
-                    
-                    batting[out_p]['out'] = desc
-
-                # --- Bowling Stats ---
-                bid = b['bowler_id']
-                if bid not in bowling: bowling[bid] = {'runs': 0, 'balls': 0, 'wkts': 0, 'dots': 0}
-                
-                # Valid ball count
-                is_legal = b['extra_type'] in [None, 'bye', 'leg-bye', 'wicket']
-                if is_legal:
-                    bowling[bid]['balls'] += 1
-                
-                # Runs Conceded (Batsman runs + Wides + No Balls)
-                run_cost = b['runs_off_bat']
-                if b['extra_type'] in ['wide', 'noball']:
-                    run_cost += b['extras']
-                
-                bowling[bid]['runs'] += run_cost
-
-                if b['is_wicket'] and b['wicket_type'] not in ['runout', 'retired']:
-                    bowling[bid]['wkts'] += 1
-                
-                if run_cost == 0:
-                     bowling[bid]['dots'] += 1
-
-                # --- Extras ---
-                total_runs += (b['runs_off_bat'] + b['extras'])
-                if b['extras'] > 0:
-                    extras['total'] += b['extras']
-                    et = b['extra_type']
-                    if et == 'wide': extras['w'] += b['extras']
-                    elif et == 'noball': extras['nb'] += b['extras']
-                    elif et == 'leg-bye': extras['lb'] += b['extras']
-                    elif et == 'bye': extras['b'] += b['extras']
-                    elif et == 'penalty': extras['p'] += b['extras']
-
-            # Convert Dicts to Lists
-            batting_list = []
-            for pid, stats in batting.items():
-                sr = 0.0
-                if stats['balls'] > 0: sr = round((stats['runs'] / stats['balls']) * 100, 2)
-                batting_list.append({
-                    "name": p_map.get(pid, "Unknown"),
-                    **stats,
-                    "sr": sr
-                })
-            
-            bowling_list = []
-            for pid, stats in bowling.items():
-                overs = f"{stats['balls'] // 6}.{stats['balls'] % 6}"
-                econ = 0.0
-                # Calculate Econ (Runs / Overs)
-                # Avoid div by zero. 1 ball = 0.166 overs
-                actual_overs = stats['balls'] / 6
-                if actual_overs > 0: econ = round(stats['runs'] / actual_overs, 2)
-                
-                bowling_list.append({
-                    "name": p_map.get(pid, "Unknown"),
-                    **stats,
-                    "overs_display": overs,
-                    "econ": econ
-                })
-
-            return {
-                "batting": batting_list,
-                "bowling": bowling_list,
-                "extras": extras,
-                "total": total_runs,
-                "wickets": wickets,
-                "overs": f"{len([b for b in inn_balls if b['extra_type'] in [None, 'bye', 'leg-bye', 'wicket']]) // 6}.{len([b for b in inn_balls if b['extra_type'] in [None, 'bye', 'leg-bye', 'wicket']]) % 6}"
-            }
+        balls = to_ball_records(await statements.fetch(conn, "scorecard_balls", match_id))
 
         return {
-            "inning1": process_inning(1),
-            "inning2": process_inning(2)
+            "inning1": build_inning_scorecard(balls, 1, p_map),
+            "inning2": build_inning_scorecard(balls, 2, p_map)
         }
 
 
 @router.get("/matches")
 async def get_matches(tournament_id: int):
-    async with database.db_pool.acquire() as conn:
-        matches = await conn.fetch("""
+    async with database.read_pool.acquire() as conn:
+        matches = await conn.fetch(f"""
             SELECT 
-                m.*, 
+                {statements.MATCH_COLUMNS}, 
                 ROW_NUMBER() OVER (PARTITION BY m.tournament_id ORDER BY m.id ASC) as visual_number
             FROM matches m
             WHERE m.tournament_id = $1
@@ -496,12 +352,62 @@ async def get_matches(tournament_id: int):
         return [dict(m) for m in matches]
 
 @router.get("/match_data")
-async def get_match_data(match_id: int):
-    async with database.db_pool.acquire() as conn:
-        state = await fetch_full_match_state(conn, match_id)
-        if not state:
-            raise HTTPException(status_code=404, detail="Match not found")
-        return state
+async def get_match_data(match_id: int, if_none_match: Optional[str] = Header(None)):
+    # Served from the state cache; misses rebuild from the read pool (see main.py)
+    entry = await state_cache.get_entry(match_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Match not found")
+    # Revalidated every time; unchanged state -> 304, no body
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if if_none_match and entry.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body(), media_type="application/json", headers=headers)
+
+@router.get("/matches/{match_id}/ticker")
+async def get_match_ticker(match_id: int, format: str = "json"):
+    """The ticker message of /stream/{id}/ticker, for embeds that poll."""
+    state = await state_cache.get(match_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Match not found")
+    if format == "text":
+        return PlainTextResponse(ticker.ticker_text(state))
+    return Response(ticker.ticker_json(state), media_type="application/json")
+
+
+# match_id -> (state_cache version, built_at, payload)
+bootstrap_cache: Dict[int, Tuple[tuple, float, dict]] = {}
+
+@router.get("/matches/{match_id}/bootstrap")
+async def get_match_bootstrap(match_id: int):
+    """
+    Everything the scorer page loads up front, in one round trip: match state,
+    both squads with availability flags, and the team list. Cached per match
+    version, so it is only rebuilt after a write that touches the match.
+    """
+    version = state_cache.version(match_id)
+    cached = bootstrap_cache.get(match_id)
+    if cached and cached[0] == version and time.monotonic() - cached[1] < state_cache.ttl:
+        return cached[2]
+
+    async def fetch_teams():
+        async with database.read_pool.acquire() as conn:
+            return await statements.fetch(conn, "teams_list")
+
+    # 1. State and rosters (memory, or their own read connections) alongside the teams query
+    state, roster, teams = await asyncio.gather(
+        state_cache.get(match_id), roster_cache.get(match_id), fetch_teams())
+    if not state or not roster:
+        raise HTTPException(status_code=404, detail="Match not found")
+
+    # 2. Assemble; only cache it if no write landed while we were reading
+    payload = {
+        "state": state,
+        "squads": roster.squads(state),
+        "teams": [dict(t) for t in teams],
+    }
+    if state_cache.version(match_id) == version:
+        bootstrap_cache[match_id] = (version, time.monotonic(), payload)
+    return payload
 
 @router.post("/matches")
 async def create_match(payload: CreateMatchRequest):
@@ -533,7 +439,7 @@ async def create_match(payload: CreateMatchRequest):
             return {"status": "success", "match_id": match_id, "message": "Match created successfully"}
 
     except Exception as e:
-        print(f"Error creating match: {e}")
+        logger.exception("Error creating match")
         return {"error": str(e)}
 
 @router.post("/matches/{match_id}/set_batsman")
@@ -543,105 +449,44 @@ async def set_batsman(match_id: int, payload: NewBatsmanRequest):
             # 1. Determine which slot to fill (Striker or Non-Striker)
             column_name = "current_striker_id" if payload.role == "striker" else "non_striker_id"
             
-            # 2. Update the Match Table
-            # Note: payload uses new_player_id based on common.py definition
-            await conn.execute(f"""
-                UPDATE matches 
-                SET {column_name} = $1 
-                WHERE id = $2
-            """, payload.new_player_id, match_id)
-            
-            # 3. Mark player as 'is_batted' (optional but good practice)
-            await conn.execute("UPDATE players SET is_batted = TRUE WHERE id = $1", payload.new_player_id)
-            
-            # --- NEW: LOG EVENT FOR UNDO ---
-            await conn.execute("INSERT INTO match_events (match_id, event_type, event_id) VALUES ($1, 'NEW_BATTER', $2)", match_id, payload.new_player_id)
-            # -------------------------------
-            
-            return await fetch_full_match_state(conn, match_id)
+            async with conn.transaction():
+                # 2. Update the Match Table
+                # Note: payload uses new_player_id based on common.py definition
+                await conn.execute(f"""
+                    UPDATE matches 
+                    SET {column_name} = $1 
+                    WHERE id = $2
+                """, payload.new_player_id, match_id)
+                
+                # 3. Mark player as 'is_batted' (optional but good practice)
+                await conn.execute("UPDATE players SET is_batted = TRUE WHERE id = $1", payload.new_player_id)
+                
+                # --- NEW: LOG EVENT FOR UNDO ---
+                await conn.execute("INSERT INTO match_events (match_id, event_type, event_id) VALUES ($1, 'NEW_BATTER', $2)", match_id, payload.new_player_id)
+                # -------------------------------
+                
+                state = await store_live_state(conn, match_id)
+            await publish_match_state(match_id, state)
+            return state
             
     except Exception as e:
-        print(f"Error setting batsman: {e}")
+        logger.exception("Error setting batsman")
         return {"error": str(e)}
 
 @router.get("/available_players")
 async def get_available_players(match_id: int):
-    try:
-        async with database.db_pool.acquire() as conn:
-            match = await fetch_match_state(conn, match_id)
-            if not match: return {"error": "Match not found"}
-            
-            striker_id = match['current_striker_id']
-            non_striker_id = match['non_striker_id']
-            current_ids = []
-            if striker_id: current_ids.append(striker_id)
-            if non_striker_id: current_ids.append(non_striker_id)
-            
-            # Filter by Batting Team ID directly (More Robust)
-            team_id = match.get('batting_team_id')
-            
-            # Fallback to name lookup if ID missing (Legacy support)
-            if not team_id:
-                team_name = match.get('team_name_batting')
-                if team_name:
-                    team_row = await conn.fetchrow("SELECT id FROM teams WHERE name = $1", team_name)
-                    if team_row: team_id = team_row['id']
-            
-            if team_id:
-                if not current_ids:
-                    rows = await conn.fetch("""
-                        SELECT id, name FROM players 
-                        WHERE is_out = FALSE AND team_id = $1
-                    """, team_id)
-                else:
-                    rows = await conn.fetch("""
-                        SELECT id, name FROM players 
-                        WHERE is_out = FALSE AND team_id = $1 AND id != ALL($2)
-                    """, team_id, current_ids)
-            else:
-                # Fallback: All players explicitly not out (if no team context)
-                if not current_ids:
-                    rows = await conn.fetch("SELECT id, name FROM players WHERE is_out = FALSE")
-                else:
-                    rows = await conn.fetch("""
-                        SELECT id, name FROM players 
-                        WHERE is_out = FALSE AND id != ALL($1)
-                    """, current_ids)
-            
-            players = [{"id": r['id'], "name": r['name']} for r in rows]
-            return {"players": players}
-            
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return {"error": str(e)}
+    """Batting squad minus who is out this inning or at the crease (served from memory)."""
+    state, roster = await asyncio.gather(state_cache.get(match_id), roster_cache.get(match_id))
+    if not state or not roster:
+        return {"error": "Match not found"}
+    return {"players": roster.available_batters(state)}
 
 @router.get("/bowling_squad")
 async def get_bowling_squad(match_id: int):
-    try:
-        async with database.db_pool.acquire() as conn:
-            match = await fetch_match_state(conn, match_id)
-            if not match: return {"players": []}
-            
-            # Robust Logic: Use Bowling Team Name
-            bowling_team_name = match.get('team_name_bowling')
-            if not bowling_team_name: 
-                 return {"players": []}
-            
-            team_row = await conn.fetchrow("SELECT id FROM teams WHERE name = $1", bowling_team_name)
-            if not team_row: return {"players": []}
-            
-            team_id = team_row['id']
-            rows = await conn.fetch("""
-                SELECT id, name FROM players 
-                WHERE team_id = $1
-            """, team_id)
-            
-            players = [{"id": r['id'], "name": r['name']} for r in rows]
-            return {"players": players}
-    except Exception as e:
-        print(f"Error getting bowling squad: {e}")
-        return {"error": str(e)}
+    state, roster = await asyncio.gather(state_cache.get(match_id), roster_cache.get(match_id))
+    if not state or not roster:
+        return {"players": []}
+    return {"players": roster.bowling_squad(state)}
 
 @router.post("/matches/{match_id}/select_squad")
 async def select_squad(match_id: int, payload: SquadSelectionRequest):
@@ -653,9 +498,11 @@ async def select_squad(match_id: int, payload: SquadSelectionRequest):
                     INSERT INTO match_squads (match_id, player_id, is_playing_11)
                     VALUES ($1, $2, $3)
                 """, values)
-                return {"status": "success", "message": f"Squad of {len(values)} selected"}
+        roster_cache.invalidate(match_id)
+        state_cache.invalidate(match_id)  # bootstrap squads
+        return {"status": "success", "message": f"Squad of {len(values)} selected"}
     except Exception as e:
-        print(f"Error selecting squad: {e}")
+        logger.exception("Error selecting squad")
         return {"status": "error", "message": str(e)}
 
 
@@ -672,17 +519,20 @@ async def rotate_strike(match_id: int):
         s_id = row['current_striker_id']
         ns_id = row['non_striker_id']
         
-        # 2. DEBUG PRINT
-        print(f"Swapping: Striker {s_id} <-> Non-Striker {ns_id}")
+        # 2. Debug log
+        logger.debug("Swapping: Striker %s <-> Non-Striker %s", s_id, ns_id)
         
         # 3. Perform Swap (Even if one is None, we swap them)
-        await conn.execute("""
-            UPDATE matches 
-            SET current_striker_id = $1, non_striker_id = $2
-            WHERE id = $3
-        """, ns_id, s_id, match_id)
+        async with conn.transaction():
+            await conn.execute("""
+                UPDATE matches 
+                SET current_striker_id = $1, non_striker_id = $2
+                WHERE id = $3
+            """, ns_id, s_id, match_id)
+            state = await store_live_state(conn, match_id)
         
-        return await fetch_full_match_state(conn, match_id)
+        await publish_match_state(match_id, state)
+        return state
 
 @router.post("/matches/{match_id}/set_bowler")
 async def set_bowler(match_id: int, payload: SetBowlerRequest):
@@ -692,18 +542,21 @@ async def set_bowler(match_id: int, payload: SetBowlerRequest):
         if not match:
             raise HTTPException(status_code=404, detail="Match not found")
 
-        # 2. Update the Current Bowler
-        await conn.execute("""
-            UPDATE matches 
-            SET current_bowler_id = $1 
-            WHERE id = $2
-        """, payload.player_id, match_id)
-        
-        # --- NEW: LOG EVENT FOR UNDO ---
-        await conn.execute("INSERT INTO match_events (match_id, event_type, event_id) VALUES ($1, 'NEW_BOWLER', $2)", match_id, payload.new_player_id)
-        # -------------------------------
-        
-        return await fetch_full_match_state(conn, match_id)
+        async with conn.transaction():
+            # 2. Update the Current Bowler
+            await conn.execute("""
+                UPDATE matches 
+                SET current_bowler_id = $1 
+                WHERE id = $2
+            """, payload.player_id, match_id)
+            
+            # --- NEW: LOG EVENT FOR UNDO ---
+            await conn.execute("INSERT INTO match_events (match_id, event_type, event_id) VALUES ($1, 'NEW_BOWLER', $2)", match_id, payload.player_id)
+            # -------------------------------
+            
+            state = await store_live_state(conn, match_id)
+        await publish_match_state(match_id, state)
+        return state
 
 @router.post("/players/quick_add")
 async def quick_add_player(payload: QuickAddPlayerRequest):
@@ -715,6 +568,9 @@ async def quick_add_player(payload: QuickAddPlayerRequest):
             VALUES ($1, $2, $3)
             RETURNING id
         """, payload.name, payload.team_id, payload.role)
+        # New squad member: rosters and scorer bootstraps must pick it up
+        roster_cache.invalidate()
+        state_cache.invalidate()
         
         return {"id": row['id'], "name": payload.name, "role": payload.role, "team_id": payload.team_id}
 
@@ -724,6 +580,9 @@ async def quick_add_player(payload: QuickAddPlayerRequest):
 async def delete_match(match_id: int):
     async with database.db_pool.acquire() as conn:
         await conn.execute("DELETE FROM matches WHERE id = $1", match_id)
+        state_cache.invalidate(match_id)
+        roster_cache.invalidate(match_id)
+        bootstrap_cache.pop(match_id, None)
         return {"status": "success", "message": "Match deleted"}
 
 
@@ -763,28 +622,31 @@ async def correct_score(match_id: int, payload: ScoreCorrectionRequest):
             adj_wickets = payload.target_wickets - real_wickets
             adj_balls = target_balls - real_balls
 
-            # 4. Upsert into score_adjustments table
-            await conn.execute("""
-                INSERT INTO score_adjustments (match_id, inning_no, runs_adjustment, wickets_adjustment, balls_adjustment)
-                VALUES ($1, $2, $3, $4, $5)
-                ON CONFLICT (match_id, inning_no) 
-                DO UPDATE SET 
-                    runs_adjustment = EXCLUDED.runs_adjustment,
-                    wickets_adjustment = EXCLUDED.wickets_adjustment,
-                    balls_adjustment = EXCLUDED.balls_adjustment
-            """, match_id, payload.inning, adj_runs, adj_wickets, adj_balls)
-
-            # --- NEW FIX: SYNC TOTAL OVERS ---
-            # If we are editing Inning 1, we assume the user wants to set the match length
-            if payload.inning == 1 and new_total_overs is not None:
-                 await conn.execute("""
-                    UPDATE matches 
-                    SET total_overs = $1 
-                    WHERE id = $2
-                 """, new_total_overs, match_id)
-
-            return await fetch_full_match_state(conn, match_id)
+            async with conn.transaction():
+                # 4. Upsert into score_adjustments table
+                await conn.execute("""
+                    INSERT INTO score_adjustments (match_id, inning_no, runs_adjustment, wickets_adjustment, balls_adjustment)
+                    VALUES ($1, $2, $3, $4, $5)
+                    ON CONFLICT (match_id, inning_no) 
+                    DO UPDATE SET 
+                        runs_adjustment = EXCLUDED.runs_adjustment,
+                        wickets_adjustment = EXCLUDED.wickets_adjustment,
+                        balls_adjustment = EXCLUDED.balls_adjustment
+                """, match_id, payload.inning, adj_runs, adj_wickets, adj_balls)
+
+                # --- NEW FIX: SYNC TOTAL OVERS ---
+                # If we are editing Inning 1, we assume the user wants to set the match length
+                if payload.inning == 1 and new_total_overs is not None:
+                     await conn.execute("""
+                        UPDATE matches 
+                        SET total_overs = $1 
+                        WHERE id = $2
+                     """, new_total_overs, match_id)
+
+                state = await store_live_state(conn, match_id)
+            await publish_match_state(match_id, state)
+            return state
             
     except Exception as e:
-        print(f"Error correcting score: {e}")
+        logger.exception("Error correcting score")
         return {"error": str(e)}
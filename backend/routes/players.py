@@ -1,9 +1,17 @@
 
+import logging
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from pydantic import BaseModel
 from typing import Optional, List
 import asyncpg
+import os
 import database
+import statements
+from state_cache import state_cache
+from roster_cache import roster_cache
+from utils.uploads import PLAYER_IMG_DIR, AVATAR_SIZE, save_image_upload, make_derivative
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -28,7 +36,7 @@ class PlayerStats(BaseModel):
 
 @router.get("/players/{player_id}", response_model=PlayerStats)
 async def get_player_stats(player_id: int):
-    async with database.db_pool.acquire() as db:
+    async with database.read_pool.acquire() as db:
         # 1. Fetch Basic Player Info & Team Name
         player_query = """
             SELECT p.id, p.name, p.role, p.photo_url, t.name as team_name
@@ -142,6 +150,8 @@ async def create_player(payload: CreatePlayerRequest):
             RETURNING id, name, role, team_id
         """
         row = await db.fetchrow(query, payload.team_id, payload.name, payload.role)
+        roster_cache.invalidate()
+        state_cache.invalidate()  # rosters in scorer bootstraps
         return dict(row)
 
 @router.put("/players/{player_id}")
@@ -183,49 +193,38 @@ async def update_player(player_id: int, payload: UpdatePlayerRequest):
         values.append(player_id)
         query = f"UPDATE players SET {', '.join(update_fields)} WHERE id = ${idx}"
         
-        await db.execute(query, *values)
+        async with db.transaction():
+            await db.execute(query, *values)
+            await statements.execute(db, "drop_player_live_states", player_id)
+        # Names / photos appear in every state and roster that lists this player
+        roster_cache.invalidate()
+        state_cache.invalidate()
         
         return {"status": "success", "message": "Player updated successfully"}
 
-# Add imports if missing at the top, but we will assume they are there or add them.
-# We need: UploadFile, File, shutil, os, uuid
-# Checking file content... existing imports: APIRouter, HTTPException, BaseModel, Optional, List, asyncpg, database.
-# Missing: UploadFile, File, shutil, os, uuid. 
-# I will fix imports in a multi_replace if needed, but for now let's add the function and I'll check imports.
-
 @router.post("/players/{player_id}/upload_photo")
 async def upload_player_photo(player_id: int, file: UploadFile = File(...)):
-    import shutil
-    import os
-    import uuid
-    
-    # Define absolute paths (similar to teams.py)
-    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # backend/
-    PROJECT_DIR = os.path.dirname(BASE_DIR) # root
-    PLAYER_IMG_DIR = os.path.join(PROJECT_DIR, "frontend", "static", "player_images")
-    
     os.makedirs(PLAYER_IMG_DIR, exist_ok=True)
     
     try:
-        if not file.content_type.startswith("image/"):
-            raise HTTPException(status_code=400, detail="File must be an image")
-
-        extension = file.filename.split(".")[-1]
-        if not extension: extension = "png"
-        
-        unique_name = f"player_{player_id}_{uuid.uuid4().hex[:8]}.{extension}"
-        file_path = os.path.join(PLAYER_IMG_DIR, unique_name)
+        # 1. Stream to disk off the event loop (size-limited)
+        unique_name = await save_image_upload(file, PLAYER_IMG_DIR, f"player_{player_id}")
 
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # 2. Avatar-sized derivative (falls back to the original)
+        thumb_name = await make_derivative(PLAYER_IMG_DIR, unique_name, AVATAR_SIZE, crop=True)
 
-        public_url = f"/static/player_images/{unique_name}"
+        original_url = f"/static/player_images/{unique_name}"
+        public_url = f"/static/player_images/{thumb_name}" if thumb_name else original_url
 
         async with database.db_pool.acquire() as db:
-            await db.execute("UPDATE players SET photo_url = $1 WHERE id = $2", public_url, player_id)
+            async with db.transaction():
+                await db.execute("UPDATE players SET photo_url = $1 WHERE id = $2", public_url, player_id)
+                await statements.execute(db, "drop_player_live_states", player_id)
+        roster_cache.invalidate()
+        state_cache.invalidate()
 
-        return {"status": "success", "photo_url": public_url}
+        return {"status": "success", "photo_url": public_url, "original_url": original_url}
 
     except Exception as e:
-        print(f"Upload Error: {e}")
+        logger.exception("Upload Error")
         return {"status": "error", "message": str(e)}
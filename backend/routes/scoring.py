@@ -1,16 +1,16 @@
+import logging
 from fastapi import APIRouter
 import database
 from common import (
     fetch_match_state, build_match_response, fetch_player, swap_strikers, check_over_completion,
     SimpleMatchRequest, ScoreUpdate, NewBatsmanRequest, EndMatchRequest
 )
-from .matches import fetch_full_match_state
+from .matches import fetch_full_match_state, store_live_state
+from live_updates import publish_match_state, ack
+from roster_cache import roster_cache
+import statements
 
-
-
-# ... existing imports ...
-# ADD THIS LINE:
-from sse_manager import manager
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -60,28 +60,27 @@ async def end_inning(payload: SimpleMatchRequest):
                         current_bowler_id = NULL
                     WHERE id = $4
                 """, target, new_batting, new_bowling, match_id, new_batting_id, new_bowling_id)
-                
-                # --- INSERT THIS BLOCK BEFORE RETURN ---
-                # Fetch state to show the target immediately to viewers
-                full_state = await fetch_full_match_state(conn, match_id)
-                await manager.broadcast(match_id, full_state)
-                # ---------------------------------------
+                state = await store_live_state(conn, match_id)
+
+            # Show the target to viewers (after commit)
+            await publish_match_state(match_id, state)
 
-                return {
-                    "status": "inning_break",
-                    "target": target,
-                    "new_batting_team": new_batting,
-                    "message": f"Innings Break! Target set: {target} runs"
-                }
+            return {
+                "status": "inning_break",
+                "target": target,
+                "new_batting_team": new_batting,
+                "message": f"Innings Break! Target set: {target} runs"
+            }
 
     except Exception as e:
-        print(f"Error ending inning: {e}")
+        logger.exception("Error ending inning")
         return {"status": "error", "message": str(e)}
 
 
 
 @router.post("/update_score")
-async def update_score(payload: ScoreUpdate):
+async def update_score(payload: ScoreUpdate, response: str = "full"):
+    """?response=ack: reply with the outcome and new state version only (live_updates.ack)."""
     try:
         async with database.db_pool.acquire() as conn:
             async with conn.transaction():
@@ -128,30 +127,24 @@ async def update_score(payload: ScoreUpdate):
                     if runs_batsman == 4: is_boundary_4 = True
                     if runs_batsman == 6: is_boundary_6 = True
                 
-                ball_id = await conn.fetchval("""
-                    INSERT INTO balls (
-                        match_id, inning_no, over_no, ball_no, 
-                        striker_id, non_striker_id, bowler_id, 
-                        runs_off_bat, extras, is_wicket, action_type,
-                        extra_type, is_four, is_six, wicket_type
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
-                    RETURNING id
-                """, match_id, match.get('current_inning', 1), current_over, current_ball, 
-                   striker_id, non_striker_id, bowler_id,
-                   runs_batsman, runs_extras, is_wicket, action,
-                   extra_type, is_boundary_4, is_boundary_6, wicket_type
+                ball_id = await statements.fetchval(
+                    conn, "insert_ball",
+                    match_id, match.get('current_inning', 1), current_over, current_ball,
+                    striker_id, non_striker_id, bowler_id,
+                    runs_batsman, runs_extras, is_wicket, action,
+                    extra_type, is_boundary_4, is_boundary_6, wicket_type
                 )
                 
                 # --- NEW: LOG EVENT FOR UNDO ---
-                await conn.execute("INSERT INTO match_events (match_id, event_type, event_id) VALUES ($1, 'BALL', $2)", match_id, ball_id)
+                await statements.execute(conn, "insert_ball_event", match_id, ball_id)
                 # -------------------------------
                 
                 total_runs = runs_batsman + runs_extras
                 if total_runs != 0:
-                    await conn.execute("UPDATE matches SET team_score = team_score + $1 WHERE id = $2", total_runs, match_id)
+                    await statements.execute(conn, "add_team_score", total_runs, match_id)
                 
                 if ball_increment > 0:
-                    await conn.execute("UPDATE matches SET balls = balls + 1 WHERE id = $1", match_id)
+                    await statements.execute(conn, "add_legal_ball", match_id)
 
                 if action != 'penalty': 
                     batter_balls_add = 0
@@ -159,54 +152,65 @@ async def update_score(payload: ScoreUpdate):
                     if action in ['bye', 'leg-bye']: batter_balls_add = 1
                     
                     if runs_batsman > 0 or batter_balls_add > 0:
-                         await conn.execute("UPDATE players SET runs=runs+$1, balls=balls+$2 WHERE id=$3", runs_batsman, batter_balls_add, striker_id)
-                         if is_boundary_4: await conn.execute("UPDATE players SET fours=fours+1 WHERE id=$1", striker_id)
-                         if is_boundary_6: await conn.execute("UPDATE players SET sixes=sixes+1 WHERE id=$1", striker_id)
+                         await statements.execute(conn, "add_batter_runs", runs_batsman, batter_balls_add, striker_id)
+                         if is_boundary_4: await statements.execute(conn, "add_four", striker_id)
+                         if is_boundary_6: await statements.execute(conn, "add_six", striker_id)
 
                 if is_wicket:
                     current_wickets = match['wickets'] + 1
                     score_str = f"{match['team_score'] + total_runs}/{current_wickets}"
-                    await conn.execute("INSERT INTO wickets (ball_id, player_out_id, wicket_type, score_at_dismissal) VALUES ($1, $2, $3, $4)", ball_id, striker_id, wicket_type, score_str)
-                    await conn.execute("UPDATE matches SET wickets = wickets + 1 WHERE id = $1", match_id)
-                    await conn.execute("UPDATE players SET is_out = TRUE WHERE id = $1", striker_id)
+                    await statements.execute(conn, "insert_wicket", ball_id, striker_id, wicket_type, score_str)
+                    await statements.execute(conn, "add_wicket", match_id)
+                    await statements.execute(conn, "mark_out", striker_id)
                     
                     # CRITICAL FIX: Vacate the crease
                     if striker_id == match['current_striker_id']:
-                        await conn.execute("UPDATE matches SET current_striker_id = NULL WHERE id = $1", match_id)
+                        await statements.execute(conn, "clear_striker", match_id)
                     elif striker_id == match['non_striker_id']:
-                        await conn.execute("UPDATE matches SET non_striker_id = NULL WHERE id = $1", match_id)
+                        await statements.execute(conn, "clear_non_striker", match_id)
+                else:
+                    must_swap = False
+                    if action != 'penalty':
+                        run_check = runs_batsman
+                        if action in ['bye', 'leg-bye']: run_check = runs_extras
+                        if action == 'noball': run_check = int(value)
+                        if run_check % 2 != 0: must_swap = True
+                    
+                    if must_swap: await swap_strikers(conn, match, match_id)
 
-                    if current_wickets >= 10: return {"status": "innings_over", "message": "All Out!", "data": await fetch_full_match_state(conn, match_id)}
-                    return {"status": "wicket_fall", "out_player": striker_out_name, "data": await fetch_full_match_state(conn, match_id)}
+                    fresh_match = await fetch_match_state(conn, match_id)
+                    await check_over_completion(conn, fresh_match, match_id)
 
-                must_swap = False
-                if action != 'penalty':
-                    run_check = runs_batsman
-                    if action in ['bye', 'leg-bye']: run_check = runs_extras
-                    if action == 'noball': run_check = int(value)
-                    if run_check % 2 != 0: must_swap = True
-                
-                if must_swap: await swap_strikers(conn, match, match_id)
+                if is_wicket:
+                    outcome = {"status": "innings_over", "message": "All Out!"} if current_wickets >= 10 \
+                        else {"status": "wicket_fall", "out_player": striker_out_name}
+                elif fresh_match['balls'] >= 6 or (match['overs'] != fresh_match['overs']):
+                    outcome = {"status": "over_complete", "message": "Over Complete"}
+                else:
+                    outcome = {"status": "success"}
 
-                fresh_match = await fetch_match_state(conn, match_id)
-                await check_over_completion(conn, fresh_match, match_id)
-            # --- REPLACE THE FINAL RETURN WITH THIS BLOCK ---
-            
-            # 1. Fetch the fresh full state
-            full_state = await fetch_full_match_state(conn, match_id)
+                # 1. The fresh full state, stored with the write (matches.live_state)
+                full_state = None
+                if outcome["status"] == "over_complete":
+                    # The scorer's reply still shows the bowler who finished the over
+                    if response != "ack":
+                        full_state = await fetch_full_match_state(conn, match_id)
+                    # Auto-unset bowler logic (keep existing)
+                    await statements.execute(conn, "clear_bowler", match_id)
+                live_state = await store_live_state(conn, match_id)
             
-            # 2. 🔥 BROADCAST TO SSE LISTENERS 🔥
-            # This pushes the data to everyone watching (0.01s latency)
-            await manager.broadcast(match_id, full_state)
+            if is_wicket:
+                roster_cache.mark_out(match_id, match.get('current_inning', 1), striker_id)
 
-            if fresh_match['balls'] >= 6 or (match['overs'] != fresh_match['overs']):
-                 # Auto-unset bowler logic (keep existing)
-                 await conn.execute("UPDATE matches SET current_bowler_id = NULL WHERE id = $1", match_id)
-                 return {"status": "over_complete", "message": "Over Complete", "data": full_state}
+            # 2. 🔥 BROADCAST TO SSE LISTENERS (+ static snapshots) 🔥
+            # This pushes the data to everyone watching (0.01s latency)
+            await publish_match_state(match_id, live_state)
 
-            return {"status": "success", "data": full_state}
+            if response == "ack":
+                return ack(match_id, outcome)
+            return {**outcome, "data": full_state or live_state}
     except Exception as e:
-        print(f"Error: {e}")
+        logger.exception("Error updating score for match %s", payload.match_id)
         return {"status": "error", "message": str(e)}
 
 @router.post("/set_new_batsman")
@@ -218,10 +222,13 @@ async def set_new_batsman(payload: NewBatsmanRequest):
             if payload.role == 'non_striker':
                 column = "non_striker_id"
                 
-            await conn.execute(f"UPDATE matches SET {column} = $1 WHERE id = $2", payload.new_player_id, match_id)
-            return await fetch_full_match_state(conn, match_id)
+            async with conn.transaction():
+                await conn.execute(f"UPDATE matches SET {column} = $1 WHERE id = $2", payload.new_player_id, match_id)
+                state = await store_live_state(conn, match_id)
+            await publish_match_state(match_id, state)
+            return state
     except Exception as e:
-        print(f"Error setting batsman: {e}")
+        logger.exception("Error setting batsman")
         return {"error": str(e)}
 
 @router.post("/set_bowler")
@@ -229,15 +236,18 @@ async def set_bowler(payload: NewBatsmanRequest):
     try:
         async with database.db_pool.acquire() as conn:
             match_id = payload.match_id
-            await conn.execute("""
-                UPDATE matches 
-                SET current_bowler_id = $1 
-                WHERE id = $2
-            """, payload.new_player_id, match_id)
+            async with conn.transaction():
+                await conn.execute("""
+                    UPDATE matches 
+                    SET current_bowler_id = $1 
+                    WHERE id = $2
+                """, payload.new_player_id, match_id)
+                state = await store_live_state(conn, match_id)
 
-            return await fetch_full_match_state(conn, match_id)
+            await publish_match_state(match_id, state)
+            return state
     except Exception as e:
-        print(f"Error setting bowler: {e}")
+        logger.exception("Error setting bowler")
         return {"error": str(e)}
 
 @router.post("/end_match")
@@ -329,13 +339,15 @@ async def end_match(payload: EndMatchRequest):
                         result_message = $2 
                     WHERE id = $3
                 """, winner_id, result_message, match_id)
-                
-                return {
-                    "status": "success", 
-                    "result": result_message, 
-                    "winner_id": winner_id
-                }
+                state = await store_live_state(conn, match_id)
+
+            await publish_match_state(match_id, state)
+            return {
+                "status": "success", 
+                "result": result_message, 
+                "winner_id": winner_id
+            }
                 
     except Exception as e:
-        print(f"Error ending match: {e}")
+        logger.exception("Error ending match")
         return {"status": "error", "message": str(e)}
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from analytics import tournament_stats
+
+router = APIRouter()
+
+
+@router.get("/tournaments/{tournament_id}/stats")
+async def get_tournament_stats(tournament_id: int, limit: int = Query(10, ge=1, le=200)):
+    """Batting / bowling leaderboards, phase splits and partnerships for a tournament."""
+    stats = await tournament_stats.get(tournament_id)
+    return stats.summary(limit)
+
+
+@router.get("/tournaments/{tournament_id}/stats/players/{player_id}")
+async def get_tournament_player_stats(tournament_id: int, player_id: int):
+    stats = await tournament_stats.get(tournament_id)
+    player = stats.player(player_id)
+    if player is None:
+        raise HTTPException(status_code=404, detail="Player has no balls in this tournament")
+    return player
+
+
+@router.get("/tournaments/{tournament_id}/stats/head_to_head")
+async def get_head_to_head(tournament_id: int, batter_id: int, bowler_id: int):
+    """Batter vs bowler in this tournament."""
+    stats = await tournament_stats.get(tournament_id)
+    return stats.head_to_head(batter_id, bowler_id)
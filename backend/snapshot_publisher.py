@@ -0,0 +1,117 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Disabled unless SNAPSHOT_DIR is set, e.g. /var/www/scoreboard/live
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR")
+SNAPSHOT_INTERVAL_MS = int(os.getenv("SNAPSHOT_INTERVAL_MS", "1000"))
+
+
+def _atomic_write(path: str, data: bytes):
+    """Write to a temp file in the same directory, then rename over the target."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_documents(match_dir: str, documents: Dict[str, dict]):
+    """Blocking writer (runs in a thread): <name>.json plus a <name>.json.gz twin."""
+    os.makedirs(match_dir, exist_ok=True)
+    for name, doc in documents.items():
+        body = json.dumps(doc, separators=(",", ":"), default=str).encode("utf-8")
+        path = os.path.join(match_dir, f"{name}.json")
+        # .gz first so nginx `gzip_static on` never serves a stale variant next to a fresh .json
+        _atomic_write(path + ".gz", gzip.compress(body, compresslevel=6, mtime=0))
+        _atomic_write(path, body)
+
+
+class SnapshotPublisher:
+    """
+    Publishes read-only JSON snapshots for CDN / nginx served spectators:
+
+        {SNAPSHOT_DIR}/matches/{match_id}/state.json(.gz)
+        {SNAPSHOT_DIR}/matches/{match_id}/scorecard.json(.gz)
+        {SNAPSHOT_DIR}/matches/{match_id}/commentary.json(.gz)
+
+    Writes are coalesced per match: the first delivery after a quiet period is
+    written straight away, anything arriving within the interval is folded into
+    a single trailing write of the latest state.
+    """
+    def __init__(self, output_dir: Optional[str] = SNAPSHOT_DIR, interval_ms: int = SNAPSHOT_INTERVAL_MS):
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000.0
+        self.pending: Dict[int, dict] = {}
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self.last_write: Dict[int, float] = {}
+        self.closed = False
+        # Extra documents (name -> async fn(match_id)), wired up in main.py
+        self.builders: Dict[str, Callable[[int], Awaitable[dict]]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.output_dir)
+
+    def configure(self, builders: Dict[str, Callable[[int], Awaitable[dict]]]):
+        self.builders = builders
+
+    def schedule(self, match_id: int, state: dict):
+        """Record the latest state; at most one write per match per interval."""
+        if not self.enabled or self.closed or not state:
+            return
+        self.pending[match_id] = state
+        task = self.tasks.get(match_id)
+        if task is None or task.done():
+            self.tasks[match_id] = asyncio.create_task(self._flush_later(match_id))
+
+    async def _flush_later(self, match_id: int):
+        try:
+            wait = self.last_write.get(match_id, 0) + self.interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._flush(match_id)
+        finally:
+            self.tasks.pop(match_id, None)
+            # A delivery that landed during the write gets its own slot
+            if match_id in self.pending and not self.closed:
+                self.tasks[match_id] = asyncio.create_task(self._flush_later(match_id))
+
+    async def _flush(self, match_id: int):
+        state = self.pending.pop(match_id, None)
+        if state is None:
+            return
+        self.last_write[match_id] = time.monotonic()
+
+        documents = {"state": state}
+        for name, builder in self.builders.items():
+            try:
+                documents[name] = await builder(match_id)
+            except Exception as e:
+                logger.warning("Snapshot %s for match %s failed: %s", name, match_id, e)
+
+        match_dir = os.path.join(self.output_dir, "matches", str(match_id))
+        try:
+            await asyncio.to_thread(_write_documents, match_dir, documents)
+        except OSError as e:
+            logger.error("Snapshot write for match %s failed: %s", match_id, e)
+
+    async def close(self):
+        """Shutdown: stop timers and write whatever is still pending."""
+        self.closed = True
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks.clear()
+        for match_id in list(self.pending):
+            await self._flush(match_id)
+
+
+# Global Instance to be imported elsewhere
+snapshot_publisher = SnapshotPublisher()
@@ -1,52 +1,236 @@
 import asyncio
 import json
 import logging
-from typing import List, Dict
+import os
+import random
+import time
+from typing import AsyncIterator, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
-# Setup simple logging
-logger = logging.getLogger("uvicorn.error")
+from metrics import broadcast_fanout
+
+logger = logging.getLogger(__name__)
+
+# Join/leave happen once per viewer: log 1 in N so a match-day crowd doesn't flood the log
+SSE_LOG_SAMPLE = int(os.getenv("SSE_LOG_SAMPLE", "100"))
+# Shutdown: reconnect delays handed out across this window (EventSource `retry:`)
+SSE_RETRY_MIN_MS = int(os.getenv("SSE_RETRY_MIN_MS", "1000"))
+SSE_RETRY_MAX_MS = int(os.getenv("SSE_RETRY_MAX_MS", "15000"))
+# Comment frame after this much quiet: keeps proxies from dropping idle streams
+# and makes a write to a half-open socket fail, so its generator ends.
+SSE_HEARTBEAT_S = float(os.getenv("SSE_HEARTBEAT_S", "15"))
+# A listener this many messages behind isn't reading any more: reap it
+SSE_QUEUE_MAX = int(os.getenv("SSE_QUEUE_MAX", "50"))
+# Admission caps (0 = unlimited); over them a stream gets a 503 + Retry-After
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "10000"))
+SSE_MAX_PER_MATCH = int(os.getenv("SSE_MAX_PER_MATCH", "5000"))
 
 class SSEManager:
     """
     Manages active connections for Server-Sent Events (SSE).
     Acts as a 'Radio Station' broadcasting updates to listeners.
+
+    Each listener picks a view (how a state is rendered: the full JSON, the
+    ticker, ...). A broadcast renders every view that has listeners once.
     """
     def __init__(self):
-        # Maps match_id -> List of client queues
-        self.active_listeners: Dict[int, List[asyncio.Queue]] = {}
+        # Maps match_id -> view -> List of client queues
+        self.active_listeners: Dict[int, Dict[str, List[asyncio.Queue]]] = {}
+        # view -> state renderer (the SSE `data:` payload)
+        self.views: Dict[str, Callable[[dict], str]] = {"full": json.dumps}
+        # Multiplexed streams (many matches, one connection): the set of match
+        # ids is the subscription key, shared by every connection that asked
+        # for the same set. Bookkeeping is one queue per connection plus one
+        # index entry per (match, distinct set), not one per (connection, match).
+        self.groups: Dict[FrozenSet[int], List[asyncio.Queue]] = {}
+        self.group_index: Dict[int, Set[FrozenSet[int]]] = {}
+        self.draining = False
+        self.connections = 0
+        self.per_match: Dict[int, int] = {}
+        self.rejected = 0
+        self.reaped = 0
+
+    def register_view(self, name: str, render: Callable[[dict], str]):
+        self.views[name] = render
+
+    def message(self, view: str, state: dict) -> str:
+        """One state as an SSE message in the given view."""
+        return f"data: {self.views[view](state)}\n\n"
+
+    def match_queues(self) -> List[Tuple[int, List[asyncio.Queue]]]:
+        """(match_id, every listener queue across views), for metrics and drain."""
+        return [(mid, [q for qs in views.values() for q in qs])
+                for mid, views in self.active_listeners.items()]
 
-    async def subscribe(self, match_id: int) -> asyncio.Queue:
+    def admit(self, match_id: Optional[int] = None) -> bool:
+        """Room for one more stream (for match_id, if given)? Counts the refusal if not."""
+        full = (SSE_MAX_CONNECTIONS and self.connections >= SSE_MAX_CONNECTIONS) or \
+               (match_id is not None and SSE_MAX_PER_MATCH and self.per_match.get(match_id, 0) >= SSE_MAX_PER_MATCH)
+        if full:
+            self.rejected += 1
+        return not full
+
+    def retry_after(self) -> int:
+        """Seconds a refused client should wait, jittered so they don't all come back together."""
+        return max(1, random.randint(SSE_RETRY_MIN_MS, SSE_RETRY_MAX_MS) // 1000)
+
+    async def subscribe(self, match_id: int, view: str = "full") -> asyncio.Queue:
         """Client connects: Give them a queue to listen to."""
         q = asyncio.Queue()
-        if match_id not in self.active_listeners:
-            self.active_listeners[match_id] = []
-        
-        self.active_listeners[match_id].append(q)
-        logger.info(f"🔌 SSE: Client joined Match {match_id}. Total: {len(self.active_listeners[match_id])}")
+        views = self.active_listeners.setdefault(match_id, {})
+        views.setdefault(view, []).append(q)
+        self.connections += 1
+        self.per_match[match_id] = self.per_match.get(match_id, 0) + 1
+        logger.info("🔌 SSE: Client joined Match %s (%s). Total: %s", match_id, view,
+                    sum(len(qs) for qs in views.values()),
+                    extra={"match_id": match_id, "sample_every": SSE_LOG_SAMPLE})
         return q
 
-    async def unsubscribe(self, match_id: int, q: asyncio.Queue):
+    async def unsubscribe(self, match_id: int, q: asyncio.Queue, view: str = "full"):
         """Client disconnects: Remove their queue."""
-        if match_id in self.active_listeners:
-            if q in self.active_listeners[match_id]:
-                self.active_listeners[match_id].remove(q)
-            
-            if not self.active_listeners[match_id]:
+        self._remove(match_id, q, view)
+        logger.info("🔌 SSE: Client left Match %s.", match_id,
+                    extra={"match_id": match_id, "sample_every": SSE_LOG_SAMPLE})
+
+    def _remove(self, match_id: int, q: asyncio.Queue, view: str):
+        """Drop a listener queue; a no-op if it was already reaped."""
+        views = self.active_listeners.get(match_id)
+        if views is not None:
+            queues = views.get(view, [])
+            if q in queues:
+                queues.remove(q)
+                self.connections -= 1
+                self.per_match[match_id] -= 1
+                if not self.per_match[match_id]:
+                    del self.per_match[match_id]
+            if not queues:
+                views.pop(view, None)
+            if not views:
                 del self.active_listeners[match_id]
-        
-        logger.info(f"🔌 SSE: Client left Match {match_id}.")
 
-    async def broadcast(self, match_id: int, data: dict):
-        """Send data to everyone watching this match."""
-        if match_id not in self.active_listeners:
+    def subscribe_many(self, match_ids: Iterable[int]) -> Tuple[FrozenSet[int], asyncio.Queue]:
+        """Multiplexed client: one queue for several matches."""
+        key = frozenset(match_ids)
+        q = asyncio.Queue()
+        queues = self.groups.setdefault(key, [])
+        if not queues:
+            for mid in key:
+                self.group_index.setdefault(mid, set()).add(key)
+        queues.append(q)
+        self.connections += 1
+        return key, q
+
+    def unsubscribe_many(self, key: FrozenSet[int], q: asyncio.Queue):
+        queues = self.groups.get(key)
+        if queues is None:
+            return
+        if q in queues:
+            queues.remove(q)
+            self.connections -= 1
+        if not queues:
+            del self.groups[key]
+            for mid in key:
+                keys = self.group_index.get(mid)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.group_index[mid]
+
+    def summary_message(self, match_id: int, state: dict) -> str:
+        """Multiplexed streams name each message after its match."""
+        return f"event: match-{match_id}\ndata: {self.views['summary'](state)}\n\n"
+
+    async def broadcast(self, match_id: int, data: dict, cached=None):
+        """
+        Send data to everyone watching this match. `cached` (a state_cache
+        CachedState for `data`) memoizes the rendered messages, so viewers
+        connecting right after get them without another serialization.
+        """
+        views = self.active_listeners.get(match_id)
+        keys = self.group_index.get(match_id)
+        if not views and not keys:
             return
         
-        # We serialize ONCE to save CPU, then push strings to queues
-        # SSE format requires "data: <json>\n\n"
-        message = f"data: {json.dumps(data)}\n\n"
-        
-        for q in self.active_listeners[match_id]:
-            await q.put(message)
+        # We serialize ONCE per view to save CPU, then push strings to queues
+        # SSE format requires "data: <payload>\n\n"
+        start = time.perf_counter()
+        stuck = []
+        for view, queues in list((views or {}).items()):
+            message = cached.sse(view, self.views[view]) if cached else self.message(view, data)
+            for q in queues:
+                if q.qsize() >= SSE_QUEUE_MAX:
+                    stuck.append((q, lambda q=q, view=view: self._remove(match_id, q, view)))
+                else:
+                    q.put_nowait(message)
+        if keys:
+            message = self.summary_message(match_id, data)
+            for key in list(keys):
+                for q in self.groups.get(key, []):
+                    if q.qsize() >= SSE_QUEUE_MAX:
+                        stuck.append((q, lambda q=q, key=key: self.unsubscribe_many(key, q)))
+                    else:
+                        q.put_nowait(message)
+        for q, remove in stuck:
+            self._reap(q, remove)
+        broadcast_fanout.observe(time.perf_counter() - start)
+
+    def _reap(self, q: asyncio.Queue, remove: Callable[[], None]):
+        """
+        A listener that stopped reading (half-open socket, stalled client):
+        stop queueing for it and free its backlog. If its generator ever
+        wakes up it finds the None and ends the stream.
+        """
+        remove()
+        while not q.empty():
+            q.get_nowait()
+        q.put_nowait(None)
+        self.reaped += 1
+        logger.warning("🔌 SSE: Reaped a listener %s messages behind", SSE_QUEUE_MAX)
+
+    async def messages(self, q: asyncio.Queue) -> AsyncIterator[str]:
+        """
+        A listener's messages until it is drained or reaped (None), with a
+        heartbeat comment whenever nothing was sent for SSE_HEARTBEAT_S.
+        """
+        getter = None
+        try:
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(q.get())
+                # wait(), not wait_for(): a timeout must not cancel the get and lose a message
+                done, _ = await asyncio.wait((getter,), timeout=SSE_HEARTBEAT_S)
+                if not done:
+                    yield ": ping\n\n"
+                    continue
+                data = getter.result()
+                getter = None
+                if data is None:
+                    return
+                yield data
+        finally:
+            if getter is not None:
+                getter.cancel()
+
+    def drain(self) -> int:
+        """
+        Shutdown: give every client a reconnect delay, then end its stream
+        (a None in the queue). Delays are spread evenly over
+        [SSE_RETRY_MIN_MS, SSE_RETRY_MAX_MS] in shuffled order, so the next
+        process sees a steady ramp of reconnects, not every viewer at once.
+        """
+        if self.draining:
+            return 0
+        self.draining = True
+
+        queues = [q for _, listeners in self.match_queues() for q in listeners]
+        queues += [q for listeners in self.groups.values() for q in listeners]
+        random.shuffle(queues)
+        span = SSE_RETRY_MAX_MS - SSE_RETRY_MIN_MS
+        for i, q in enumerate(queues):
+            delay_ms = SSE_RETRY_MIN_MS + span * i // max(len(queues) - 1, 1)
+            q.put_nowait(f"retry: {delay_ms}\n\n")
+            q.put_nowait(None)
+        logger.info("🔌 SSE: Draining %s client(s) over %s-%s ms", len(queues), SSE_RETRY_MIN_MS, SSE_RETRY_MAX_MS)
+        return len(queues)
 
 # Global Instance to be imported elsewhere
-manager = SSEManager()
\ No newline at end of file
+manager = SSEManager()
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+import os
+import secrets
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from sse_manager import SSE_RETRY_MAX_MS
+
+logger = logging.getLogger(__name__)
+
+# Entries are replaced on every published score and dropped by every other
+# match write, so the TTL only bounds staleness from edits that don't name a
+# match (team colour, player rename) and from other worker processes.
+STATE_CACHE_TTL = float(os.getenv("STATE_CACHE_TTL", "5"))
+STATE_WARM_CONCURRENCY = int(os.getenv("STATE_WARM_CONCURRENCY", "4"))
+# Warmed entries outlive the TTL: viewers drained by the previous process
+# reconnect over the whole SSE retry window, and should all find them.
+STATE_WARM_TTL = float(os.getenv("STATE_WARM_TTL", str(SSE_RETRY_MAX_MS / 1000 + STATE_CACHE_TTL)))
+
+
+# Part of every ETag: versions are per process, so another worker's never match
+INSTANCE_ID = secrets.token_hex(4)
+
+
+def etag(version: Tuple[int, int]) -> str:
+    return f'"{INSTANCE_ID}-{version[0]}-{version[1]}"'
+
+
+class CachedState:
+    __slots__ = ("state", "version", "stored_at", "ttl", "_messages", "_body")
+
+    def __init__(self, state: dict, version: Optional[Tuple[int, int]] = None):
+        self.state = state
+        self.version = version  # the cache version the state was read at (or published with)
+        self.stored_at = time.monotonic()
+        self.ttl: Optional[float] = None  # None: the cache's TTL
+        self._messages: Dict[str, str] = {}
+        self._body: Optional[str] = None
+
+    @property
+    def etag(self) -> Optional[str]:
+        return etag(self.version) if self.version is not None else None
+
+    def body(self) -> str:
+        """The state as a JSON body (/match_data), serialized once."""
+        if self._body is None:
+            self._body = json.dumps(self.state)
+        return self._body
+
+    def sse(self, view: str = "full", render: Callable[[dict], str] = json.dumps) -> str:
+        """The state as one SSE message in a view, serialized at most once per view."""
+        message = self._messages.get(view)
+        if message is None:
+            message = self._messages[view] = f"data: {render(self.state)}\n\n"
+        return message
+
+
+class MatchStateCache:
+    """
+    match_id -> latest full match state (the /match_data payload).
+
+    Concurrent misses for one match share a single rebuild. Each match has a
+    version (global epoch, per-match generation) that every write bumps, and
+    other per-match caches key on it too. A rebuild that started before a write
+    still answers its callers but isn't stored, so a slow read can never put
+    an older state back over a newer one.
+    """
+    def __init__(self, ttl: float = STATE_CACHE_TTL):
+        self.ttl = ttl
+        self.entries: Dict[int, CachedState] = {}
+        self.generations: Dict[int, int] = {}
+        self.epoch = 0  # bumped by edits that don't name a match
+        self._loading: Dict[int, asyncio.Task] = {}
+        self.loader: Optional[Callable[[int], Awaitable[Optional[dict]]]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, loader: Callable[[int], Awaitable[Optional[dict]]]):
+        """loader(match_id) -> state or None (wired up in main.py)."""
+        self.loader = loader
+
+    def version(self, match_id: int) -> Tuple[int, int]:
+        """Changes on every write that can affect this match's state."""
+        return (self.epoch, self.generations.get(match_id, 0))
+
+    def etag(self, match_id: int) -> str:
+        """ETag of the match's current state (what the next rebuild will carry)."""
+        return etag(self.version(match_id))
+
+    def _fresh(self, entry: Optional[CachedState]) -> bool:
+        if entry is None:
+            return False
+        ttl = entry.ttl if entry.ttl is not None else self.ttl
+        return time.monotonic() - entry.stored_at < ttl
+
+    def put(self, match_id: int, state: dict) -> Optional[CachedState]:
+        """A freshly committed state (publish path): replaces whatever is cached."""
+        self.generations[match_id] = self.generations.get(match_id, 0) + 1
+        if not state:
+            self.entries.pop(match_id, None)
+            return None
+        entry = self.entries[match_id] = CachedState(state, self.version(match_id))
+        return entry
+
+    def invalidate(self, match_id: Optional[int] = None):
+        """Call after a write commits. No match_id: drop everything (team / player edits)."""
+        if match_id is None:
+            self.epoch += 1
+            self.entries.clear()
+            return
+        self.generations[match_id] = self.generations.get(match_id, 0) + 1
+        self.entries.pop(match_id, None)
+
+    async def get_entry(self, match_id: int) -> Optional[CachedState]:
+        entry = self.entries.get(match_id)
+        if self._fresh(entry):
+            self.hits += 1
+            return entry
+
+        task = self._loading.get(match_id)
+        if task is None:
+            self.misses += 1
+            if entry is not None:
+                # Expired: another worker may have changed it, so the reload gets a new version (and ETag)
+                self.generations[match_id] = self.generations.get(match_id, 0) + 1
+            # Its own task: a caller that disconnects doesn't cancel the others' load
+            task = asyncio.create_task(self._load(match_id, self.version(match_id)))
+            self._loading[match_id] = task
+            task.add_done_callback(lambda t: self._load_done(match_id, t))
+        return await asyncio.shield(task)
+
+    async def _load(self, match_id: int, version: Tuple[int, int]) -> Optional[CachedState]:
+        state = await self.loader(match_id)
+        entry = CachedState(state, version) if state else None
+        if entry is not None and self.version(match_id) == version:
+            self.entries[match_id] = entry
+        return entry
+
+    def _load_done(self, match_id: int, task: asyncio.Task):
+        if self._loading.get(match_id) is task:
+            del self._loading[match_id]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    async def get(self, match_id: int) -> Optional[dict]:
+        entry = await self.get_entry(match_id)
+        return entry.state if entry else None
+
+    async def warm(self, match_ids: Iterable[int], concurrency: int = STATE_WARM_CONCURRENCY,
+                   ttl: float = STATE_WARM_TTL) -> int:
+        """
+        Preload states (startup), a few at a time so the read pool isn't swamped.
+        They stay for `ttl` unless a write replaces or drops them first.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load(match_id):
+            async with semaphore:
+                try:
+                    entry = await self.get_entry(match_id)
+                except Exception:
+                    logger.exception("State warm-up failed for match %s", match_id)
+                    return False
+                if entry is None:
+                    return False
+                if self.entries.get(match_id) is entry:
+                    entry.ttl = max(ttl, self.ttl)
+                return True
+
+        results = await asyncio.gather(*(load(mid) for mid in match_ids))
+        return sum(results)
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "loading": len(self._loading)}
+
+
+state_cache = MatchStateCache()
@@ -0,0 +1,198 @@
+import os
+from urllib.parse import urlparse
+
+# Prepared statement registry for the hot path (live state, scorecard, scoring).
+#
+# asyncpg prepares every query as a named statement and keeps it in a
+# per-connection LRU keyed by the SQL text, so the server parses and plans it
+# once per physical connection instead of on every call. Routing the hot
+# queries through this registry keeps their text identical at every call site
+# (one cache entry each) and sizes the cache so they are never evicted.
+#
+# Modes (DB_STATEMENT_MODE):
+#   named    statement cache on. Direct Postgres, or PgBouncer >= 1.21 with
+#            max_prepared_statements > 0 (it tracks named statements per client).
+#   unnamed  statement cache off (statement_cache_size=0). Required behind a
+#            transaction-mode pooler that cannot track named statements
+#            (older PgBouncer, Supabase/Supavisor :6543).
+#   auto     (default) unnamed when the DSN looks like a transaction pooler, else named.
+STATEMENT_MODE = os.getenv("DB_STATEMENT_MODE", "auto").lower()
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "128"))
+POOLER_PORTS = {6432, 6543}
+
+# Ball columns the helpers read, in utils.match_helpers.BallRecord field order.
+# Queries that join wickets append player_out_id, wicket_type, catcher_id.
+BALL_COLUMNS = ("b.id, b.inning_no, b.over_no, b.ball_no, b.striker_id, b.bowler_id, "
+                "b.runs_off_bat, b.extras, b.extra_type, b.is_wicket")
+
+# Every matches column but live_state: the rendered state is read on its own
+# (main.load_match_state), not with the row. Listed, not *, so a cached plan
+# survives columns being added.
+MATCH_COLUMNS = ("id, tournament_id, match_number, team_a_id, team_b_id, "
+                 "team_name_batting, team_name_bowling, total_overs, balls_per_over, "
+                 "match_type, match_status, status, current_inning, team_score, wickets, "
+                 "overs, balls, target_score, result_message, winner_id, "
+                 "toss_winner_id, toss_decision, batting_team_id, bowling_team_id, "
+                 "current_striker_id, non_striker_id, current_bowler_id, "
+                 "match_date, start_time, created_at")
+
+STATEMENTS = {
+    # --- common.py ---
+    "match_row": f"SELECT {MATCH_COLUMNS} FROM matches WHERE id = $1",
+    "player_row": "SELECT * FROM players WHERE id = $1",
+    "swap_strikers": "UPDATE matches SET current_striker_id = $1, non_striker_id = $2 WHERE id = $3",
+    "complete_over": "UPDATE matches SET overs = $1, balls = 0 WHERE id = $2",
+
+    # --- routes/matches.py: fetch_full_match_state ---
+    "state_header": """
+        SELECT m.id, m.current_inning, m.total_overs, m.target_score,
+               m.status, m.result_message,
+               m.current_striker_id, m.non_striker_id, m.current_bowler_id,
+               m.toss_winner_id, m.toss_decision,
+               m.team_a_id, m.team_b_id,
+               m.batting_team_id, m.bowling_team_id,
+               m.match_number, m.match_type,
+
+               t1.name as team_a_name, t1.short_name as team_a_short, t1.logo as team_a_logo, t1.team_color as team_a_color,
+               t2.name as team_b_name, t2.short_name as team_b_short, t2.logo as team_b_logo, t2.team_color as team_b_color
+        FROM matches m
+        LEFT JOIN teams t1 ON m.team_a_id = t1.id
+        LEFT JOIN teams t2 ON m.team_b_id = t2.id
+        WHERE m.id = $1
+    """,
+    "state_balls": f"SELECT {BALL_COLUMNS} FROM balls b WHERE b.match_id = $1 ORDER BY b.id",
+    "score_adjustment": "SELECT * FROM score_adjustments WHERE match_id = $1 AND inning_no = $2",
+    "player_card": "SELECT id, name, photo_url FROM players WHERE id = $1",
+    "last_wicket": """
+        SELECT
+            w.player_out_id, w.wicket_type,
+            p_out.name as batter_name,
+            p_bowl.name as bowler_name
+        FROM balls b
+        JOIN wickets w ON w.ball_id = b.id
+        JOIN players p_out ON w.player_out_id = p_out.id
+        JOIN players p_bowl ON b.bowler_id = p_bowl.id
+        WHERE b.match_id = $1 AND b.inning_no = $2 AND b.is_wicket = TRUE
+        ORDER BY b.id DESC
+        LIMIT 1
+    """,
+
+    # --- live_state: the rendered state, stored by every match write ---
+    "live_state": "SELECT live_state FROM matches WHERE id = $1",
+    "store_live_state": "UPDATE matches SET live_state = $2::jsonb WHERE id = $1",
+    # Team / player edits: rendered states naming them are dropped (rebuilt on read)
+    "drop_team_live_states": """
+        UPDATE matches SET live_state = NULL
+        WHERE live_state IS NOT NULL AND $1 IN (team_a_id, team_b_id)
+    """,
+    "drop_player_live_states": """
+        UPDATE matches m SET live_state = NULL
+        FROM players p
+        WHERE p.id = $1 AND m.live_state IS NOT NULL AND p.team_id IN (m.team_a_id, m.team_b_id)
+    """,
+
+    # --- routes/matches.py: scorecard ---
+    "scorecard_players": "SELECT id, name FROM players",
+    "scorecard_balls": f"""
+        SELECT {BALL_COLUMNS}, w.player_out_id, w.wicket_type, w.fielder_id as catcher_id
+        FROM balls b
+        LEFT JOIN wickets w ON b.id = w.ball_id
+        WHERE b.match_id = $1
+        ORDER BY b.id ASC
+    """,
+
+    # --- routes/commentary.py ---
+    "commentary_balls": f"""
+        SELECT {BALL_COLUMNS}, w.player_out_id, w.wicket_type, w.fielder_id as catcher_id
+        FROM balls b
+        LEFT JOIN wickets w ON b.id = w.ball_id
+        WHERE b.match_id = $1 AND b.inning_no = $2
+        ORDER BY b.id ASC
+    """,
+    "player_names": "SELECT id, name FROM players WHERE id = ANY($1::bigint[])",
+
+    # --- roster_cache.py ---
+    "roster_players": """
+        SELECT p.id, p.team_id, p.name, p.role, p.photo_url,
+               EXISTS (SELECT 1 FROM match_squads s
+                       WHERE s.match_id = m.id AND s.player_id = p.id AND s.is_playing_11) AS picked
+        FROM matches m
+        JOIN players p ON p.team_id IN (m.team_a_id, m.team_b_id)
+        WHERE m.id = $1
+        ORDER BY p.id
+    """,
+    "roster_outs": """
+        SELECT b.inning_no, w.player_out_id
+        FROM balls b
+        JOIN wickets w ON w.ball_id = b.id
+        WHERE b.match_id = $1
+    """,
+
+    # --- routes/matches.py: scorer bootstrap ---
+    "teams_list": "SELECT * FROM teams ORDER BY name",
+
+    # --- routes/scoring.py: update_score ---
+    "insert_ball": """
+        INSERT INTO balls (
+            match_id, inning_no, over_no, ball_no,
+            striker_id, non_striker_id, bowler_id,
+            runs_off_bat, extras, is_wicket, action_type,
+            extra_type, is_four, is_six, wicket_type
+        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+        RETURNING id
+    """,
+    "insert_ball_event": "INSERT INTO match_events (match_id, event_type, event_id) VALUES ($1, 'BALL', $2)",
+    "add_team_score": "UPDATE matches SET team_score = team_score + $1 WHERE id = $2",
+    "add_legal_ball": "UPDATE matches SET balls = balls + 1 WHERE id = $1",
+    "add_batter_runs": "UPDATE players SET runs=runs+$1, balls=balls+$2 WHERE id=$3",
+    "add_four": "UPDATE players SET fours=fours+1 WHERE id=$1",
+    "add_six": "UPDATE players SET sixes=sixes+1 WHERE id=$1",
+    "insert_wicket": "INSERT INTO wickets (ball_id, player_out_id, wicket_type, score_at_dismissal) VALUES ($1, $2, $3, $4)",
+    "add_wicket": "UPDATE matches SET wickets = wickets + 1 WHERE id = $1",
+    "mark_out": "UPDATE players SET is_out = TRUE WHERE id = $1",
+    "clear_striker": "UPDATE matches SET current_striker_id = NULL WHERE id = $1",
+    "clear_non_striker": "UPDATE matches SET non_striker_id = NULL WHERE id = $1",
+    "clear_bowler": "UPDATE matches SET current_bowler_id = NULL WHERE id = $1",
+}
+
+
+def is_transaction_pooler(dsn: str) -> bool:
+    """Best-effort guess: PgBouncer / Supavisor ports or a 'pooler' host name."""
+    try:
+        parsed = urlparse(dsn)
+        host = (parsed.hostname or "").lower()
+        return parsed.port in POOLER_PORTS or "pooler" in host or "pgbouncer" in host
+    except ValueError:
+        return False
+
+
+def resolve_mode(dsn: str) -> str:
+    if STATEMENT_MODE in ("named", "unnamed"):
+        return STATEMENT_MODE
+    return "unnamed" if is_transaction_pooler(dsn) else "named"
+
+
+def pool_options(dsn: str) -> dict:
+    """asyncpg.create_pool kwargs for the statement mode of this DSN."""
+    if resolve_mode(dsn) == "unnamed":
+        return {"statement_cache_size": 0}
+    return {
+        # Always room for the whole registry plus the colder ad-hoc queries
+        "statement_cache_size": max(STATEMENT_CACHE_SIZE, len(STATEMENTS) * 2),
+        # Plans stay for the life of the connection (asyncpg re-prepares on schema changes)
+        "max_cached_statement_lifetime": 0,
+    }
+
+
+# --- Call helpers: same signatures as asyncpg, statement name instead of SQL ---
+async def fetch(conn, name: str, *args):
+    return await conn.fetch(STATEMENTS[name], *args)
+
+async def fetchrow(conn, name: str, *args):
+    return await conn.fetchrow(STATEMENTS[name], *args)
+
+async def fetchval(conn, name: str, *args):
+    return await conn.fetchval(STATEMENTS[name], *args)
+
+async def execute(conn, name: str, *args):
+    return await conn.execute(STATEMENTS[name], *args)
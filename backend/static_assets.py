@@ -0,0 +1,254 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional: gzip variants are always built
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+COMPRESSIBLE = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map"}
+MIN_COMPRESS_BYTES = 512
+
+# Upload folders hold uuid-named files that never change once written, so they
+# are cacheable forever without fingerprinting (and must not be snapshotted at startup).
+UPLOAD_DIRS = ("logos/", "player_images/")
+
+# import x from './ui.js' / import './squad.js' / import('./ui.js')
+JS_IMPORT_RE = re.compile(r"""(\bfrom\s*|\bimport\s*\(?\s*)(['"])(\.{1,2}/[^'"]+?\.js)\2""")
+# href="../static/css/style.css" / src="/static/js/main.js"
+HTML_ASSET_RE = re.compile(r"""(["'(])(?:\.\./|/)static/([^"'()?#]+)""")
+
+
+def _fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _hashed_name(rel_path: str, fp: str) -> str:
+    """js/ui.js -> js/ui.3f2a9c1b7d.js"""
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{fp}{ext}"
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class Asset:
+    """One servable file: in-memory body (plus precompressed variants) or a path on disk."""
+    __slots__ = ("body", "gzip", "br", "etag", "media_type", "file_path")
+
+    def __init__(self, body: Optional[bytes], media_type: str, file_path: Optional[str] = None):
+        self.body = body
+        self.file_path = file_path
+        self.media_type = media_type
+        self.gzip = None
+        self.br = None
+        self.etag = None
+        if body is not None:
+            self.etag = f'"{_fingerprint(body)}"'
+            if len(body) >= MIN_COMPRESS_BYTES:
+                self.gzip = gzip.compress(body, compresslevel=9, mtime=0)
+                if brotli is not None:
+                    self.br = brotli.compress(body, quality=11)
+
+    def response(self, scope, cache_control: str) -> Response:
+        headers = {"cache-control": cache_control, "vary": "Accept-Encoding"}
+        if self.etag:
+            headers["etag"] = self.etag
+            if_none_match = _header(scope, b"if-none-match")
+            if if_none_match and self.etag in if_none_match:
+                return Response(status_code=304, headers=headers)
+
+        accept = _header(scope, b"accept-encoding")
+        body = self.body
+        if self.br is not None and _accepts(accept, "br"):
+            body = self.br
+            headers["content-encoding"] = "br"
+        elif self.gzip is not None and _accepts(accept, "gzip"):
+            body = self.gzip
+            headers["content-encoding"] = "gzip"
+
+        if scope["method"] == "HEAD":
+            headers["content-length"] = str(len(body))
+            body = b""
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+
+class AssetManifest:
+    """
+    Startup snapshot of frontend/static: content-hashed URLs, ETags and
+    precompressed gzip/brotli variants for every asset.
+
+    JS modules import each other through relative paths (and import each other
+    in cycles), so every module shares one fingerprint derived from the whole
+    JS set and its import specifiers are rewritten to the hashed names. That
+    keeps one instance per module and invalidates dependants correctly.
+    """
+    def __init__(self, static_dir: str):
+        self.static_dir = static_dir
+        self.urls: Dict[str, str] = {}       # js/ui.js -> js/ui.<hash>.js
+        self.plain: Dict[str, Asset] = {}
+        self.hashed: Dict[str, Asset] = {}
+
+    def build(self):
+        sources = {}
+        for root, _, files in os.walk(self.static_dir):
+            for name in files:
+                full_path = os.path.join(root, name)
+                rel_path = os.path.relpath(full_path, self.static_dir).replace(os.sep, "/")
+                if rel_path.startswith(UPLOAD_DIRS):
+                    continue
+                with open(full_path, "rb") as f:
+                    sources[rel_path] = (full_path, f.read())
+
+        js_paths = sorted(p for p in sources if p.endswith(".js"))
+        js_fp = _fingerprint(b"".join(p.encode() + sources[p][1] for p in js_paths))
+
+        urls = {}
+        for rel_path, (_, data) in sources.items():
+            fp = js_fp if rel_path.endswith(".js") else _fingerprint(data)
+            urls[rel_path] = _hashed_name(rel_path, fp)
+
+        plain, hashed = {}, {}
+        for rel_path, (full_path, data) in sources.items():
+            ext = os.path.splitext(rel_path)[1].lower()
+            media_type = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+            if ext == ".js":
+                data = self._rewrite_js_imports(rel_path, data, urls)
+            if ext in COMPRESSIBLE:
+                asset = Asset(data, media_type)
+            else:
+                # Binary assets (images) stay on disk
+                asset = Asset(None, media_type, file_path=full_path)
+            plain[rel_path] = asset
+            hashed[urls[rel_path]] = asset
+
+        self.urls, self.plain, self.hashed = urls, plain, hashed
+        logger.info("Static manifest built: %d assets", len(urls))
+
+    @staticmethod
+    def _rewrite_js_imports(rel_path: str, data: bytes, urls: Dict[str, str]) -> bytes:
+        base_dir = os.path.dirname(rel_path)
+        text = data.decode("utf-8")
+
+        def replace(m):
+            target = os.path.normpath(os.path.join(base_dir, m.group(3))).replace(os.sep, "/")
+            if target not in urls:
+                return m.group(0)
+            new_spec = "./" + os.path.relpath(urls[target], base_dir or ".").replace(os.sep, "/")
+            return f"{m.group(1)}{m.group(2)}{new_spec}{m.group(2)}"
+
+        return JS_IMPORT_RE.sub(replace, text).encode("utf-8")
+
+    def rewrite_html(self, text: str) -> str:
+        def replace(m):
+            hashed = self.urls.get(m.group(2))
+            if not hashed:
+                return m.group(0)
+            return f"{m.group(1)}/static/{hashed}"
+        return HTML_ASSET_RE.sub(replace, text)
+
+
+class AssetFiles:
+    """
+    ASGI app for /static. Hashed URLs are served with immutable cache headers,
+    plain URLs revalidate with ETags, anything unknown (fresh uploads) falls
+    back to StaticFiles.
+    """
+    def __init__(self, manifest: AssetManifest):
+        self.manifest = manifest
+        self.fallback = StaticFiles(directory=manifest.static_dir)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.fallback(scope, receive, send)
+
+        rel_path = self.fallback.get_path(scope).replace(os.sep, "/")
+
+        asset = self.manifest.hashed.get(rel_path)
+        cache_control = IMMUTABLE
+        if asset is None:
+            asset = self.manifest.plain.get(rel_path)
+            cache_control = REVALIDATE
+
+        if asset is not None and asset.body is not None:
+            return await asset.response(scope, cache_control)(scope, receive, send)
+
+        if asset is not None and cache_control == IMMUTABLE:
+            # Hashed binary asset (images) straight from disk
+            response = FileResponse(asset.file_path, media_type=asset.media_type, headers={"cache-control": IMMUTABLE})
+            return await response(scope, receive, send)
+
+        if asset is not None:
+            # Plain binary URL: StaticFiles answers conditional requests for us
+            return await self.fallback(scope, receive, _with_cache_control(send, REVALIDATE))
+
+        if rel_path.startswith(UPLOAD_DIRS):
+            return await self.fallback(scope, receive, _with_cache_control(send, IMMUTABLE))
+        return await self.fallback(scope, receive, send)
+
+
+class PageFiles:
+    """
+    ASGI app for / (frontend/pages). HTML is rewritten to hashed asset URLs
+    once at startup and served precompressed; pages always revalidate (ETag)
+    so a deploy is picked up immediately.
+    """
+    def __init__(self, pages_dir: str, manifest: AssetManifest):
+        self.pages_dir = pages_dir
+        self.manifest = manifest
+        self.pages: Dict[str, Asset] = {}
+        self.fallback = StaticFiles(directory=pages_dir, html=True)
+
+    def build(self):
+        pages = {}
+        for name in os.listdir(self.pages_dir):
+            if not name.endswith(".html"):
+                continue
+            with open(os.path.join(self.pages_dir, name), encoding="utf-8") as f:
+                html = self.manifest.rewrite_html(f.read())
+            pages[name] = Asset(html.encode("utf-8"), "text/html; charset=utf-8")
+        self.pages = pages
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            rel_path = self.fallback.get_path(scope).replace(os.sep, "/")
+            if rel_path in ("", "."):
+                rel_path = "index.html"
+            page = self.pages.get(rel_path)
+            if page is not None:
+                return await page.response(scope, REVALIDATE)(scope, receive, send)
+        return await self.fallback(scope, receive, send)
+
+
+def _with_cache_control(send, cache_control: str):
+    async def wrapped(message):
+        if message["type"] == "http.response.start" and message["status"] == 200:
+            headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+            headers.append((b"cache-control", cache_control.encode("latin-1")))
+            message = dict(message, headers=headers)
+        await send(message)
+    return wrapped
@@ -0,0 +1,76 @@
+import json
+from typing import List
+
+# Positional ticker message (one JSON array, this order). Embeds and overlays
+# index into it instead of parsing the full match state.
+TICKER_FIELDS = (
+    "team", "runs", "wickets", "overs", "target",
+    "striker", "striker_runs", "striker_balls",
+    "non_striker", "non_striker_runs", "non_striker_balls",
+    "bowler", "bowler_wickets", "bowler_runs", "bowler_overs",
+    "status", "result",
+)
+
+
+def _batters(state: dict):
+    """(striker, non-striker) from the state, None for an empty crease slot."""
+    striker = non_striker = None
+    for b in state.get('current_batsmen') or []:
+        if b.get('on_strike') and striker is None:
+            striker = b
+        else:
+            non_striker = b
+    return striker, non_striker
+
+
+def ticker_fields(state: dict) -> List:
+    """The state as a TICKER_FIELDS-ordered list."""
+    inn = state['innings']
+    striker, non_striker = _batters(state)
+    bowler = state.get('current_bowler')
+
+    def bat(b):
+        return [b['name'], b['runs'], b['balls']] if b else [None, None, None]
+
+    return [
+        state['batting_team'], inn['runs'], inn['wickets'], inn['overs'], inn['target'] or None,
+        *bat(striker), *bat(non_striker),
+        *([bowler['name'], bowler['wickets'], bowler['runs_conceded'], bowler['overs']] if bowler else [None] * 4),
+        state['status'], state['result_message'],
+    ]
+
+
+def match_summary(state: dict) -> str:
+    """One match on a multi-match dashboard (multiplexed streams)."""
+    inn = state['innings']
+    return json.dumps({
+        "match_id": state['match_id'], "batting": state['batting_team'], "bowling": state['bowling_team'],
+        "runs": inn['runs'], "wickets": inn['wickets'], "overs": inn['overs'],
+        "inning": inn['current_inning'], "target": inn['target'] or None,
+        "status": state['status'], "result": state['result_message'],
+    }, separators=(",", ":"))
+
+
+def ticker_json(state: dict) -> str:
+    return json.dumps(ticker_fields(state), separators=(",", ":"))
+
+
+def ticker_text(state: dict) -> str:
+    """One line, e.g. "Lions 123/4 (15.2) — Ravi 45*(30), Sam 12(9), Khan 2-24"."""
+    inn = state['innings']
+    line = f"{state['batting_team']} {inn['runs']}/{inn['wickets']} ({inn['overs']})"
+    if inn['target']:
+        line += f" target {inn['target']}"
+    if state['status'] == 'completed' and state['result_message']:
+        return f"{line} — {state['result_message']}"
+
+    parts = []
+    striker, non_striker = _batters(state)
+    if striker:
+        parts.append(f"{striker['name']} {striker['runs']}*({striker['balls']})")
+    if non_striker:
+        parts.append(f"{non_striker['name']} {non_striker['runs']}({non_striker['balls']})")
+    bowler = state.get('current_bowler')
+    if bowler:
+        parts.append(f"{bowler['name']} {bowler['wickets']}-{bowler['runs_conceded']}")
+    return f"{line} — {', '.join(parts)}" if parts else line
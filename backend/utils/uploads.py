@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional: without it we just keep the original file
+    Image = None
+    ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+# --- Paths (shared by teams.py / players.py / matches.py) ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # backend/utils
+BACKEND_DIR = os.path.dirname(BASE_DIR) # backend
+PROJECT_DIR = os.path.dirname(BACKEND_DIR) # root
+STATIC_DIR = os.path.join(PROJECT_DIR, "frontend", "static")
+LOGO_DIR = os.path.join(STATIC_DIR, "logos")
+PLAYER_IMG_DIR = os.path.join(STATIC_DIR, "player_images")
+
+# --- Limits & Derivative Sizes ---
+MAX_UPLOAD_BYTES = int(float(os.getenv("UPLOAD_MAX_MB", "5")) * 1024 * 1024)
+COPY_CHUNK_BYTES = 64 * 1024
+LOGO_SIZE = 128    # Scoreboard shows logos at 60px -> 2x for retina
+AVATAR_SIZE = 200  # Profile avatar is 100px -> 2x for retina
+DERIVATIVE_EXT = "webp"
+
+# Resizing is CPU bound; Pillow releases the GIL while decoding/resampling,
+# so a small thread pool keeps it off the event loop without forking.
+_image_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("IMAGE_WORKERS", "2")),
+    thread_name_prefix="image-worker"
+)
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def _copy_limited(src, dest_path: str, max_bytes: int):
+    """Blocking copy (runs in a worker thread). Aborts once max_bytes is exceeded."""
+    written = 0
+    tmp_path = dest_path + ".part"
+    try:
+        with open(tmp_path, "wb") as out:
+            while True:
+                chunk = src.read(COPY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge(f"File exceeds {max_bytes // (1024 * 1024)} MB limit")
+                out.write(chunk)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+def _render_derivative(src_path: str, dest_path: str, size: int, crop: bool):
+    """Blocking resize (runs in the image pool)."""
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        if crop:
+            # Avatars: centre-cropped square
+            img = ImageOps.fit(img, (size, size), Image.LANCZOS)
+        else:
+            # Logos: keep aspect ratio, never upscale
+            img.thumbnail((size, size), Image.LANCZOS)
+        img.save(dest_path, "WEBP", quality=85, method=4)
+
+
+def derivative_name(filename: str, size: int) -> str:
+    """team_5_3a8ae917.png -> team_5_3a8ae917_128.webp"""
+    stem = filename.rsplit(".", 1)[0]
+    return f"{stem}_{size}.{DERIVATIVE_EXT}"
+
+
+async def save_image_upload(file, dest_dir: str, prefix: str, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    """
+    Streams an UploadFile to dest_dir without blocking the event loop.
+    Returns the stored filename (e.g. team_5_3a8ae917.png).
+    """
+    if not file.content_type or not file.content_type.startswith("image/"):
+        raise ValueError("File must be an image")
+
+    # Fast reject when the multipart parser already knows the size
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(f"File exceeds {max_bytes // (1024 * 1024)} MB limit")
+
+    original_name = file.filename or ""
+    extension = original_name.rsplit(".", 1)[-1].lower() if "." in original_name else ""
+    if not extension: extension = "png"
+
+    filename = f"{prefix}_{uuid.uuid4().hex[:8]}.{extension}"
+    dest_path = os.path.join(dest_dir, filename)
+
+    await asyncio.to_thread(_copy_limited, file.file, dest_path, max_bytes)
+    return filename
+
+
+async def make_derivative(dest_dir: str, filename: str, size: int, crop: bool = False):
+    """
+    Generates a fixed-size derivative in the image pool.
+    Returns the derivative filename, or None if Pillow is missing / the image can't be decoded.
+    """
+    if Image is None:
+        logger.warning("Pillow not installed; serving original upload %s", filename)
+        return None
+
+    thumb_name = derivative_name(filename, size)
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(
+            _image_pool, _render_derivative,
+            os.path.join(dest_dir, filename), os.path.join(dest_dir, thumb_name), size, crop
+        )
+    except Exception as e:
+        logger.warning("Derivative generation failed for %s: %s", filename, e)
+        return None
+    return thumb_name
+
+
+def shutdown_image_pool():
+    _image_pool.shutdown(wait=False, cancel_futures=True)
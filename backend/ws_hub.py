@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional
+
+import sse_manager
+
+try:
+    import msgpack
+except ImportError:  # in requirements.txt; without it ?format=msgpack sockets are refused (1003)
+    msgpack = None
+
+FORMATS = ("json", "msgpack")
+
+logger = logging.getLogger(__name__)
+
+
+def encode(message: dict, fmt: str):
+    """bytes (binary frame) for msgpack, str (text frame) for json."""
+    if fmt == "msgpack":
+        return msgpack.packb(message, use_bin_type=True, default=str)
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+
+def decode(raw) -> dict:
+    """A client message: binary frames are msgpack, text frames JSON."""
+    if isinstance(raw, (bytes, bytearray)):
+        if msgpack is None:
+            raise ValueError("msgpack frames need the msgpack package on the server")
+        return msgpack.unpackb(raw, raw=False)
+    return json.loads(raw)
+
+
+def shallow_delta(old: dict, new: dict) -> dict:
+    """Top-level keys of `new` that differ from `old`, and the keys `new` dropped."""
+    changed = {k: v for k, v in new.items() if k not in old or old[k] != v}
+    return {"d": changed, "x": [k for k in old if k not in new]}
+
+
+class Frame:
+    """
+    One broadcast. Sockets that saw the previous one (`base`) get the delta,
+    anyone else the full state; each is encoded at most once per format.
+    """
+    __slots__ = ("seq", "base", "state", "delta", "_encoded")
+
+    def __init__(self, seq: int, base: Optional[int], state: dict, delta: Optional[dict]):
+        self.seq = seq
+        self.base = base
+        self.state = state
+        self.delta = delta
+        self._encoded: Dict[tuple, object] = {}
+
+    def encoded(self, last_seq: Optional[int], fmt: str):
+        kind = "delta" if self.delta is not None and last_seq == self.base else "state"
+        message = self._encoded.get((kind, fmt))
+        if message is None:
+            if kind == "delta":
+                body = {"t": "delta", "seq": self.seq, "base": self.base, **self.delta}
+            else:
+                body = {"t": "state", "seq": self.seq, "d": self.state}
+            message = self._encoded[(kind, fmt)] = encode(body, fmt)
+        return message
+
+
+def supported(fmt: str) -> bool:
+    return fmt in FORMATS and (fmt != "msgpack" or msgpack is not None)
+
+
+class MatchFeed:
+    __slots__ = ("seq", "state", "queues", "consoles")
+
+    def __init__(self):
+        self.seq = 0
+        self.state: Optional[dict] = None
+        self.queues: List[asyncio.Queue] = []
+        # Feedless sockets (?feed=false): no broadcasts, but counted and drained
+        self.consoles: List[asyncio.Queue] = []
+
+
+class WsHub:
+    """
+    match_id -> WebSocket listeners. Shares the SSE connection caps and
+    stalled-listener limit (sse_manager); the socket protocol itself lives
+    in routes/live_socket.py.
+    """
+    def __init__(self):
+        self.feeds: Dict[int, MatchFeed] = {}
+        self.connections = 0
+        self.reaped = 0
+
+    def admit(self, match_id: int) -> bool:
+        """Same caps as SSE, counted over both transports."""
+        sse = sse_manager.manager
+        total = sse.connections + self.connections
+        feed = self.feeds.get(match_id)
+        per_match = sse.per_match.get(match_id, 0) + (len(feed.queues) + len(feed.consoles) if feed else 0)
+        full = (sse_manager.SSE_MAX_CONNECTIONS and total >= sse_manager.SSE_MAX_CONNECTIONS) or \
+               (sse_manager.SSE_MAX_PER_MATCH and per_match >= sse_manager.SSE_MAX_PER_MATCH)
+        if full:
+            sse.rejected += 1
+        return not full
+
+    def subscribe(self, match_id: int, feed: bool = True) -> asyncio.Queue:
+        """A socket's queue: broadcast frames (unless feed=False) and its action replies."""
+        q = asyncio.Queue()
+        match_feed = self.feeds.setdefault(match_id, MatchFeed())
+        (match_feed.queues if feed else match_feed.consoles).append(q)
+        self.connections += 1
+        return q
+
+    def unsubscribe(self, match_id: int, q: asyncio.Queue):
+        feed = self.feeds.get(match_id)
+        if feed is None:
+            return
+        for queues in (feed.queues, feed.consoles):
+            if q in queues:
+                queues.remove(q)
+                self.connections -= 1
+                break
+        if not feed.queues and not feed.consoles:
+            del self.feeds[match_id]
+
+    def seen(self, match_id: int, state: dict) -> Optional[int]:
+        """
+        The seq of `state` (just sent to a new socket) if it's the feed's
+        latest, so the next broadcast can go out as a delta; None otherwise.
+        """
+        feed = self.feeds.get(match_id)
+        if feed is None:
+            return None
+        if feed.state is None:
+            feed.state = state  # first socket: deltas start from what it was sent
+        return feed.seq if feed.state is state else None
+
+    def broadcast(self, match_id: int, state: dict):
+        """Queue a frame (delta against the previous broadcast) for every socket on the match."""
+        feed = self.feeds.get(match_id)
+        if feed is None:
+            return
+        if not feed.queues:
+            feed.state = None  # only consoles: the next viewer's state is the base
+            return
+        delta = shallow_delta(feed.state, state) if feed.state is not None else None
+        frame = Frame(feed.seq + 1, feed.seq if delta is not None else None, state, delta)
+        feed.seq, feed.state = frame.seq, state
+
+        for q in list(feed.queues):
+            if q.qsize() >= sse_manager.SSE_QUEUE_MAX:
+                # Not reading: let it go, like a stalled SSE listener
+                self.unsubscribe(match_id, q)
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(None)
+                self.reaped += 1
+                logger.warning("🔌 WS: Reaped a listener %s messages behind", sse_manager.SSE_QUEUE_MAX)
+            else:
+                q.put_nowait(frame)
+
+    def drain(self) -> int:
+        """Shutdown: end every socket (its sender closes with 1012, service restart)."""
+        count = 0
+        for feed in self.feeds.values():
+            for q in feed.queues + feed.consoles:
+                q.put_nowait(None)
+                count += 1
+        return count
+
+
+# Global Instance to be imported elsewhere
+ws_hub = WsHub()
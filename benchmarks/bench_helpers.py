@@ -0,0 +1,269 @@
+"""
+Microbenchmarks for the pure-Python hot path behind /match_data and /scorecard:
+calculate_match_score, get_player_stats, format_timeline (utils/match_helpers.py)
+and build_inning_scorecard, over synthetic T10 / T20 / ODI ball lists.
+
+For every (format, function) this records:
+  * us_per_call - best-of-N mean wall time per call (timeit),
+  * peak_kb     - tracemalloc peak while one call runs,
+  * blocks      - memory blocks still alive after the call (the result it returns).
+
+No database needed: balls are generated with a fixed seed, shaped like the rows
+the routes get back (state_balls / scorecard_balls), so runs are comparable.
+
+Usage (from the repo root):
+    python benchmarks/bench_helpers.py                  # print results
+    python benchmarks/bench_helpers.py --save           # write benchmarks/baseline_helpers.json
+    python benchmarks/bench_helpers.py --compare        # diff against the baseline, exit 1 on regression
+    python benchmarks/bench_helpers.py --compare --threshold 0.2 --formats t20
+
+Timings depend on the machine: re-save the baseline on the box you compare on.
+The minimum of many short runs is used because noise (other processes, VM CPU
+steal) only ever adds time.
+peak_kb / blocks are deterministic for a given Python version - any change
+there is real.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from utils.match_helpers import (  # noqa: E402
+    BallRecord, build_inning_scorecard, calculate_match_score, format_timeline, get_player_stats,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline_helpers.json")
+# format -> (overs per side, chance a legal delivery takes a wicket)
+FORMATS = {"t10": (10, 1 / 18), "t20": (20, 1 / 22), "odi": (50, 1 / 40)}
+SEED = 2024
+
+# Per-delivery outcome weights, roughly a T20 scoring distribution
+RUN_WEIGHTS = [(0, 38), (1, 34), (2, 9), (3, 1), (4, 12), (6, 6)]
+EXTRA_WEIGHTS = [(None, 93), ("wide", 3), ("noball", 1), ("leg-bye", 2), ("bye", 1)]
+WICKET_TYPES = [("caught", 55), ("bowled", 18), ("lbw", 12), ("runout", 10), ("stumped", 5)]
+
+
+def _pick(rng, weighted):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def generate_match(overs: int, wicket_chance: float = 1 / 22, seed: int = SEED):
+    """
+    Two complete innings of `overs` overs (or all out) as a list of BallRecord,
+    ordered by id like the DB returns them. Players: team A 101-111, team B 201-211.
+
+    Returns (balls, p_map).
+    """
+    rng = random.Random(seed)
+    balls = []
+    ball_id = 0
+    p_map = {pid: f"Player {pid}" for base in (100, 200) for pid in range(base + 1, base + 12)}
+
+    for inning_no, (bat_base, bowl_base) in enumerate(((100, 200), (200, 100)), start=1):
+        batters = [bat_base + i for i in range(1, 12)]
+        bowlers = [bowl_base + i for i in range(7, 12)]  # five bowlers, tail of the XI
+        fielders = [bowl_base + i for i in range(1, 12)]
+        striker, non_striker = batters[0], batters[1]
+        next_in = 2
+        wickets = 0
+        legal = 0
+        bowler = None
+
+        while legal < overs * 6 and wickets < 10:
+            if legal % 6 == 0:
+                bowler = rng.choice([b for b in bowlers if b != bowler])
+
+            extra_type = _pick(rng, EXTRA_WEIGHTS)
+            runs = _pick(rng, RUN_WEIGHTS)
+            extras = 0
+            if extra_type == "wide":
+                runs, extras = 0, 1 + rng.choice((0, 0, 0, 4))
+            elif extra_type == "noball":
+                extras = 1
+            elif extra_type in ("bye", "leg-bye"):
+                runs, extras = 0, rng.choice((1, 1, 2, 4))
+
+            is_wicket = extra_type is None and rng.random() < wicket_chance
+            wicket_type = player_out = catcher = None
+            if is_wicket:
+                runs = 0
+                wicket_type = _pick(rng, WICKET_TYPES)
+                player_out = non_striker if wicket_type == "runout" and rng.random() < 0.4 else striker
+                if wicket_type in ("caught", "runout", "stumped"):
+                    catcher = rng.choice(fielders)
+
+            ball_id += 1
+            balls.append(BallRecord(
+                id=ball_id,
+                inning_no=inning_no,
+                over_no=legal // 6,
+                ball_no=legal % 6 + 1,
+                striker_id=striker,
+                bowler_id=bowler,
+                runs_off_bat=runs,
+                extras=extras,
+                extra_type=extra_type,
+                is_wicket=is_wicket,
+                player_out_id=player_out,
+                wicket_type=wicket_type,
+                catcher_id=catcher,
+            ))
+
+            if extra_type not in ("wide", "noball"):
+                legal += 1
+            if is_wicket:
+                wickets += 1
+                if wickets < 10:
+                    if player_out == striker:
+                        striker = batters[next_in]
+                    else:
+                        non_striker = batters[next_in]
+                    next_in += 1
+            elif (runs + (extras if extra_type in ("bye", "leg-bye") else 0)) % 2 == 1:
+                striker, non_striker = non_striker, striker
+            if legal % 6 == 0 and extra_type not in ("wide", "noball"):
+                striker, non_striker = non_striker, striker
+
+    return balls, p_map
+
+
+def cases(balls, p_map, overs):
+    """name -> zero-arg callable, mirroring how fetch_full_match_state / the scorecard call them."""
+    match_info = {"id": 1, "current_inning": 2, "total_overs": overs}
+    adjustments = {"runs_adjustment": 0, "wickets_adjustment": 0, "balls_adjustment": 0}
+    return {
+        "calculate_match_score": lambda: calculate_match_score(balls, match_info, adjustments),
+        "get_player_stats": lambda: get_player_stats(balls, match_info),
+        "format_timeline": lambda: format_timeline(balls, 2),
+        "build_inning_scorecard": lambda: build_inning_scorecard(balls, 1, p_map),
+    }
+
+
+def time_call(fn, min_time: float = 0.5, repeat: int = 25) -> float:
+    """Best mean seconds per call over `repeat` short runs totalling about `min_time`."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()  # first `number` with a run >= 0.2s
+    number = max(1, int(number * min_time / repeat / elapsed))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure_allocations(fn):
+    """(peak KiB while running, blocks still held afterwards) for a single call."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    own = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    diff = after.filter_traces(own).compare_to(before.filter_traces(own), "filename")
+    held = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+    del result
+    return round((peak - base) / 1024, 1), held
+
+
+def run(formats, min_time: float):
+    results = {}
+    for fmt in formats:
+        overs, wicket_chance = FORMATS[fmt]
+        balls, p_map = generate_match(overs, wicket_chance)
+        results[fmt] = {"balls": len(balls), "functions": {}}
+        for name, fn in cases(balls, p_map, overs).items():
+            fn()  # warm up
+            per_call = time_call(fn, min_time)
+            peak_kb, blocks = measure_allocations(fn)
+            results[fmt]["functions"][name] = {
+                "us_per_call": round(per_call * 1e6, 2),
+                "peak_kb": peak_kb,
+                "blocks": blocks,
+            }
+    return results
+
+
+def print_results(results, baseline=None):
+    print(f"{'format':<6} {'function':<24} {'us/call':>10} {'peak KiB':>10} {'blocks':>8}"
+          + (f" {'vs baseline':>14}" if baseline else ""))
+    for fmt, data in results.items():
+        for name, r in data["functions"].items():
+            line = f"{fmt:<6} {name:<24} {r['us_per_call']:>10.2f} {r['peak_kb']:>10.1f} {r['blocks']:>8}"
+            base = (baseline or {}).get(fmt, {}).get("functions", {}).get(name)
+            if base:
+                line += f" {(r['us_per_call'] / base['us_per_call'] - 1) * 100:>+13.1f}%"
+            print(line)
+        print(f"{'':<6} ({data['balls']} balls)")
+
+
+def compare(results, baseline, threshold: float):
+    """Regressions: slower than baseline by more than `threshold`, or a bigger allocation peak."""
+    regressions = []
+    for fmt, data in results.items():
+        for name, r in data["functions"].items():
+            base = baseline.get(fmt, {}).get("functions", {}).get(name)
+            if not base:
+                continue
+            if r["us_per_call"] > base["us_per_call"] * (1 + threshold):
+                regressions.append(f"{fmt}/{name}: {base['us_per_call']}us -> {r['us_per_call']}us")
+            if r["peak_kb"] > base["peak_kb"] * (1 + threshold) + 1:
+                regressions.append(f"{fmt}/{name}: peak {base['peak_kb']}KiB -> {r['peak_kb']}KiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--formats", default=",".join(FORMATS), help="comma list of t10,t20,odi")
+    parser.add_argument("--min-time", type=float, default=0.5, help="timing budget per function, seconds")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="compare against the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+
+    results = run(formats, args.min_time)
+
+    baseline = None
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()}",
+                "seed": SEED,
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+Match-day load generator: N scorers playing full matches through the API
+while M viewers hold /api/stream/{match_id} open.
+
+Each scorer plays a real two-innings game at a configurable ball cadence:
+runs, boundaries, wides, no-balls, byes, wickets (new batter), over changes
+(new bowler), occasional undo, the inning break and end of match.
+
+Reported:
+  * scoring latency p50/p90/p99/max per endpoint (+ errors)
+  * broadcast latency: scorer request sent -> SSE event received by a viewer
+    (covers the commit, the state rebuild and the fan-out), and the spread
+    between the first and last viewer of the same update
+  * RSS start/peak/end (polled from /memory) and DB pool saturation (/db_pools, with
+    --admin-token)
+
+Teams and players are seeded straight into Postgres (DATABASE_URL) and
+removed again with --cleanup. Run the server separately, e.g.
+
+    cd backend && uvicorn main:app --port 8000
+    DATABASE_URL=postgresql://... python benchmarks/loadtest.py \\
+        --matches 10 --viewers 2000 --overs 5 --ball-interval 2 --cleanup
+
+Needs httpx for the scorers; viewers use raw asyncio sockets so thousands
+of them fit in one process.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import asyncpg
+from dotenv import load_dotenv
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - dev tool
+    raise SystemExit("loadtest.py needs httpx: pip install httpx")
+
+load_dotenv()
+
+# (action, value, weight) - roughly a T20 ball distribution
+OUTCOMES = [
+    ("run", 0, 34), ("run", 1, 30), ("run", 2, 8), ("run", 3, 1),
+    ("boundary", 4, 10), ("boundary", 6, 5),
+    ("wide", 0, 4), ("noball", 0, 1), ("bye", 1, 1), ("leg-bye", 1, 2),
+    ("wicket", "bowled", 4),
+]
+ACTIONS = [(a, v) for a, v, _ in OUTCOMES]
+WEIGHTS = [w for _, _, w in OUTCOMES]
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def summarize_ms(values):
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p90_ms": round(percentile(values, 90) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.latency = defaultdict(list)    # endpoint -> [seconds]
+        self.errors = defaultdict(int)
+        self.last_send = {}                  # match_id -> perf_counter of last scorer request
+        self.broadcast = []                  # send -> viewer receipt
+        self.receipts = defaultdict(list)    # (match_id, send_ts) -> [receipt times]
+        self.events = 0
+        self.viewers_connected = 0
+        self.viewers_failed = 0
+        self.viewers_dropped = 0
+        self.rss = []
+        self.pools = []
+        self.balls = 0
+
+
+async def seed_teams(dsn, n_matches, tag):
+    """Two fresh teams of 11 per match (players carry per-player counters, so no sharing)."""
+    conn = await asyncpg.connect(dsn)
+    fixtures = []
+    try:
+        async with conn.transaction():
+            for i in range(n_matches):
+                sides = []
+                for side in ("A", "B"):
+                    name = f"LT {tag} {i}{side}"
+                    team_id = await conn.fetchval(
+                        "INSERT INTO teams (name, short_name) VALUES ($1, $2) RETURNING id", name, f"{side}{i}")
+                    rows = await conn.fetch(
+                        "INSERT INTO players (team_id, name) SELECT $1, $2 || ' P' || g FROM generate_series(1, 11) g RETURNING id",
+                        team_id, name)
+                    sides.append((team_id, [r["id"] for r in rows]))
+                fixtures.append(sides)
+    finally:
+        await conn.close()
+    return fixtures
+
+
+async def cleanup(dsn, fixtures, match_ids):
+    team_ids = [t for sides in fixtures for t, _ in sides]
+    conn = await asyncpg.connect(dsn)
+    try:
+        async with conn.transaction():
+            await conn.execute("DELETE FROM wickets WHERE ball_id IN (SELECT id FROM balls WHERE match_id = ANY($1::bigint[]))", match_ids)
+            for table in ("balls", "match_events", "score_adjustments"):
+                await conn.execute(f"DELETE FROM {table} WHERE match_id = ANY($1::bigint[])", match_ids)
+            await conn.execute("DELETE FROM match_squads WHERE match_id = ANY($1::bigint[])", match_ids)
+            await conn.execute("DELETE FROM matches WHERE id = ANY($1::bigint[])", match_ids)
+            await conn.execute("DELETE FROM players WHERE team_id = ANY($1::bigint[])", team_ids)
+            await conn.execute("DELETE FROM teams WHERE id = ANY($1::bigint[])", team_ids)
+    except Exception as e:
+        print(f"cleanup failed (remove 'LT ...' teams by hand): {e}")
+    finally:
+        await conn.close()
+
+
+async def viewer(host, port, match_id, rec, stop):
+    """Minimal SSE client: one socket, count `data:` lines."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port, limit=2 ** 20)
+    except OSError:
+        rec.viewers_failed += 1
+        return
+    try:
+        writer.write((f"GET /api/stream/{match_id} HTTP/1.1\r\nHost: {host}\r\n"
+                      "Accept: text/event-stream\r\nConnection: keep-alive\r\n\r\n").encode())
+        await writer.drain()
+        status = await reader.readline()
+        if b" 200 " not in status:
+            rec.viewers_failed += 1
+            return
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        rec.viewers_connected += 1
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                rec.viewers_dropped += 1
+                return
+            if line.startswith(b"data:"):
+                now = time.perf_counter()
+                rec.events += 1
+                sent = rec.last_send.get(match_id)
+                if sent is not None:
+                    rec.broadcast.append(now - sent)
+                    rec.receipts[(match_id, sent)].append(now)
+    except (OSError, asyncio.IncompleteReadError):
+        rec.viewers_dropped += 1
+    finally:
+        writer.close()
+
+
+class Scorer:
+    def __init__(self, client, rec, match_id, fixture, args, rng):
+        self.client = client
+        self.rec = rec
+        self.match_id = match_id
+        self.fixture = fixture
+        self.args = args
+        self.rng = rng
+
+    async def post(self, endpoint, path, payload):
+        self.rec.last_send[self.match_id] = start = time.perf_counter()
+        try:
+            r = await self.client.post(path, json=payload)
+            self.rec.latency[endpoint].append(time.perf_counter() - start)
+            body = r.json()
+        except (httpx.HTTPError, ValueError):
+            self.rec.errors[endpoint] += 1
+            return {}
+        if r.status_code >= 400 or (isinstance(body, dict) and (body.get("status") == "error" or "error" in body)):
+            self.rec.errors[endpoint] += 1
+        return body
+
+    async def ensure_crease(self, state, batters, bowlers):
+        """Fill whatever the last response left empty: striker, non-striker, bowler."""
+        present = {b.get("on_strike") for b in (state.get("current_batsmen") or []) if not b.get("empty")}
+        for role, on_strike in (("striker", True), ("non_striker", False)):
+            if on_strike not in present and batters:
+                state = await self.post("set_batsman", f"/api/matches/{self.match_id}/set_batsman",
+                                        {"match_id": self.match_id, "new_player_id": batters.pop(0), "role": role})
+        if not state.get("current_bowler"):
+            bowlers.rotate()
+            state = await self.post("set_bowler", "/api/set_bowler",
+                                    {"match_id": self.match_id, "new_player_id": bowlers.current})
+        return state
+
+    async def play_innings(self, batting, bowling, deadline):
+        batters = list(batting[1])
+        bowlers = BowlerRotation(bowling[1][-5:])
+        state = await self.ensure_crease({}, batters, bowlers)
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.args.ball_interval * self.rng.uniform(0.5, 1.5))
+            action, value = self.rng.choices(ACTIONS, WEIGHTS)[0]
+            res = await self.post("update_score", "/api/update_score",
+                                  {"match_id": self.match_id, "action": action, "value": value})
+            self.rec.balls += 1
+            status = res.get("status")
+            state = res.get("data") or state
+            innings = state.get("innings") or {}
+            if status == "success" and self.rng.random() < self.args.undo_rate:
+                res = await self.post("undo", "/api/undo_last_action", {"match_id": self.match_id})
+                state = res.get("data") or state
+            overs_done = int(str(innings.get("overs", "0")).split(".")[0])
+            target = innings.get("target") or 0
+            if (status == "innings_over" or innings.get("wickets", 0) >= 10 or overs_done >= self.args.overs
+                    or (target and innings.get("runs", 0) >= target) or not batters and status == "wicket_fall"):
+                return
+            state = await self.ensure_crease(state, batters, bowlers)
+
+    async def run(self, deadline):
+        team_a, team_b = self.fixture
+        await self.play_innings(team_a, team_b, deadline)
+        await self.post("end_inning", "/api/end_inning", {"match_id": self.match_id})
+        await self.play_innings(team_b, team_a, deadline)
+        await self.post("end_match", "/api/end_match", {"match_id": self.match_id})
+
+
+class BowlerRotation:
+    def __init__(self, players):
+        self.players = players
+        self.index = -1
+
+    def rotate(self):
+        self.index = (self.index + 1) % len(self.players)
+
+    @property
+    def current(self):
+        return self.players[self.index]
+
+
+async def monitor(client, rec, stop, interval=1.0):
+    while not stop.is_set():
+        try:
+            mem = (await client.get("/memory")).json()
+            rec.rss.append(mem["ram_used_mb"])
+            pools = await client.get("/db_pools")
+            if pools.status_code == 200:  # needs --admin-token
+                rec.pools.append(pools.json())
+        except (httpx.HTTPError, ValueError, KeyError):
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def pool_report(samples):
+    lanes = {}
+    for sample in samples:
+        for lane, s in sample.items():
+            agg = lanes.setdefault(lane, {"samples": 0, "saturated_samples": 0, "peak_size": 0,
+                                          "max_size": s["max_size"], "peak_waiting": 0, "wait_max_ms": 0.0,
+                                          "wait_avg_ms": 0.0})
+            agg["samples"] += 1
+            agg["peak_size"] = max(agg["peak_size"], s["size"])
+            agg["peak_waiting"] = max(agg["peak_waiting"], s["waiting"])
+            agg["wait_max_ms"] = max(agg["wait_max_ms"], s["wait_max_ms"])
+            agg["wait_avg_ms"] = s["wait_avg_ms"]  # cumulative on the server: last sample wins
+            if s["size"] >= s["max_size"] and (s["waiting"] > 0 or s["idle"] == 0):
+                agg["saturated_samples"] += 1
+    for agg in lanes.values():
+        agg["saturated_pct"] = round(agg.pop("saturated_samples") * 100 / max(agg["samples"], 1), 1)
+    return lanes
+
+
+def build_report(rec, args, elapsed):
+    spreads = [max(ts) - min(ts) for ts in rec.receipts.values() if len(ts) > 1]
+    return {
+        "config": {k: getattr(args, k) for k in ("matches", "viewers", "overs", "ball_interval", "undo_rate")},
+        "elapsed_s": round(elapsed, 1),
+        "balls_scored": rec.balls,
+        "scoring_latency": {ep: summarize_ms(v) for ep, v in sorted(rec.latency.items())},
+        "errors": dict(rec.errors),
+        "viewers": {"connected": rec.viewers_connected, "failed": rec.viewers_failed,
+                    "dropped": rec.viewers_dropped, "events_received": rec.events},
+        "broadcast_latency": summarize_ms(rec.broadcast),
+        "broadcast_viewer_spread": summarize_ms(spreads),
+        "rss_mb": {"start": rec.rss[0] if rec.rss else None, "peak": max(rec.rss) if rec.rss else None,
+                   "end": rec.rss[-1] if rec.rss else None,
+                   "growth": round(rec.rss[-1] - rec.rss[0], 2) if rec.rss else None},
+        "db_pools": pool_report(rec.pools),
+    }
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+async def main(args):
+    dsn = args.database_url
+    fd_limit = raise_fd_limit()
+    if args.viewers + 100 > fd_limit:
+        print(f"warning: {args.viewers} viewers but the fd limit is {fd_limit}")
+
+    rng = random.Random(args.seed)
+    tag = uuid.uuid4().hex[:6]
+    fixtures = await seed_teams(dsn, args.matches, tag)
+    base = urlparse(args.base_url)
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=args.matches * 2 + 10, max_keepalive_connections=args.matches * 2 + 10)
+    match_ids = []
+
+    headers = {"X-Admin-Token": args.admin_token} if args.admin_token else {}
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30, limits=limits, headers=headers) as client:
+        for (team_a, _), (team_b, _) in fixtures:
+            r = await client.post("/api/matches", json={
+                "batting_team_id": team_a, "bowling_team_id": team_b, "total_overs": args.overs})
+            match_ids.append(r.json()["match_id"])
+        print(f"seeded {len(match_ids)} matches ({tag}); connecting {args.viewers} viewers...")
+
+        stop = asyncio.Event()
+        viewers = []
+        for i in range(args.viewers):
+            viewers.append(asyncio.create_task(
+                viewer(base.hostname, base.port or 80, match_ids[i % len(match_ids)], rec, stop)))
+            if i % 200 == 199:  # stagger the connect storm
+                await asyncio.sleep(0.05)
+        await asyncio.sleep(1.0)
+        print(f"viewers connected: {rec.viewers_connected}, failed: {rec.viewers_failed}; scoring...")
+
+        mon = asyncio.create_task(monitor(client, rec, stop))
+        started = time.perf_counter()
+        deadline = time.monotonic() + args.duration if args.duration else float("inf")
+        scorers = [Scorer(client, rec, mid, fixture, args, random.Random(rng.random()))
+                   for mid, fixture in zip(match_ids, fixtures)]
+        await asyncio.gather(*(s.run(deadline) for s in scorers))
+        await asyncio.sleep(1.0)  # let the last broadcasts land
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        for task in viewers:
+            task.cancel()
+        await asyncio.gather(*viewers, mon, return_exceptions=True)
+
+    report = build_report(rec, args, elapsed)
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.cleanup:
+        await cleanup(dsn, fixtures, match_ids)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--base-url", default="http://127.0.0.1:8000")
+    p.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="for seeding teams/players")
+    p.add_argument("--admin-token", default=os.getenv("ADMIN_TOKEN"), help="for the /db_pools samples")
+    p.add_argument("--matches", type=int, default=4)
+    p.add_argument("--viewers", type=int, default=500, help="total SSE viewers, spread over the matches")
+    p.add_argument("--overs", type=int, default=5, help="overs per innings")
+    p.add_argument("--ball-interval", type=float, default=2.0, help="mean seconds between balls per match")
+    p.add_argument("--undo-rate", type=float, default=0.02, help="chance of undoing a plain ball")
+    p.add_argument("--duration", type=float, default=0, help="stop scoring after N seconds (0 = full matches)")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--json", help="also write the report to this file")
+    p.add_argument("--cleanup", action="store_true", help="delete the seeded teams/matches afterwards")
+    args = p.parse_args()
+    if not args.database_url:
+        p.error("DATABASE_URL (or --database-url) is required for seeding")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
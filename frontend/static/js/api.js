@@ -197,7 +197,10 @@ export function initLiveScore(matchId) {
         // Browser will auto-retry connection in ~3 seconds
         // We only log warnings to keep console clean
         if (eventSource.readyState === EventSource.CLOSED) {
-            console.warn("⚠️ Stream Closed.");
+            // Refused (server at its viewer cap): the browser won't retry, so we do, after a jittered wait
+            console.warn("⚠️ Stream Closed. Retrying shortly...");
+            const closed = eventSource;
+            setTimeout(() => { if (eventSource === closed) initLiveScore(matchId); }, 10000 + Math.random() * 20000);
         } else {
             // console.warn("⚠️ Stream interrupted. Reconnecting...");
         }
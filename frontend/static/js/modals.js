@@ -137,11 +137,10 @@ export async function openBatsmanModal(title, teamId) {
 
     // 2. Fetch the HTML Template
     try {
-        const t = new Date().getTime();
         // NOTE: Uses same path logic as bowler modal
-        // backend mounts frontend/pages at root
-        let response = await fetch(`/modal_batsman.html?t=${t}`);
-        if (!response.ok) response = await fetch(`modal_batsman.html?t=${t}`);
+        // backend mounts frontend/pages at root (served with ETag revalidation, no cache-busting needed)
+        let response = await fetch(`/modal_batsman.html`);
+        if (!response.ok) response = await fetch(`modal_batsman.html`);
         if (!response.ok) throw new Error("Batsman template not found");
 
         const htmlText = await response.text();
@@ -330,15 +329,15 @@ export async function showSelectBowlerModal() {
 
     // 1. Fetch HTML
     try {
-        const timestamp = new Date().getTime();
         // backend/main.py mounts 'frontend/pages' at root '/'
         // So 'frontend/pages/modal_bowler.html' is available at '/modal_bowler.html'
-        let response = await fetch(`/modal_bowler.html?t=${timestamp}`);
+        // (served with ETag revalidation, no cache-busting needed)
+        let response = await fetch(`/modal_bowler.html`);
 
         if (!response.ok) {
             console.warn("Root fetch failed, trying relative...");
             // Fallback: Try relative if base path is different
-            response = await fetch(`modal_bowler.html?t=${timestamp}`);
+            response = await fetch(`modal_bowler.html`);
         }
 
         if (!response.ok) throw new Error(`HTTP ${response.status} - File Not Found at /modal_bowler.html`);
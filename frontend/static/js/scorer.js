@@ -121,6 +121,87 @@ window.squadCache = {
         ]
     };
 
+    // --- ACTION SOCKET: scoring without a POST per ball (falls back to HTTP) ---
+    // Actions ask for the lean "ack" reply (status + version, no state). The
+    // state comes from the socket's feed (a full state, then deltas), or over
+    // HTTP from /match_data revalidated with its ETag.
+    const WS_URL = API_URL.replace(/^http/, 'ws');
+    let actionSocket = null;
+    let nextActionId = 1;
+    const pendingActions = new Map();
+    let liveState = null;  // last state from the feed
+    let liveSeq = null;
+    let stateEtag = null;  // ETag of the last /match_data body
+
+    function applyFrame(msg) {
+        if (msg.t === 'state') {
+            liveState = msg.d;
+        } else if (liveState && msg.base === liveSeq) {
+            liveState = { ...liveState, ...msg.d };
+            (msg.x || []).forEach(key => delete liveState[key]);
+        } else {
+            return;  // the server sends a full state whenever a delta wouldn't apply
+        }
+        liveSeq = msg.seq;
+        refreshUI(liveState);
+    }
+
+    async function refreshState() {
+        const headers = stateEtag ? { 'If-None-Match': stateEtag } : {};
+        const response = await fetch(`${API_URL}/match_data?match_id=${MATCH_ID}`, { headers });
+        if (response.status === 304 || !response.ok) return;
+        stateEtag = response.headers.get('ETag');
+        refreshUI(await response.json());
+    }
+
+    function openActionSocket() {
+        const ws = new WebSocket(`${WS_URL}/ws/${MATCH_ID}`);
+        ws.onopen = () => { actionSocket = ws; };
+        ws.onmessage = (event) => {
+            const msg = JSON.parse(event.data);
+            if (msg.t === 'state' || msg.t === 'delta') {
+                applyFrame(msg);
+                return;
+            }
+            const pending = pendingActions.get(msg.id);
+            if (!pending) return;
+            pendingActions.delete(msg.id);
+            if (msg.t === 'ack') pending.resolve(msg.d);
+            else pending.reject(new Error(`Server returned ${msg.status}: ${JSON.stringify(msg.detail)}`));
+        };
+        ws.onclose = () => {
+            actionSocket = null;
+            liveState = liveSeq = null;
+            // Not retried: the server may already have applied them
+            pendingActions.forEach(p => p.reject(new Error('Connection lost, check the score before retrying')));
+            pendingActions.clear();
+            setTimeout(openActionSocket, 3000);
+        };
+    }
+
+    // One scoring action: over the socket when it's open (its feed brings the
+    // new state), else the HTTP route followed by a conditional /match_data
+    async function sendAction(action, path, payload) {
+        if (actionSocket && actionSocket.readyState === WebSocket.OPEN) {
+            const id = nextActionId++;
+            const reply = new Promise((resolve, reject) => pendingActions.set(id, { resolve, reject }));
+            actionSocket.send(JSON.stringify({ id, action, data: payload, response: 'ack' }));
+            return reply;
+        }
+        const response = await fetch(`${API_URL}/${path}?response=ack`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        });
+        if (!response.ok) {
+            const errText = await response.text();
+            throw new Error(`Server returned ${response.status}: ${errText}`);
+        }
+        const data = await response.json();
+        if (data.version && data.version !== stateEtag) await refreshState();
+        return data;
+    }
+
     // Helper to post data
     async function updateScore(action, value = null, extraData = {}) {
         try {
@@ -138,18 +219,7 @@ window.squadCache = {
             };
             console.log('Sending Payload:', payload);
 
-            const response = await fetch(`${API_URL}/update_score`, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(payload)
-            });
-
-            if (!response.ok) {
-                const errText = await response.text();
-                throw new Error(`Server returned ${response.status}: ${errText}`);
-            }
-
-            const data = await response.json();
+            const data = await sendAction('update_score', 'update_score', payload);
             console.log('Score updated:', data);
 
             handleServerResponse(data);
@@ -163,21 +233,10 @@ window.squadCache = {
         if (!confirm("Are you sure you want to Undo the last ball?")) return;
         try {
             console.log("Undoing last action...");
-            const response = await fetch(`${API_URL}/undo_last_action`, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ match_id: MATCH_ID })
-            });
-            const data = await response.json();
+            const data = await sendAction('undo', 'undo_last_action', { match_id: MATCH_ID });
             if (data.status === 'success') {
                 console.log("Undo successful", data);
-                if (data.data) {
-                    refreshUI(data.data);
-                } else {
-                    fetch(`${API_URL}/match_data?match_id=${MATCH_ID}`)
-                        .then(r => r.json())
-                        .then(d => refreshUI(d));
-                }
+                if (data.data) refreshUI(data.data);
             } else if (data.status === 'bowler_deselected') {
                 console.log("UNDO: Bowler Deselected. Re-opening modal.");
                 if (data.data) refreshUI(data.data);
@@ -876,28 +935,24 @@ window.squadCache = {
     function bootstrap() {
         initButtons();
         initModals();
+        if (window.WebSocket) openActionSocket();
 
-        // Initial Data Load
-        fetch(`${API_URL}/match_data?match_id=${MATCH_ID}`)
+        // Initial Data Load: state + both squads + teams in one round trip
+        fetch(`${API_URL}/matches/${MATCH_ID}/bootstrap`)
             .then(r => r.json())
-            .then(data => {
-                if (data.error) {
-                    alert("Failed to load match: " + data.error);
-                    console.error("Match Data Error:", data.error);
+            .then(boot => {
+                if (!boot.state) {
+                    const msg = boot.detail || boot.error || "Match not found";
+                    alert("Failed to load match: " + msg);
+                    console.error("Match Data Error:", msg);
                     return; // Stop further processing
                 }
-                refreshUI(data);
+                refreshUI(boot.state);
 
-                // BACKGROUND: Pre-load squads for instant modals
-                if (data.batting_team_id) {
-                    fetch(`${API_URL}/teams/${data.batting_team_id}/players`)
-                        .then(r => r.json()).then(d => window.squadCache.batting = d.players);
-                }
-
-                if (data.bowling_team_id) {
-                    fetch(`${API_URL}/teams/${data.bowling_team_id}/players`)
-                        .then(r => r.json()).then(d => window.squadCache.bowling = d.players);
-                }
+                // Squads for instant modals, teams for the squad tab
+                window.squadCache.batting = boot.squads.batting;
+                window.squadCache.bowling = boot.squads.bowling;
+                window.teamsCache = boot.teams;
             })
             .catch(err => {
                 console.error('API Fetch Error:', err);
@@ -953,8 +1008,12 @@ window.switchTab = function (tabName) {
 
 async function loadTeams() {
     try {
-        const res = await fetch(`${API_URL}/teams`);
-        const data = await res.json();
+        // Already delivered by the bootstrap on page load
+        let data = window.teamsCache ? { teams: window.teamsCache } : null;
+        if (!data) {
+            const res = await fetch(`${API_URL}/teams`);
+            data = await res.json();
+        }
         const select = document.getElementById('squadTeamSelect');
         if (!select) return;
         const currentVal = select.value;
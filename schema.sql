@@ -81,6 +81,10 @@ CREATE TABLE IF NOT EXISTS matches (
     current_striker_id BIGINT REFERENCES players(id),
     non_striker_id BIGINT REFERENCES players(id),
     current_bowler_id BIGINT REFERENCES players(id),
+
+    -- Rendered scoreboard (the /api/match_data payload), rewritten in the
+    -- transaction of every match write; NULL = render from the tables
+    live_state JSONB,
     
     -- Timing
     match_date DATE,
@@ -0,0 +1,6 @@
+# The backend modules import each other as top-level modules (`import statements`),
+# as they do when uvicorn runs from backend/; give the tests the same import path.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
@@ -0,0 +1,65 @@
+# Tests for the columnar tournament analytics (backend/analytics.py)
+from analytics import TournamentStats
+
+
+def row(match, over, striker, non_striker, bowler, runs=0, extras=0, extra_type=None,
+        out=None, wicket_type=None):
+    # Column order of TOURNAMENT_BALLS_SQL
+    return (match, 1, over, striker, non_striker, bowler, runs, extras, extra_type,
+            wicket_type is not None, out, wicket_type, 20)
+
+
+def build():
+    rows = [
+        row(1, 0, 1, 2, 20, runs=4),
+        row(1, 0, 1, 2, 20, extras=1, extra_type="wide"),
+        row(2, 0, 1, 2, 21, runs=1),  # another match's ball in between (ordered by id)
+        row(1, 0, 1, 2, 20, runs=1),
+        row(1, 0, 2, 1, 20, out=2, wicket_type="bowled"),
+        row(1, 0, 3, 1, 20, runs=6),
+        row(1, 0, 3, 1, 20, extras=1, extra_type="leg-bye"),
+        row(1, 16, 1, 3, 21, out=3, wicket_type="runout"),
+        row(1, 16, 1, 4, 21, runs=2),
+    ]
+    names = {1: "One", 2: "Two", 3: "Three", 4: "Four", 20: "Quick", 21: "Spin"}
+    return TournamentStats(7, rows, names, (len(rows), len(rows)))
+
+
+def test_batting_and_bowling_group_bys():
+    stats = build()
+    batting = {r["name"]: r for r in stats.batting}
+    assert [r["name"] for r in stats.batting] == ["One", "Three", "Two"]
+    assert {k: batting["One"][k] for k in ("innings", "runs", "balls", "outs", "fours", "highest")} == \
+        {"innings": 2, "runs": 8, "balls": 5, "outs": 0, "fours": 1, "highest": "7*"}
+    # Run out as the non-striker still counts as an innings and a dismissal
+    assert (batting["Three"]["runs"], batting["Three"]["balls"], batting["Three"]["outs"]) == (6, 2, 1)
+    assert batting["Two"]["highest"] == "0" and batting["Two"]["avg"] == 0.0
+
+    bowling = {r["name"]: r for r in stats.bowling}
+    assert {k: bowling["Quick"][k] for k in ("overs", "runs", "wickets", "dots", "best")} == \
+        {"overs": "0.5", "runs": 12, "wickets": 1, "dots": 2, "best": "1/12"}
+    # Run outs aren't the bowler's; best figures pick the cheaper innings
+    assert (bowling["Spin"]["wickets"], bowling["Spin"]["innings"], bowling["Spin"]["best"]) == (0, 2, "0/1")
+
+
+def test_phases_partnerships_and_head_to_head():
+    stats = build()
+    powerplay, middle, death = stats.phases
+    assert (powerplay["runs"], powerplay["balls"], powerplay["wickets"]) == (14, 6, 1)
+    assert middle["balls"] == 0 and middle["run_rate"] is None
+    assert (death["runs"], death["balls"], death["wickets"]) == (2, 2, 1)
+
+    top = [(p["match_id"], p["wicket"], p["runs"], p["balls"], p["unbroken"]) for p in stats.partnerships]
+    assert top == [(1, 2, 7, 3, False), (1, 1, 6, 3, False), (1, 3, 2, 1, True), (2, 1, 1, 1, True)]
+    assert stats.partnerships[0]["batters"] == ["Three", "One"]
+
+    h2h = stats.head_to_head(2, 20)
+    assert (h2h["balls"], h2h["runs"], h2h["dismissals"]) == (1, 0, 1)
+    player = stats.player(1)
+    assert player["phases"][2]["bat_runs"] == 2 and player["bowling"] is None
+    assert stats.player(99) is None
+
+
+def test_empty_tournament():
+    stats = TournamentStats(1, [], {}, (0, 0))
+    assert stats.summary()["batting"] == [] and stats.partnerships == []
@@ -0,0 +1,43 @@
+# Tests for per-request DB stats / N+1 detection (backend/db_metrics.py)
+import asyncio
+
+import db_metrics
+from db_metrics import InstrumentedConnection, RequestDbStats
+
+
+class FakeConn:
+    async def fetchrow(self, sql, *args):
+        return {"id": args[0]}
+
+    def transaction(self):
+        return "tx"
+
+
+def test_instrumented_connection_counts_queries_and_flags_n_plus_one():
+    async def request():
+        stats = RequestDbStats()
+        token = db_metrics._current.set(stats)
+        try:
+            conn = InstrumentedConnection(FakeConn())
+            for pid in (1, 2, 3):
+                assert await conn.fetchrow("SELECT * FROM players WHERE id = $1", pid) == {"id": pid}
+            await conn.fetchrow("SELECT * FROM matches WHERE id = $1", 7)
+            await conn.fetchrow("SELECT * FROM matches WHERE id = $1", 7)
+            assert conn.transaction() == "tx"  # delegated
+        finally:
+            db_metrics._current.reset(token)
+        return stats
+
+    stats = asyncio.run(request())
+    assert stats.queries == 5
+    # Same SQL + same args is a repeat, not an N+1
+    assert stats.repeated_statements(3) == [("SELECT * FROM players WHERE id = $1", 3)]
+
+
+def test_route_name_is_the_template():
+    class Route:
+        path = "/teams/{team_name}/logo"
+
+    # A decoded %2F in the id adds path segments; none of them reach the label
+    scope = {"method": "GET", "path": "/api/teams/a/b/logo", "route": Route()}
+    assert db_metrics.route_name(scope) == "GET /teams/{team_name}/logo"
@@ -0,0 +1,39 @@
+# Tests for broadcast coalescing (backend/live_updates.py)
+import asyncio
+
+from live_updates import BroadcastScheduler
+from sse_manager import manager
+from state_cache import state_cache
+
+
+def test_burst_is_built_and_broadcast_once():
+    async def scenario():
+        builds = []
+
+        async def loader(match_id):
+            builds.append(match_id)
+            return {"score": len(builds)}
+
+        state_cache.configure(loader)
+        state_cache.invalidate()
+        scheduler = BroadcastScheduler(window_ms=20, max_delay_ms=60)
+        q = await manager.subscribe(5)
+        try:
+            # end_inning, set_batsman, set_bowler within a few ms
+            for _ in range(3):
+                scheduler.mark_dirty(5)
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.05)
+            assert (builds, scheduler.flushes, q.qsize()) == ([5], 1, 1)
+
+            # A steady stream of writes still goes out by the max delay
+            for _ in range(10):
+                scheduler.mark_dirty(5)
+                await asyncio.sleep(0.01)
+            assert scheduler.flushes >= 2
+        finally:
+            scheduler.close()
+            await manager.unsubscribe(5, q)
+            state_cache.invalidate()
+
+    asyncio.run(scenario())
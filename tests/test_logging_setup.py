@@ -0,0 +1,19 @@
+# Tests for log sampling (backend/logging_setup.py)
+import logging
+
+from logging_setup import SamplingFilter
+
+
+def _record(msg, sample_every=None):
+    record = logging.makeLogRecord({"name": "sse_manager", "msg": msg, "args": (1,)})
+    if sample_every:
+        record.sample_every = sample_every
+    return record
+
+
+def test_sampling_filter_keeps_one_in_n_per_message_template():
+    f = SamplingFilter()
+    joined = [f.filter(_record("joined %s", 10)) for _ in range(25)]
+    assert joined.count(True) == 3          # 1st, 11th, 21st
+    assert f.filter(_record("left %s", 10))  # separate budget per template
+    assert all(f.filter(_record("error %s")) for _ in range(5))  # unsampled records always pass
@@ -0,0 +1,44 @@
+# Tests for the in-memory logo index (backend/logo_index.py)
+import os
+
+from logo_index import LogoIndex
+
+
+def _touch(path, mtime):
+    with open(path, "wb") as f:
+        f.write(b"x")
+    os.utime(path, (mtime, mtime))
+
+
+def test_newest_logo_wins(tmp_path):
+    _touch(tmp_path / "team_5_3a8ae917.png", 1000)
+    _touch(tmp_path / "team_5_7bc8ab27.png", 2000)
+    _touch(tmp_path / "team_9_31fe5103.jpg", 1500)
+    _touch(tmp_path / "notes.txt", 3000)
+
+    index = LogoIndex(str(tmp_path))
+    index.build()
+
+    assert index.get(5) == "/static/logos/team_5_7bc8ab27.png"
+    assert index.get(9) == "/static/logos/team_9_31fe5103.jpg"
+    assert index.get(42) is None
+    assert index.get(None) is None
+
+
+def test_prefers_small_derivative(tmp_path):
+    _touch(tmp_path / "team_4_45f3498a.jpg", 1000)
+    _touch(tmp_path / "team_4_45f3498a_128.webp", 1001)
+
+    index = LogoIndex(str(tmp_path))
+    index.build()
+
+    assert index.get(4) == "/static/logos/team_4_45f3498a_128.webp"
+
+
+def test_upload_updates_index(tmp_path):
+    index = LogoIndex(str(tmp_path / "missing"))
+    index.build()
+    assert index.get(1) is None
+
+    index.set(1, "/static/logos/team_1_abcdef12_128.webp")
+    assert index.get(1) == "/static/logos/team_1_abcdef12_128.webp"
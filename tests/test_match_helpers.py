@@ -0,0 +1,45 @@
+# Tests for the scorecard builder in backend/utils/match_helpers.py
+from utils.match_helpers import BallRecord, build_inning_scorecard, calculate_match_score
+
+
+def ball(i, runs=0, extras=0, extra_type=None, wicket_type=None, striker=1, inning=1):
+    return BallRecord(
+        id=i, inning_no=inning, over_no=None, ball_no=None, striker_id=striker, bowler_id=20,
+        runs_off_bat=runs, extras=extras, extra_type=extra_type,
+        is_wicket=wicket_type is not None, wicket_type=wicket_type,
+        catcher_id=21 if wicket_type == "caught" else None,
+    )
+
+
+def test_inning_scorecard_matches_live_score():
+    balls = [
+        ball(1, runs=4),
+        ball(2, extras=1, extra_type="wide"),
+        ball(3, runs=1),
+        ball(4, extras=2, extra_type="leg-bye", striker=2),
+        ball(5, wicket_type="caught", striker=2),
+        ball(6, runs=6, striker=3),
+        ball(7, runs=1, striker=3),
+        ball(8, runs=2, inning=2),
+    ]
+    p_map = {1: "Opener", 2: "Partner", 3: "Three", 20: "Quick", 21: "Keeper"}
+
+    card = build_inning_scorecard(balls, 1, p_map)
+    live = calculate_match_score(balls, {"current_inning": 1, "total_overs": 20})
+
+    assert (card["total"], card["wickets"], card["overs"]) == (live["runs"], live["wickets"], live["overs"]) == (15, 1, "1.0")
+    assert card["extras"] == {"total": 3, "b": 0, "lb": 2, "w": 1, "nb": 0, "p": 0}
+    batting = {row["name"]: row for row in card["batting"]}
+    assert batting["Opener"]["balls"] == 2 and batting["Opener"]["4s"] == 1
+    assert batting["Partner"]["out"] == "c Keeper b Quick"
+    (bowler,) = card["bowling"]
+    assert (bowler["overs_display"], bowler["runs"], bowler["wkts"]) == ("1.0", 13, 1)
+    assert build_inning_scorecard(balls, 3, p_map) is None
+
+
+def test_ball_columns_match_record_fields():
+    # Rows convert positionally, so the SQL projection must follow the field order
+    import statements
+    columns = [c.strip().split(".")[-1] for c in statements.BALL_COLUMNS.split(",")]
+    assert tuple(columns) == BallRecord._fields[:len(columns)]
+    assert "b.*" not in statements.STATEMENTS["state_balls"]
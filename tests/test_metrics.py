@@ -0,0 +1,17 @@
+# Tests for the Prometheus text output (backend/metrics.py)
+from metrics import Histogram
+
+
+def test_histogram_renders_cumulative_buckets_per_label_set():
+    h = Histogram("req_seconds", "Request time.", ("route",), buckets=(0.1, 1.0))
+    h.observe(0.05, ("GET /a",))
+    h.observe(0.5, ("GET /a",))
+    h.observe(3.0, ("GET /a",))
+
+    lines = h.render()
+    assert lines[:2] == ["# HELP req_seconds Request time.", "# TYPE req_seconds histogram"]
+    assert 'req_seconds_bucket{route="GET /a",le="0.1"} 1' in lines
+    assert 'req_seconds_bucket{route="GET /a",le="1.0"} 2' in lines
+    assert 'req_seconds_bucket{route="GET /a",le="+Inf"} 3' in lines
+    assert 'req_seconds_count{route="GET /a"} 3' in lines
+    assert 'req_seconds_sum{route="GET /a"} 3.550000' in lines
@@ -0,0 +1,27 @@
+# Tests for the sampling profiler (backend/profiler.py)
+import threading
+import time
+
+from profiler import StackSampler
+
+
+def busy_work(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sampler_collects_collapsed_stacks_for_target_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_work, args=(stop,), name="busy")
+    worker.start()
+    sampler = StackSampler(interval=0.002, thread_ids=[worker.ident])
+    sampler.start()
+    time.sleep(0.2)
+    sampler.stop()
+    stop.set()
+    worker.join()
+
+    assert sampler.samples > 0
+    lines = sampler.collapsed().splitlines()
+    assert lines and all(line.startswith("busy;") for line in lines)
+    assert any("busy_work (" in f["function"] for f in sampler.inclusive_functions())
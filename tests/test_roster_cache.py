@@ -0,0 +1,26 @@
+# Tests for the per-match squad rosters (backend/roster_cache.py)
+from roster_cache import MatchRoster
+
+
+def player(pid, team, picked=False):
+    return {"id": pid, "team_id": team, "name": f"P{pid}", "role": None, "photo_url": None, "picked": picked}
+
+
+def test_squads_use_playing_xi_and_live_flags():
+    rows = [player(1, 10), player(2, 10), player(3, 10), player(4, 10),
+            player(20, 11, picked=True), player(21, 11), player(22, 11, picked=True)]
+    roster = MatchRoster(rows, [{"inning_no": 1, "player_out_id": 2}, {"inning_no": 2, "player_out_id": 20}])
+    state = {"innings": {"current_inning": 1}, "batting_team_id": 10, "bowling_team_id": 11,
+             "current_batsmen": [{"id": 1}, {"id": 3}], "current_bowler": {"id": 22}}
+
+    # No XI picked for team 10: the whole team; team 11 picked two players
+    assert roster.available_batters(state) == [{"id": 4, "name": "P4"}]
+    assert [p["id"] for p in roster.bowling_squad(state)] == [20, 22]
+    bowling = {p["id"]: p for p in roster.squads(state)["bowling"]}
+    assert bowling[22]["bowling_now"] and not bowling[22]["available"] and bowling[20]["available"]
+
+    # Outs are per inning
+    roster.outs.setdefault(1, set()).add(4)
+    assert roster.available_batters(state) == []
+    state["innings"]["current_inning"] = 2
+    assert [p["id"] for p in roster.available_batters(state)] == [2, 4]
@@ -0,0 +1,44 @@
+# Tests for coalesced static JSON snapshots (backend/snapshot_publisher.py)
+import asyncio
+import gzip
+import json
+import os
+
+from snapshot_publisher import SnapshotPublisher
+
+
+def test_burst_is_coalesced(tmp_path):
+    writes = []
+
+    async def scorecard(match_id):
+        writes.append(match_id)
+        return {"inning1": None}
+
+    async def run():
+        publisher = SnapshotPublisher(str(tmp_path), interval_ms=100)
+        publisher.configure({"scorecard": scorecard})
+        for runs in range(10):
+            publisher.schedule(7, {"innings": {"runs": runs}})
+        await asyncio.sleep(0.01)
+        # First delivery after idle is written immediately...
+        for runs in range(10, 20):
+            publisher.schedule(7, {"innings": {"runs": runs}})
+        await asyncio.sleep(0.2)
+        # ...and the rest of the burst lands in one trailing write
+        await publisher.close()
+
+    asyncio.run(run())
+
+    match_dir = tmp_path / "matches" / "7"
+    state = json.loads((match_dir / "state.json").read_text())
+    assert state["innings"]["runs"] == 19
+    assert json.loads(gzip.decompress((match_dir / "state.json.gz").read_bytes())) == state
+    assert (match_dir / "scorecard.json").exists()
+    assert len(writes) == 2
+    assert not [p for p in os.listdir(match_dir) if p.endswith(".tmp")]
+
+
+def test_disabled_without_directory():
+    publisher = SnapshotPublisher(None)
+    publisher.schedule(1, {"innings": {}})
+    assert not publisher.pending
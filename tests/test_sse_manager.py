@@ -0,0 +1,88 @@
+# Tests for view fan-out and multiplexed subscriptions (backend/sse_manager.py)
+import asyncio
+import json
+
+from sse_manager import SSEManager
+
+
+def test_multiplexed_subscriptions_share_keys():
+    async def scenario():
+        manager = SSEManager()
+        manager.register_view("summary", lambda state: json.dumps({"runs": state["runs"]}))
+        key, q1 = manager.subscribe_many([1, 2])
+        _, q2 = manager.subscribe_many([2, 1])
+        _, q3 = manager.subscribe_many([2, 3])
+        assert len(manager.groups) == 2 and manager.group_index[2] == {key, frozenset({2, 3})}
+
+        await manager.broadcast(1, {"runs": 7})
+        assert q1.get_nowait() == q2.get_nowait() == 'event: match-1\ndata: {"runs": 7}\n\n'
+        assert q3.empty()
+
+        manager.unsubscribe_many(key, q1)
+        manager.unsubscribe_many(key, q2)
+        assert 1 not in manager.group_index and manager.group_index[2] == {frozenset({2, 3})}
+        assert manager.drain() == 1 and q3.get_nowait().startswith("retry: ")
+
+    asyncio.run(scenario())
+
+
+def test_each_subscribed_view_renders_once_per_broadcast():
+    async def scenario():
+        from projections import PROJECTIONS, projector
+        manager = SSEManager()
+        calls = []
+        for name, keys in PROJECTIONS.items():
+            render = projector(keys)
+            manager.register_view(name, lambda state, name=name, render=render: calls.append(name) or render(state))
+
+        score_queues = [await manager.subscribe(1, "score") for _ in range(3)]
+        await manager.broadcast(1, {"match_id": 1, "innings": {"runs": 5}, "this_over_balls": [1, 2]})
+        assert calls == ["score"]  # nobody follows "batting": never rendered
+        message = score_queues[0].get_nowait()
+        assert "this_over_balls" not in message and '"runs": 5' in message
+        assert all(q.get_nowait() is message for q in score_queues[1:])
+
+    asyncio.run(scenario())
+
+
+def test_stalled_listener_is_reaped_and_caps_apply():
+    async def scenario():
+        import sse_manager
+        manager = SSEManager()
+        live = await manager.subscribe(1)
+        stalled = await manager.subscribe(1)
+        for runs in range(sse_manager.SSE_QUEUE_MAX + 1):
+            await manager.broadcast(1, {"runs": runs})
+            live.get_nowait()  # this one keeps reading
+
+        assert manager.reaped == 1 and manager.active_listeners[1]["full"] == [live]
+        assert stalled.get_nowait() is None  # its stream ends if it ever reads again
+        await manager.unsubscribe(1, stalled)  # its generator's cleanup: no double count
+        assert manager.connections == 1 and manager.per_match == {1: 1}
+
+        sse_manager.SSE_MAX_PER_MATCH, cap = 1, sse_manager.SSE_MAX_PER_MATCH
+        try:
+            assert not manager.admit(1) and manager.admit(2) and manager.rejected == 1
+        finally:
+            sse_manager.SSE_MAX_PER_MATCH = cap
+
+    asyncio.run(scenario())
+
+
+def test_heartbeat_while_quiet():
+    async def scenario():
+        import sse_manager
+        manager = SSEManager()
+        q = await manager.subscribe(1)
+        sse_manager.SSE_HEARTBEAT_S, beat = 0.01, sse_manager.SSE_HEARTBEAT_S
+        try:
+            messages = manager.messages(q)
+            assert await messages.__anext__() == ": ping\n\n"
+            q.put_nowait("data: 1\n\n")
+            assert await messages.__anext__() == "data: 1\n\n"
+            q.put_nowait(None)
+            assert [m async for m in messages] == []
+        finally:
+            sse_manager.SSE_HEARTBEAT_S = beat
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+# Tests for the match state cache (backend/state_cache.py)
+import asyncio
+
+from state_cache import MatchStateCache
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache = MatchStateCache(ttl=60)
+        calls = []
+
+        async def loader(match_id):
+            calls.append(match_id)
+            await asyncio.sleep(0.01)
+            return {"id": match_id, "score": 10}
+
+        cache.configure(loader)
+        results = await asyncio.gather(*(cache.get(1) for _ in range(5)))
+        assert calls == [1] and all(r == {"id": 1, "score": 10} for r in results)
+        assert await cache.get(1) is results[0]
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.entries[1].sse() == 'data: {"id": 1, "score": 10}\n\n'
+
+    asyncio.run(scenario())
+
+
+def test_write_during_load_keeps_newer_state():
+    async def scenario():
+        cache = MatchStateCache(ttl=60)
+        release = asyncio.Event()
+
+        async def loader(match_id):
+            await release.wait()
+            return {"score": 10}  # read before the write below committed
+
+        cache.configure(loader)
+        slow = asyncio.create_task(cache.get(1))
+        await asyncio.sleep(0)
+        cache.put(1, {"score": 14})  # published while the rebuild was in flight
+        release.set()
+        assert await slow == {"score": 10}
+        assert await cache.get(1) == {"score": 14}
+
+        before = cache.version(1)
+        cache.invalidate()
+        assert cache.entries == {} and cache.version(1) != before
+
+    asyncio.run(scenario())
+
+
+def test_etag_follows_writes_and_expiry():
+    async def scenario():
+        cache = MatchStateCache(ttl=60)
+
+        async def loader(match_id):
+            return {"score": 10}
+
+        cache.configure(loader)
+        entry = await cache.get_entry(1)
+        assert entry.etag == cache.etag(1) and (await cache.get_entry(1)).etag == entry.etag
+
+        cache.invalidate(1)  # a write: the rebuild carries the version an ack announced
+        announced = cache.etag(1)
+        assert announced != entry.etag and (await cache.get_entry(1)).etag == announced
+
+        cache.ttl = 0  # expired: maybe changed by another worker, so a new ETag
+        assert (await cache.get_entry(1)).etag != announced
+
+    asyncio.run(scenario())
+
+
+def test_warmed_entries_outlive_the_ttl():
+    async def scenario():
+        cache = MatchStateCache(ttl=0)
+        loads = []
+
+        async def loader(match_id):
+            loads.append(match_id)
+            return {"score": 10}
+
+        cache.configure(loader)
+        assert await cache.warm([1, 2], ttl=60) == 2
+        await cache.get_entry(1)  # a reconnecting viewer: still warm
+        assert loads == [1, 2]
+
+        cache.invalidate(1)  # writes still replace or drop them
+        await cache.get_entry(1)
+        assert loads == [1, 2, 1]
+
+    asyncio.run(scenario())
@@ -0,0 +1,16 @@
+# Tests for the prepared statement registry (backend/statements.py)
+import statements
+
+
+def test_auto_mode_disables_named_statements_behind_transaction_pooler(monkeypatch):
+    monkeypatch.setattr(statements, "STATEMENT_MODE", "auto")
+    pooler = "postgresql://u:p@aws-1-ap-south-1.pooler.supabase.com:6543/postgres"
+    direct = "postgresql://postgres@127.0.0.1:5432/scoreboard"
+
+    assert statements.pool_options(pooler) == {"statement_cache_size": 0}
+    options = statements.pool_options(direct)
+    assert options["statement_cache_size"] >= len(statements.STATEMENTS)
+
+    # Explicit mode wins (e.g. PgBouncer >= 1.21 with max_prepared_statements)
+    monkeypatch.setattr(statements, "STATEMENT_MODE", "named")
+    assert statements.resolve_mode(pooler) == "named"
@@ -0,0 +1,45 @@
+# Tests for content-hashed static asset serving (backend/static_assets.py)
+import os
+
+from static_assets import AssetManifest
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_manifest_rewrites_imports_and_pages(tmp_path):
+    _write(str(tmp_path / "js" / "main.js"), "import { a } from './ui.js';\nimport('./ui.js');\n")
+    _write(str(tmp_path / "js" / "ui.js"), "export const a = 1;\n")
+    _write(str(tmp_path / "css" / "style.css"), "body { color: red; }\n")
+    _write(str(tmp_path / "logos" / "team_1_abcdef12.png"), "not snapshotted")
+
+    manifest = AssetManifest(str(tmp_path))
+    manifest.build()
+
+    ui_hashed = manifest.urls["js/ui.js"]
+    assert ui_hashed.startswith("js/ui.") and ui_hashed != "js/ui.js"
+    assert "logos/team_1_abcdef12.png" not in manifest.urls
+
+    main_body = manifest.hashed[manifest.urls["js/main.js"]].body.decode()
+    ui_name = os.path.basename(ui_hashed)
+    assert f"from './{ui_name}'" in main_body
+    assert f"import('./{ui_name}')" in main_body
+
+    html = manifest.rewrite_html('<link href="../static/css/style.css"><script src="/static/js/main.js"></script>')
+    assert f'href="/static/{manifest.urls["css/style.css"]}"' in html
+    assert f'src="/static/{manifest.urls["js/main.js"]}"' in html
+
+
+def test_fingerprint_changes_with_content(tmp_path):
+    _write(str(tmp_path / "css" / "style.css"), "body { color: red; }\n")
+    first = AssetManifest(str(tmp_path))
+    first.build()
+
+    _write(str(tmp_path / "css" / "style.css"), "body { color: blue; }\n")
+    second = AssetManifest(str(tmp_path))
+    second.build()
+
+    assert first.urls["css/style.css"] != second.urls["css/style.css"]
@@ -0,0 +1,33 @@
+# Tests for the compact ticker messages (backend/ticker.py)
+import json
+
+from ticker import TICKER_FIELDS, ticker_json, ticker_text
+
+
+def state(**overrides):
+    base = {
+        "batting_team": "Lions", "status": "live", "result_message": None,
+        "innings": {"runs": 123, "wickets": 4, "overs": "15.2", "current_inning": 2, "target": 150},
+        "current_batsmen": [
+            {"name": "Sam", "runs": 12, "balls": 9, "on_strike": False},
+            {"name": "Ravi", "runs": 45, "balls": 30, "on_strike": True},
+        ],
+        "current_bowler": {"name": "Khan", "wickets": 2, "runs_conceded": 24, "overs": "3.2"},
+    }
+    base.update(overrides)
+    return base
+
+
+def test_ticker_text_and_positional_json():
+    assert ticker_text(state()) == "Lions 123/4 (15.2) target 150 — Ravi 45*(30), Sam 12(9), Khan 2-24"
+    fields = dict(zip(TICKER_FIELDS, json.loads(ticker_json(state()))))
+    assert (fields["striker"], fields["non_striker"], fields["bowler_runs"]) == ("Ravi", "Sam", 24)
+    assert len(json.loads(ticker_json(state()))) == len(TICKER_FIELDS)
+
+
+def test_ticker_between_overs_and_after_result():
+    quiet = state(current_batsmen=[], current_bowler=None)
+    assert ticker_text(quiet) == "Lions 123/4 (15.2) target 150"
+    assert json.loads(ticker_json(quiet))[5:15] == [None] * 10
+    done = state(status="completed", result_message="Lions won by 6 wickets")
+    assert ticker_text(done).endswith("— Lions won by 6 wickets")
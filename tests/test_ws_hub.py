@@ -0,0 +1,59 @@
+# Tests for WebSocket frames and shallow deltas (backend/ws_hub.py)
+import asyncio
+import json
+
+import sse_manager
+from ws_hub import WsHub, decode, encode, shallow_delta
+
+
+def test_shallow_delta():
+    old = {"innings": {"runs": 4}, "status": "live", "striker": 7}
+    new = {"innings": {"runs": 5}, "status": "live"}
+    assert shallow_delta(old, new) == {"d": {"innings": {"runs": 5}}, "x": ["striker"]}
+
+
+def test_sockets_get_deltas_only_on_top_of_what_they_saw():
+    async def scenario():
+        hub = WsHub()
+        q = hub.subscribe(1)
+        first = {"innings": {"runs": 4}, "teams": ["A", "B"]}
+        hub.broadcast(1, first)
+        assert hub.seen(1, first) == 1 and hub.seen(1, dict(first)) is None
+
+        second = dict(first, innings={"runs": 5})
+        hub.broadcast(1, second)
+        f1, f2 = q.get_nowait(), q.get_nowait()
+        assert json.loads(f2.encoded(1, "json")) == {"t": "delta", "seq": 2, "base": 1,
+                                                     "d": {"innings": {"runs": 5}}, "x": []}
+        # A socket that missed frame 1 gets the whole state instead
+        assert json.loads(f2.encoded(None, "json"))["d"] == second
+        assert f2.encoded(1, "json") is f2.encoded(1, "json")  # encoded once per kind/format
+
+        for _ in range(sse_manager.SSE_QUEUE_MAX + 1):  # stopped reading
+            hub.broadcast(1, second)
+        assert hub.reaped == 1 and hub.connections == 0 and q.get_nowait() is None
+
+    asyncio.run(scenario())
+
+
+def test_msgpack_frames_round_trip():
+    message = {"t": "state", "seq": 3, "d": {"innings": {"runs": 5, "overs": "2.1"}, "striker": None}}
+    frame = encode(message, "msgpack")
+    assert isinstance(frame, bytes) and len(frame) < len(encode(message, "json"))
+    assert decode(frame) == message
+
+
+def test_feedless_sockets_are_counted_and_drained():
+    async def scenario():
+        hub = WsHub()
+        viewer, console = hub.subscribe(1), hub.subscribe(1, feed=False)
+        assert hub.connections == 2
+        hub.broadcast(1, {"score": 1})
+        assert viewer.qsize() == 1 and console.empty()  # consoles get replies only
+
+        assert hub.drain() == 2 and console.get_nowait() is None
+        hub.unsubscribe(1, viewer)
+        hub.unsubscribe(1, console)
+        assert hub.connections == 0 and not hub.feeds
+
+    asyncio.run(scenario())